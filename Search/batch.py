@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# Quantos processos (cada um com seu próprio Chrome) rodam a matriz cidade × termo ao mesmo tempo.
+BATCH_WORKERS = int(os.getenv("SEARCHMAPS_BATCH_WORKERS", "1"))
+
+
+def build_tasks(cities, queries, state=None, limit=None, mode: str = "full"):
+    """Monta a matriz cidade × termo (sem entradas vazias), na ordem em que os resultados serão mesclados."""
+    tasks = []
+    for city in cities:
+        city = (city or "").strip()
+        if not city:
+            continue
+        for query in queries:
+            query = (query or "").strip()
+            if not query:
+                continue
+            tasks.append({"city": city, "query": query, "state": state, "limit": limit, "mode": mode})
+    return tasks
+
+
+def _init_worker(worker_ids) -> None:
+    # Fecha os Chrome do processo quando o executor encerra o worker (atexit não roda em processos filhos).
+    from multiprocessing.util import Finalize
+
+    from searcher import prewarm_drivers, set_profile_namespace, shutdown_drivers
+
+    # Cada processo usa seus próprios diretórios de perfil (o Chrome trava o user-data-dir).
+    set_profile_namespace(f"batch{worker_ids.get()}-")
+    Finalize(None, shutdown_drivers, exitpriority=10)
+    prewarm_drivers()
+
+
+def run_task(task: dict) -> dict:
+    """Executa uma célula da matriz. Erros ficam no resultado para não derrubar o lote."""
+    from searcher import buscar_estabelecimentos
+
+    start = time.perf_counter()
+    try:
+        rows = buscar_estabelecimentos(
+            task["city"],
+            task["query"],
+            state=task.get("state"),
+            limit=task.get("limit"),
+            mode=task.get("mode") or "full",
+        )
+        error = ""
+    except Exception as exc:
+        rows = []
+        error = f"{type(exc).__name__}: {exc}"
+    return {**task, "rows": rows, "error": error, "elapsed": time.perf_counter() - start}
+
+
+def _report(done: int, total: int, failures: int, outcome: dict) -> None:
+    label = f"{outcome['city']} / {outcome['query']}"
+    status = f"ERRO ({outcome['error']})" if outcome["error"] else f"{len(outcome['rows'])} itens"
+    print(
+        f"[SearchMaps] Lote {done}/{total} (falhas={failures}) | {label}: {status} "
+        f"em {outcome['elapsed']:.1f}s"
+    )
+
+
+def run_batch(tasks, workers: int = None, progress_cb=None):
+    """
+    Executa as tarefas (ver build_tasks) em até `workers` processos e devolve os resultados na ordem
+    das tarefas, cada um com `rows`, `error` e `elapsed`. Com 1 worker roda tudo no processo atual.
+    :param progress_cb: Callback opcional chamado a cada tarefa concluída (recebe concluídas, total, resultado).
+    """
+    workers = max(1, min(workers or BATCH_WORKERS, len(tasks) or 1))
+    outcomes = [None] * len(tasks)
+    failures = 0
+    start = time.perf_counter()
+
+    def finish(index, outcome):
+        nonlocal failures
+        outcomes[index] = outcome
+        if outcome["error"]:
+            failures += 1
+        done = sum(1 for item in outcomes if item is not None)
+        _report(done, len(tasks), failures, outcome)
+        if progress_cb:
+            progress_cb(done, len(tasks), outcome)
+
+    if workers == 1:
+        for index, task in enumerate(tasks):
+            finish(index, run_task(task))
+    else:
+        # spawn: cada processo importa o searcher do zero, sem herdar drivers do processo pai.
+        context = multiprocessing.get_context("spawn")
+        worker_ids = context.Queue()
+        for worker_id in range(workers):
+            worker_ids.put(worker_id)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(worker_ids,)
+        ) as executor:
+            futures = {executor.submit(run_task, task): index for index, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool as exc:
+                    # Um processo morreu (ex.: falta de memória); as demais tarefas seguem marcadas como falha.
+                    outcome = {**tasks[index], "rows": [], "error": f"Processo encerrado: {exc}", "elapsed": 0.0}
+                finish(index, outcome)
+
+    print(
+        f"[SearchMaps] Lote concluído | tarefas={len(tasks)} | falhas={failures} | workers={workers} | "
+        f"itens={sum(len(item['rows']) for item in outcomes)} | tempo_total={time.perf_counter() - start:.1f}s"
+    )
+    return outcomes
+
+
+def merge_rows(outcomes):
+    """Junta as linhas de todas as tarefas bem-sucedidas, na ordem da matriz."""
+    rows = []
+    for outcome in outcomes:
+        if not outcome["error"]:
+            rows.extend(outcome["rows"])
+    return rows
@@ -0,0 +1,550 @@
+"""
+Driver falso para benchmarks offline: imita o subconjunto do WebDriver usado pelo searcher sobre as
+fixtures HTML de bench/fixtures (feed de resultados, página de local, layout antigo, consentimento).
+O feed carrega os cards aos poucos, um lote por rolagem, e termina com o marcador de fim da lista.
+Todo comando passa por `execute`, como no Selenium, então o command_profiler conta os round trips.
+Com `performance_log`, cada rolagem também gera a resposta JSON do feed (formato de
+fixtures/search_payload.txt) no log de performance, para a extração por rede (network_parser).
+"""
+import copy
+import html
+import json
+import random
+import re
+import time
+from pathlib import Path
+from string import Template
+from urllib.parse import quote_plus, unquote_plus
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from command_profiler import DRIVER_MODULES
+from network_parser import (
+    ADDRESS_LINES_PATH,
+    ADDRESS_PATH,
+    FEATURE_ID_PATH,
+    FULL_ADDRESS_PATH,
+    GOOGLE_PLACE_ID_PATH,
+    NAME_PATH,
+    PHONE_PATH,
+    WEBSITE_PATH,
+    XSSI_PREFIX,
+    iter_place_records,
+    load_payload,
+)
+from page_parser import extract_place_id_from_url, parse_html
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Frames deste módulo fazem o papel do Selenium no relatório de comandos.
+DRIVER_MODULES.append(__name__)
+
+_CATEGORIES = ["Pizzaria", "Restaurante", "Hamburgueria", "Lanchonete", "Padaria", "Cafeteria"]
+_NAMES = ["Bella", "Forno", "Casa", "Cantina", "Villa", "Don", "Sabor", "Ponto", "Estação", "Dona"]
+_STREETS = ["R. da Bahia", "Av. Afonso Pena", "R. Espírito Santo", "Av. do Contorno", "R. Sergipe", "R. Pium-í"]
+_END_TEXT_RE = re.compile(r"^//\*\[contains\(text\(\), '(.+)'\)\]$")
+_XPATH_ATTR_RE = re.compile(r"^//([\w*]+)\[@([\w-]+)='([^']*)'\]$")
+
+
+def _load(name: str) -> Template:
+    return Template((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+
+def _set_path(record: list, path, value) -> None:
+    for index in path[:-1]:
+        if not isinstance(record[index], list):
+            record[index] = [None] * (path[-1] + 1)
+        record = record[index]
+    record[path[-1]] = value
+
+
+def _json(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class FakeMaps:
+    """
+    Dados do "Maps" simulado: `places` locais determinísticos (seed), servidos em lotes de `batch_size`
+    cards. A cada `duplicate_every` cards, um local já listado reaparece (como no feed real); um a cada
+    `legacy_every` locais usa o layout antigo da página. `latency` (segundos) é somado a cada comando.
+    `base_url` é o prefixo das URLs dos locais (o servidor de bench/mock_maps.py usa o próprio endereço).
+    """
+
+    def __init__(
+        self,
+        places: int = 120,
+        batch_size: int = 20,
+        duplicate_every: int = 15,
+        legacy_every: int = 10,
+        consent: bool = False,
+        latency: float = 0.0,
+        seed: int = 7,
+        base_url: str = "https://www.google.com/maps",
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = max(1, batch_size)
+        self.duplicate_every = duplicate_every
+        self.legacy_every = legacy_every
+        self.consent = consent
+        self.latency = latency
+        rng = random.Random(seed)
+        self.places = [self._make_place(index, rng, self.base_url) for index in range(places)]
+        self._by_id = {place["place_id"]: place for place in self.places}
+        self._feed_page = _load("search_feed.html")
+        self._card = _load("card.html")
+        self._place_page = _load("place.html")
+        self._legacy_page = _load("place_legacy.html")
+        self.feed_end_html = (FIXTURES_DIR / "feed_end.html").read_text(encoding="utf-8")
+        self.consent_html = (FIXTURES_DIR / "consent.html").read_text(encoding="utf-8")
+        # Registro gravado serve de molde: só os campos que o network_parser lê são trocados.
+        recorded = load_payload((FIXTURES_DIR / "search_payload.txt").read_text(encoding="utf-8"))
+        self._record_template = next(iter_place_records(recorded))
+
+    @staticmethod
+    def _make_place(index: int, rng: random.Random, base_url: str) -> dict:
+        category = rng.choice(_CATEGORIES)
+        name = f"{category} {rng.choice(_NAMES)} {index + 1}"
+        digits = f"31{rng.randint(30000000, 39999999)}"
+        slug = re.sub(r"[^\w]+", "-", name.lower()).strip("-")
+        place_id = f"0x{rng.getrandbits(48):x}:0x{rng.getrandbits(60):x}"
+        lat = -19.92 + rng.uniform(-0.08, 0.08)
+        lng = -43.94 + rng.uniform(-0.08, 0.08)
+        return {
+            "index": index,
+            "name": name,
+            "category": category,
+            "street": f"{rng.choice(_STREETS)}, {rng.randint(10, 2999)}",
+            "phone": f"({digits[:2]}) {digits[2:6]}-{digits[6:]}",
+            "phone_digits": f"+55{digits}",
+            "rating": f"{rng.uniform(3.5, 5.0):.1f}".replace(".", ","),
+            "reviews": str(rng.randint(3, 4000)),
+            "domain": f"{slug}.com.br",
+            "place_id": place_id,
+            "place_url": (
+                f"{base_url}/place/{quote_plus(name)}/data=!4m7!3m6!1s{place_id}"
+                f"!8m2!3d{lat:.7f}!4d{lng:.7f}!16s%2Fg%2F11c{index:07d}?entry=ttu"
+            ),
+            "has_menu": index % 3 == 0,
+            "has_delivery": index % 4 == 0,
+        }
+
+    def feed_order(self):
+        """Ordem dos cards no feed, com as repetições."""
+        order = []
+        for place in self.places:
+            order.append(place)
+            if self.duplicate_every and len(order) % self.duplicate_every == 0:
+                order.append(self.places[len(order) // 3])
+        return order
+
+    def feed_places(self, offset: int):
+        """Locais do lote que começa em `offset` e se o feed terminou com ele."""
+        order = self.feed_order()
+        batch = order[offset : offset + self.batch_size]
+        return batch, offset + len(batch) >= len(order)
+
+    def feed_batch(self, offset: int):
+        """HTML de um lote de cards a partir de `offset` e se o feed terminou com ele."""
+        batch, done = self.feed_places(offset)
+        return "".join(self.render_card(place) for place in batch), done
+
+    def render_feed(self, title: str, cards: str = "", places=()) -> str:
+        """Página da busca; `places` (o primeiro lote) vão no estado inicial embutido, como no Maps."""
+        state = self.render_initial_state([self._search_payload(title, places)]) if places else ""
+        return self._feed_page.substitute(title=html.escape(title), cards=cards, initial_state=state)
+
+    def render_record(self, place: dict) -> list:
+        record = copy.deepcopy(self._record_template)
+        address = self.place_address(place)
+        _set_path(record, FEATURE_ID_PATH, place["place_id"])
+        _set_path(record, NAME_PATH, place["name"])
+        _set_path(record, ADDRESS_PATH, address)
+        _set_path(record, FULL_ADDRESS_PATH, f"{place['name']}, {address}")
+        _set_path(record, ADDRESS_LINES_PATH, None)
+        _set_path(record, PHONE_PATH, place["phone"])
+        _set_path(record, WEBSITE_PATH, f"/url?q=https://{place['domain']}/&opi=79508299")
+        _set_path(record, GOOGLE_PLACE_ID_PATH, f"ChIJfake{place['index']:018d}")
+        return record
+
+    def _search_payload(self, term: str, places) -> str:
+        entries = [[None] * 14 + [self.render_record(place)] for place in places]
+        return XSSI_PREFIX + "\n" + _json([[term, [[None, None, None]] + entries]])
+
+    def render_payload(self, term: str, places) -> str:
+        """Corpo da resposta /search?tbm=map de um lote (mesmo formato de fixtures/search_payload.txt)."""
+        return _json({"c": 0, "d": self._search_payload(term, places)}) + '/*""*/'
+
+    @staticmethod
+    def render_initial_state(payloads) -> str:
+        state = [[None, None, None], [[None, payload] for payload in payloads]]
+        return f"<script>window.APP_INITIALIZATION_STATE={_json(state)};window.APP_FLAGS=[];</script>"
+
+    @staticmethod
+    def place_address(place: dict) -> str:
+        return f"{place['street']} - Centro, Belo Horizonte - MG, 30130-000"
+
+    def render_card(self, place: dict) -> str:
+        return self._card.substitute({key: html.escape(str(value)) for key, value in place.items()})
+
+    def render_place(self, place: dict) -> str:
+        values = {key: html.escape(str(value)) for key, value in place.items()}
+        values["address"] = html.escape(self.place_address(place))
+        values["website"] = f"https://{values['domain']}/"
+        values["plus_code"] = f"{place['index'] % 90 + 10}XQ+{place['index'] % 9}F Belo Horizonte"
+        values["menu_block"] = (
+            f'<a class="CsEnBe" data-item-id="menu" href="https://{values["domain"]}/cardapio" '
+            'aria-label="Cardápio"><div class="Io6YTe">Cardápio</div></a>'
+            if place["has_menu"]
+            else ""
+        )
+        values["delivery_block"] = (
+            f'<a class="CsEnBe" data-item-id="action:order" href="https://pedido.exemplo/{place["index"]}" '
+            'aria-label="Fazer pedido"><div class="Io6YTe">Fazer pedido</div></a>'
+            if place["has_delivery"]
+            else ""
+        )
+        values["initial_state"] = self.render_initial_state(
+            [XSSI_PREFIX + "\n" + _json([None] * 6 + [self.render_record(place)])]
+        )
+        legacy = self.legacy_every and place["index"] % self.legacy_every == self.legacy_every - 1
+        page = self._legacy_page if legacy else self._place_page
+        return page.substitute(values)
+
+    def find_place(self, url: str):
+        return self._by_id.get(extract_place_id_from_url(url))
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def frame(self, frame) -> None:
+        self._driver.execute("switchToFrame", {"id": frame})
+
+    def default_content(self) -> None:
+        self._driver.execute("switchToFrame", {"id": None})
+
+
+class FakeElement:
+    """Elemento sobre um nó de page_parser; cada acesso é um comando, como no WebElement."""
+
+    def __init__(self, parent, node):
+        self._parent = parent
+        self.node = node
+
+    @property
+    def text(self) -> str:
+        return self._parent.execute("getElementText", {"node": self.node})
+
+    @property
+    def tag_name(self) -> str:
+        return self._parent.execute("getElementTagName", {"node": self.node})
+
+    def get_attribute(self, name: str):
+        return self._parent.execute("getElementAttribute", {"node": self.node, "name": name})
+
+    def is_displayed(self) -> bool:
+        return self._parent.execute("isElementDisplayed", {"node": self.node})
+
+    def click(self) -> None:
+        self._parent.execute("clickElement", {"node": self.node})
+
+    def clear(self) -> None:
+        self._parent.execute("clearElement", {"node": self.node})
+
+    def send_keys(self, *value) -> None:
+        self._parent.execute("sendKeysToElement", {"node": self.node, "value": value})
+
+    def find_element(self, by: str, value: str):
+        return self._parent.execute("findChildElement", {"root": self.node, "using": by, "value": value})
+
+    def find_elements(self, by: str, value: str):
+        return self._parent.execute("findChildElements", {"root": self.node, "using": by, "value": value})
+
+
+class FakeDriver:
+    """
+    Subconjunto do webdriver.Chrome usado pelo searcher. URLs com /maps/place/ abrem a página do
+    local; as demais abrem o feed da busca. Scripts do searcher são reconhecidos pelo conteúdo e
+    reimplementados em Python sobre a árvore do page_parser.
+    """
+
+    def __init__(self, site: FakeMaps, performance_log: bool = False):
+        self.site = site
+        self.searchmaps_performance_log = performance_log
+        self.switch_to = _SwitchTo(self)
+        self._url = "about:blank"
+        self._html = ""
+        self._root = parse_html("")
+        self._feed = None
+        self._pending = []
+        self._consented = not site.consent
+        self._term = ""
+        self._log = []
+        self._bodies = {}
+        self._requests = 0
+
+    # --- API pública (cada chamada é um round trip) ---
+
+    def execute(self, driver_command: str, params=None):
+        if self.site.latency:
+            time.sleep(self.site.latency)
+        handler = getattr(self, "_cmd_" + driver_command, None)
+        if handler is None:
+            return None
+        return handler(**(params or {}))
+
+    def get(self, url: str) -> None:
+        self.execute("get", {"url": url})
+
+    @property
+    def current_url(self) -> str:
+        return self.execute("getCurrentUrl")
+
+    @property
+    def page_source(self) -> str:
+        return self.execute("getPageSource")
+
+    def find_element(self, by: str, value: str):
+        return self.execute("findElement", {"using": by, "value": value})
+
+    def find_elements(self, by: str, value: str):
+        return self.execute("findElements", {"using": by, "value": value})
+
+    def execute_script(self, script: str, *args):
+        return self.execute("executeScript", {"script": script, "args": args})
+
+    def execute_async_script(self, script: str, *args):
+        return self.execute("executeAsyncScript", {"script": script, "args": args})
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})
+
+    def set_script_timeout(self, time_to_wait: float) -> None:
+        self.execute("setTimeouts", {"script": time_to_wait})
+
+    def get_log(self, log_type: str):
+        return self.execute("getLog", {"type": log_type})
+
+    def quit(self) -> None:
+        self.execute("quit")
+
+    # --- Comandos ---
+
+    def _cmd_get(self, url: str) -> None:
+        self._url = url
+        self._feed = None
+        self._pending = []
+        if "/maps/place/" in url:
+            place = self.site.find_place(url)
+            self._html = self.site.render_place(place) if place else "<html><body></body></html>"
+            self._root = parse_html(self._html)
+        else:
+            title = unquote_plus(url.rstrip("/").rsplit("/", 1)[-1]) if "/maps/search/" in url else "Google Maps"
+            searching = "/maps/search/" in url
+            first = self.site.feed_order()[: self.site.batch_size] if searching else ()
+            self._html = self.site.render_feed(title, places=first)
+            self._root = parse_html(self._html)
+            if searching:
+                self._term = title
+                self._feed = self._root.select_first("div[role='feed']")
+                self._pending = self.site.feed_order()
+                self._load_batch(initial=True)
+        if not self._consented:
+            body = self._root.select_first("body") or self._root
+            self._append(body, self.site.consent_html, first=True)
+
+    def _cmd_getCurrentUrl(self) -> str:
+        return self._url
+
+    def _cmd_getPageSource(self) -> str:
+        return self._html
+
+    def _cmd_findElement(self, using: str, value: str, root=None):
+        found = self._select(root or self._root, using, value)
+        if not found:
+            raise NoSuchElementException(f"Elemento não encontrado: {value}")
+        return FakeElement(self, found[0])
+
+    def _cmd_findElements(self, using: str, value: str, root=None):
+        return [FakeElement(self, node) for node in self._select(root or self._root, using, value)]
+
+    _cmd_findChildElement = _cmd_findElement
+    _cmd_findChildElements = _cmd_findElements
+
+    def _cmd_getElementText(self, node) -> str:
+        return node.text
+
+    def _cmd_getElementTagName(self, node) -> str:
+        return node.tag
+
+    def _cmd_getElementAttribute(self, node, name: str):
+        return node.attrs.get(name)
+
+    def _cmd_isElementDisplayed(self, node) -> bool:
+        return True
+
+    def _cmd_clickElement(self, node) -> None:
+        self._click(node)
+
+    def _cmd_executeScript(self, script: str, args):
+        args = [arg.node if isinstance(arg, FakeElement) else arg for arg in args]
+        if "data-sm-read" in script:
+            return self._read_cards(*args[:2])
+        if "scrollTop" in script:
+            self._load_batch()
+            return 0
+        if "consentGroups" in script:
+            return self._scan_popups(*args[:2])
+        return None
+
+    def _cmd_executeAsyncScript(self, script: str, args):
+        args = [arg.node if isinstance(arg, FakeElement) else arg for arg in args]
+        if "previousCount" in script:
+            return self._check_feed(*args[:4])
+        if "offsetParent" in script:
+            if self._feed is not None and self._feed.select_first("div.Nv2PK") is not None:
+                return FakeElement(self, self._feed)
+            return None
+        return None
+
+    def _cmd_executeCdpCommand(self, cmd: str, params: dict):
+        if cmd == "Network.getAllCookies":
+            return {"cookies": []}
+        if cmd == "Network.getResponseBody":
+            return {"body": self._bodies.pop(params["requestId"], ""), "base64Encoded": False}
+        return {}
+
+    def _cmd_getLog(self, type: str):
+        if type != "performance" or not self.searchmaps_performance_log:
+            return []
+        entries, self._log = self._log, []
+        return entries
+
+    # --- Simulação da página ---
+
+    @staticmethod
+    def _append(parent, fragment: str, first: bool = False) -> None:
+        nodes = [child for child in parse_html(fragment).children if not isinstance(child, str)]
+        for node in nodes:
+            node.parent = parent
+        if first:
+            parent.children[0:0] = nodes
+        else:
+            parent.children.extend(nodes)
+
+    def _log_event(self, method: str, **params) -> None:
+        message = {"message": {"method": method, "params": params}, "webview": "fake"}
+        self._log.append({"level": "INFO", "message": json.dumps(message), "timestamp": int(time.time() * 1000)})
+
+    def _load_batch(self, initial: bool = False) -> None:
+        # Lazy loading do feed: cada rolagem acrescenta um lote; esgotado, aparece o fim da lista.
+        # O primeiro lote vem no HTML (estado inicial); os seguintes, de uma resposta JSON da rede.
+        if self._feed is None:
+            return
+        batch, self._pending = self._pending[: self.site.batch_size], self._pending[self.site.batch_size :]
+        if batch and not initial and self.searchmaps_performance_log:
+            self._requests += 1
+            request_id = f"fake.{self._requests}"
+            self._bodies[request_id] = self.site.render_payload(self._term, batch)
+            url = f"https://www.google.com/search?tbm=map&authuser=0&hl=pt-BR&q={quote_plus(self._term)}"
+            self._log_event("Network.responseReceived", requestId=request_id, response={"url": url, "status": 200})
+            self._log_event("Network.loadingFinished", requestId=request_id)
+        if batch:
+            self._append(self._feed, "".join(self.site.render_card(place) for place in batch))
+        elif not self._feed.select_first("div.PbZDve"):
+            self._append(self._feed, self.site.feed_end_html)
+
+    def _select(self, root, using: str, value: str):
+        if using == By.CSS_SELECTOR:
+            return list(root.select_all(value))
+        if using == By.CLASS_NAME:
+            return list(root.select_all("." + value))
+        if using == By.TAG_NAME:
+            return list(root.select_all(value))
+        if using == By.XPATH:
+            match = _END_TEXT_RE.match(value)
+            if match:
+                text = match.group(1)
+                return [
+                    node
+                    for node in root.iter_descendants()
+                    if any(isinstance(child, str) and text in child for child in node.children)
+                ]
+            match = _XPATH_ATTR_RE.match(value)
+            if match:
+                tag, name, expected = match.groups()
+                return list(root.select_all(f"{'' if tag == '*' else tag}[{name}='{expected}']"))
+        raise NoSuchElementException(f"Seletor não suportado pelo driver falso: {using}={value}")
+
+    def _read_cards(self, start=0, only_new=False):
+        # Mesmo contrato de searcher._READ_CARDS_SCRIPT.
+        cards = list(self._root.select_all("div.Nv2PK"))
+        start = start or 0
+        if start < 0:
+            start = max(len(cards) + start, 0)
+        items = []
+        for card in cards[start:]:
+            if only_new:
+                if "data-sm-read" in card.attrs:
+                    continue
+                card.attrs["data-sm-read"] = "1"
+            link = None
+            for selector in ("a.hfpxzc", "a[href*='/maps/place/']", "a[href*='google.com/maps/place']"):
+                link = card.select_first(selector)
+                if link is not None:
+                    break
+            text = card.text
+            items.append(
+                {
+                    "text": text,
+                    "title": text.split("\n")[0].strip() if text else "",
+                    "place_url": link.get_attribute("href") if link is not None else "",
+                    "place_id": card.get_attribute("data-place-id"),
+                    "cid": card.get_attribute("data-cid"),
+                }
+            )
+        return {"count": len(cards), "items": items}
+
+    def _check_feed(self, container, previous_count, previous_last_url, end_texts):
+        # Mesmo contrato de searcher._WAIT_CARDS_SCRIPT; sem mudança, o "timeout" é imediato.
+        root = container or self._root
+        cards = list(root.select_all("div.Nv2PK"))
+        if len(cards) > previous_count:
+            return "cards"
+        if cards and previous_last_url:
+            link = cards[-1].select_first("a[href]")
+            current = link.get_attribute("href") if link is not None else ""
+            if current and current != previous_last_url:
+                return "cards"
+        tail = next((child for child in reversed(root.children) if not isinstance(child, str)), None)
+        if tail is not None and any(text in tail.text for text in end_texts):
+            return "end"
+        return "timeout"
+
+    def _scan_popups(self, consent_groups, close_groups):
+        # Mesmo contrato de searcher._POPUP_SCRIPT (sem iframes).
+        buttons = list(self._root.select_all("button, div[role='button']"))
+        labels = [f"{button.text} {button.get_attribute('aria-label')}".strip().lower() for button in buttons]
+        clicked = None
+        for groups in (consent_groups, close_groups):
+            for group in groups or []:
+                for button, label in zip(buttons, labels):
+                    if label and any(text in label for text in group["texts"]):
+                        self._click(button)
+                        clicked = group["kind"]
+                        break
+                if clicked:
+                    break
+            if clicked:
+                break
+        return {"clicked": clicked, "consentFrames": 0, "consented": self._consented and self.site.consent}
+
+    def _click(self, node) -> None:
+        dialog = node
+        while dialog is not None and dialog.get_attribute("role") != "dialog":
+            dialog = dialog.parent
+        if dialog is not None and dialog.parent is not None:
+            dialog.parent.children.remove(dialog)
+            self._consented = True
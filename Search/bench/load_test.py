@@ -0,0 +1,161 @@
+"""
+Teste de carga ponta a ponta da API (/api/search e a fila de api/jobs.py) contra o mock do Maps.
+
+1. python -m bench.mock_maps --latency-ms 120 --jitter-ms 80          (a partir de Search/)
+2. SEARCHMAPS_MAPS_BASE_URL=http://127.0.0.1:8765/maps SEARCHMAPS_DRIVER_POOL_SIZE=4 \\
+   SEARCHMAPS_MAX_PARALLEL_JOBS=4 SEARCHMAPS_MAX_QUEUE_JOBS=20 SEARCHMAPS_RATE_LIMIT_SECONDS=0 \\
+   SEARCHMAPS_DEMO_MAX_LIMIT=50 SEARCHMAPS_SEARCH_CACHE_TTL=0 \\
+   uvicorn api.main:app --port 8000                                   (a partir da raiz)
+3. python -m bench.load_test --api http://127.0.0.1:8000 --jobs 20 --concurrency 4
+
+Cada job usa um termo diferente (o cache de buscas não mascara o resultado) e um X-Forwarded-For
+próprio. Fila cheia (429) é repetida com espera e contada. Reporta vazão (jobs/min, locais/s) e a
+latência por job (do POST até status final): p50, p90, p95, p99 e máxima.
+"""
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+FINAL_STATUSES = ("done", "error", "canceled")
+
+
+def _request(method: str, url: str, payload=None, headers=None, timeout: float = 30.0):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    for name, value in (headers or {}).items():
+        request.add_header(name, value)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def percentile(values, fraction: float) -> float:
+    """Percentil pelo método nearest-rank (0 para lista vazia)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def run_job(api: str, index: int, args, counters: dict, lock: threading.Lock) -> dict:
+    payload = {
+        "city": args.city,
+        "query": f"{args.query} {index}",
+        "limit": args.limit,
+        "mode": args.mode,
+    }
+    headers = {"X-Forwarded-For": f"10.77.{index // 250}.{index % 250 + 1}"}
+    start = time.perf_counter()
+    job_id = None
+    while job_id is None:
+        try:
+            job_id = _request("POST", f"{api}/api/search", payload, headers)["jobId"]
+        except urllib.error.HTTPError as exc:
+            if exc.code != 429:
+                return {"index": index, "status": f"http_{exc.code}", "seconds": time.perf_counter() - start, "results": 0}
+            with lock:
+                counters["rejected"] += 1
+            time.sleep(args.retry_seconds)
+        if time.perf_counter() - start > args.timeout:
+            return {"index": index, "status": "timeout", "seconds": time.perf_counter() - start, "results": 0}
+
+    status = {}
+    while time.perf_counter() - start < args.timeout:
+        status = _request("GET", f"{api}/api/status/{job_id}")
+        if status.get("status") in FINAL_STATUSES:
+            break
+        time.sleep(args.poll_seconds)
+    seconds = time.perf_counter() - start
+    if status.get("status") not in FINAL_STATUSES:
+        return {"index": index, "job_id": job_id, "status": "timeout", "seconds": seconds, "results": 0}
+
+    total = 0
+    if status["status"] == "done":
+        total = _request("GET", f"{api}/api/results/{job_id}").get("total", 0)
+    return {
+        "index": index,
+        "job_id": job_id,
+        "status": status["status"],
+        "error": status.get("error"),
+        "seconds": seconds,
+        "results": total,
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Teste de carga da API do SearchMaps (use com bench.mock_maps).")
+    parser.add_argument("--api", default="http://127.0.0.1:8000", help="URL base da API.")
+    parser.add_argument("--jobs", type=int, default=20, help="Total de buscas.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Buscas submetidas ao mesmo tempo.")
+    parser.add_argument("--city", default="Belo Horizonte")
+    parser.add_argument("--query", default="pizzaria")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--mode", choices=("full", "list_only", "hybrid"), default="full")
+    parser.add_argument("--poll-seconds", type=float, default=0.5)
+    parser.add_argument("--retry-seconds", type=float, default=2.0, help="Espera após um 429 (fila cheia).")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Tempo máximo por job, em segundos.")
+    parser.add_argument("--json", dest="json_path", help="Grava o resumo e os jobs em JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    api = args.api.rstrip("/")
+    counters = {"rejected": 0}
+    lock = threading.Lock()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [executor.submit(run_job, api, index, args, counters, lock) for index in range(args.jobs)]
+        jobs = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    done = [job for job in jobs if job["status"] == "done"]
+    latencies = [job["seconds"] for job in done]
+    places = sum(job["results"] for job in done)
+    summary = {
+        "jobs": len(jobs),
+        "done": len(done),
+        "failed": len(jobs) - len(done),
+        "rejected_429": counters["rejected"],
+        "elapsed_seconds": round(elapsed, 2),
+        "jobs_per_minute": round(len(done) / elapsed * 60, 2) if elapsed else 0.0,
+        "places_per_second": round(places / elapsed, 2) if elapsed else 0.0,
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p90": round(percentile(latencies, 0.90), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2) if latencies else 0.0,
+        },
+    }
+
+    latency = summary["latency_seconds"]
+    print(
+        f"[SearchMaps] Carga concluída | jobs={summary['done']}/{summary['jobs']} | falhas={summary['failed']} | "
+        f"429={summary['rejected_429']} | tempo={summary['elapsed_seconds']}s | "
+        f"vazão={summary['jobs_per_minute']} jobs/min, {summary['places_per_second']} locais/s"
+    )
+    print(
+        f"[SearchMaps] Latência por job (s) | p50={latency['p50']} | p90={latency['p90']} | "
+        f"p95={latency['p95']} | p99={latency['p99']} | máx={latency['max']}"
+    )
+    for job in jobs:
+        if job["status"] != "done":
+            print(f"[SearchMaps]   job {job['index']}: {job['status']} {job.get('error') or ''}".rstrip())
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump({"summary": summary, "jobs": jobs}, handle, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.json_path}")
+    return 0 if len(done) == len(jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Servidor HTTP local que se passa pelo Google Maps, para testes de carga ponta a ponta com o Chrome
+de verdade (sem rede). Serve as fixtures de bench/fixtures: feed de busca com cards div.Nv2PK
+carregados por JavaScript a cada rolagem, páginas de local com os campos data-item-id, tela de
+consentimento e latência configurável com jitter.
+
+Uso (a partir de Search/):
+    python -m bench.mock_maps --port 8765 --places 120 --latency-ms 150 --jitter-ms 100 --consent
+    SEARCHMAPS_MAPS_BASE_URL=http://127.0.0.1:8765/maps python main.py
+
+Rotas (prefixo /maps, o mesmo do Maps):
+    /maps                       página inicial
+    /maps/search/<termo>        feed de resultados ("<termo> em <cidade>" ou busca em tile com /@lat,lng,zoomz);
+                                só o nome da cidade redireciona para a página da cidade, com o viewport na URL
+    /maps/place/<nome>/data=... página do local (o id vem do trecho !1s da URL)
+    /maps/_feed?term=&offset=   próximo lote do feed (usado pelo JavaScript da página)
+    /search?tbm=map&q=&offset=  o mesmo lote em JSON, baixado antes dos cards como no Maps (extração por rede)
+
+O primeiro lote da busca e a página de cada local também trazem os registros no estado inicial
+embutido (window.APP_INITIALIZATION_STATE), como o Maps.
+"""
+import argparse
+import html
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote_plus, urlsplit
+
+from bench.fake_driver import FakeMaps
+from page_parser import extract_place_id_from_url
+
+# Estilo mínimo para o feed ter rolagem (o searcher rola o container role=feed).
+_FEED_STYLE = """
+<style>
+  div[role='feed'] { height: 900px; overflow-y: auto; }
+  div.Nv2PK { min-height: 120px; border-bottom: 1px solid #ddd; }
+</style>
+"""
+
+# Carrega o próximo lote quando a rolagem chega perto do fim, como o feed do Maps.
+_FEED_SCRIPT = """
+<script>
+(function () {
+  const feed = document.querySelector("div[role='feed']");
+  const term = %(term)s;
+  let offset = %(offset)d;
+  let loading = false;
+  let done = %(done)s;
+  function maybeLoad() {
+    if (loading || done || feed.scrollTop + feed.clientHeight < feed.scrollHeight - 300) { return; }
+    loading = true;
+    fetch('/search?tbm=map&q=' + encodeURIComponent(term) + '&offset=' + offset)
+      .catch(() => null)
+      .then(() => fetch('/maps/_feed?term=' + encodeURIComponent(term) + '&offset=' + offset))
+      .then((response) => response.text().then((body) => [body, response.headers.get('X-Feed-End') === '1']))
+      .then(([body, end]) => {
+        feed.insertAdjacentHTML('beforeend', body);
+        offset += %(batch)d;
+        done = end;
+        loading = false;
+      })
+      .catch(() => { loading = false; });
+  }
+  feed.addEventListener('scroll', maybeLoad);
+})();
+</script>
+"""
+
+# Aceitar/rejeitar grava o cookie de consentimento e fecha o diálogo (sem enviar o formulário).
+_CONSENT_SCRIPT = """
+<script>
+document.querySelectorAll("div[role='dialog'] button").forEach((button) => {
+  button.addEventListener('click', (event) => {
+    event.preventDefault();
+    document.cookie = 'SOCS=CAISHAgBEhJnd3NfMjAyMzA4MTUtMF9SQzIaAnB0IAEaBgiA_LyaBg; path=/; max-age=31536000';
+    button.closest("div[role='dialog']").remove();
+  });
+});
+</script>
+"""
+
+
+class MockMaps:
+    """Estado do servidor: um FakeMaps por termo de busca (semente estável) e o índice de locais."""
+
+    def __init__(
+        self,
+        base_url: str,
+        places: int = 120,
+        batch_size: int = 20,
+        consent: bool = False,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        center=(-19.9191, -43.9386),
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.places = places
+        self.batch_size = batch_size
+        self.consent = consent
+        self.latency = latency
+        self.jitter = jitter
+        self.center = center
+        self._sites = {}
+        self._place_sites = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def site(self, term: str) -> FakeMaps:
+        key = term.strip().lower()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                site = FakeMaps(
+                    places=self.places,
+                    batch_size=self.batch_size,
+                    seed=zlib.crc32(key.encode("utf-8")),
+                    base_url=self.base_url,
+                )
+                self._sites[key] = site
+                for place in site.places:
+                    self._place_sites[place["place_id"]] = site
+            return site
+
+    def place_site(self, url: str):
+        with self._lock:
+            site = self._place_sites.get(extract_place_id_from_url(url))
+        if site is None:
+            return None, None
+        return site, site.find_place(url)
+
+    def delay(self) -> None:
+        with self._lock:
+            self.requests += 1
+        seconds = self.latency + random.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockMaps/1.0"
+    mock: MockMaps = None
+    verbose = False
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.mock.delay()
+        parts = urlsplit(self.path)
+        path = parts.path
+        if path in ("/maps", "/maps/"):
+            self._page(self.mock.site("").render_feed("Google Maps"))
+        elif path == "/maps/_feed":
+            self._feed_batch(parse_qs(parts.query))
+        elif path == "/search":
+            self._payload(parse_qs(parts.query))
+        elif path.startswith("/maps/search/"):
+            self._search(path[len("/maps/search/") :])
+        elif path.startswith("/maps/place/"):
+            self._place(path)
+        else:
+            self.send_error(404)
+
+    def _search(self, rest: str) -> None:
+        term, _, viewport = rest.partition("/@")
+        term = unquote_plus(term.strip("/"))
+        if not viewport and " em " not in term:
+            # Só a cidade: o Maps abre a página da cidade com o viewport na URL (ver _resolve_city_bounds).
+            lat, lng = self.mock.center
+            self.send_response(302)
+            self.send_header("Location", f"/maps/place/{quote(term)}/@{lat},{lng},12z/data=!3m1!4b1")
+            self.end_headers()
+            return
+        query = term.split(" em ")[0]
+        site = self.mock.site(query)
+        places, done = site.feed_places(0)
+        cards = "".join(site.render_card(place) for place in places)
+        if done:
+            cards += site.feed_end_html
+        script = _FEED_SCRIPT % {
+            "term": json.dumps(query),
+            "offset": site.batch_size,
+            "batch": site.batch_size,
+            "done": "true" if done else "false",
+        }
+        self._page(site.render_feed(term, cards=cards, places=places), extra=_FEED_STYLE + script)
+
+    def _feed_batch(self, params) -> None:
+        term = (params.get("term") or [""])[0]
+        offset = int((params.get("offset") or ["0"])[0])
+        site = self.mock.site(term)
+        cards, done = site.feed_batch(offset)
+        if done:
+            cards += site.feed_end_html
+        self._send(cards, headers={"X-Feed-End": "1" if done else "0"})
+
+    def _payload(self, params) -> None:
+        term = (params.get("q") or [""])[0]
+        offset = int((params.get("offset") or ["0"])[0])
+        site = self.mock.site(term)
+        places, _ = site.feed_places(offset)
+        self._send(site.render_payload(term, places), content_type="application/json; charset=utf-8")
+
+    def _place(self, path: str) -> None:
+        site, place = self.mock.place_site(path)
+        if place is not None:
+            self._page(site.render_place(place))
+            return
+        # Página de cidade (destino do redirecionamento de _search).
+        name = html.escape(unquote_plus(path[len("/maps/place/") :].split("/")[0]))
+        self._page(f'<html><body><h1 class="DUwDvf lfPIob">{name}</h1></body></html>')
+
+    def _page(self, body: str, extra: str = "") -> None:
+        cookies = self.headers.get("Cookie") or ""
+        if self.mock.consent and "SOCS=" not in cookies:
+            extra += self.mock.site("").consent_html + _CONSENT_SCRIPT
+        if extra:
+            index = body.rfind("</body>")
+            body = body[:index] + extra + body[index:] if index >= 0 else body + extra
+        self._send(body)
+
+    def _send(self, body: str, headers: dict = None, content_type: str = "text/html; charset=utf-8") -> None:
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def create_server(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    places: int = 120,
+    batch_size: int = 20,
+    consent: bool = False,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    verbose: bool = False,
+) -> ThreadingHTTPServer:
+    """Cria o servidor (ainda parado); `server.server_address` tem a porta real se `port` for 0."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    address, real_port = server.server_address[:2]
+    mock = MockMaps(
+        f"http://{address}:{real_port}/maps",
+        places=places,
+        batch_size=batch_size,
+        consent=consent,
+        latency=latency,
+        jitter=jitter,
+    )
+    server.RequestHandlerClass = type("MockMapsHandler", (_Handler,), {"mock": mock, "verbose": verbose})
+    server.mock = mock
+    return server
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Servidor local que imita o Google Maps (testes de carga).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--places", type=int, default=120, help="Locais por termo de busca.")
+    parser.add_argument("--batch", type=int, default=20, help="Cards por lote do feed.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência base de cada resposta.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variação aleatória (+/-) da latência.")
+    parser.add_argument("--consent", action="store_true", help="Mostra a tela de consentimento até o cookie existir.")
+    parser.add_argument("--verbose", action="store_true", help="Loga cada requisição.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    server = create_server(
+        args.host,
+        args.port,
+        places=args.places,
+        batch_size=args.batch,
+        consent=args.consent,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        verbose=args.verbose,
+    )
+    print(f"[SearchMaps] Mock do Maps em {server.mock.base_url} (SEARCHMAPS_MAPS_BASE_URL)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[SearchMaps] Mock encerrado | requisições={server.mock.requests}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
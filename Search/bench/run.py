@@ -0,0 +1,257 @@
+"""
+Benchmark offline do searcher: roda Fase A, Fase B e deduplicação contra o driver falso
+(bench/fake_driver.py), sem Chrome e sem rede.
+
+Uso (a partir de Search/):
+    python -m bench.run --places 200 --repeat 3 --json bench-resultados.json
+
+Para cada cenário reporta locais/segundo, comandos WebDriver por local e pico de memória
+(tracemalloc, medido em uma execução separada para não distorcer o tempo). As pausas que imitam
+um usuário (_human_delay) são desligadas; `--latency-ms` simula o custo de cada round trip.
+Os cenários *_network usam a extração pelos payloads JSON (SEARCHMAPS_DETAILS_PARSER=network) e
+`decode` confere o network_parser contra os payloads gravados em fixtures (payload_expected.json).
+"""
+import argparse
+import io
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from urllib.parse import quote_plus
+
+from tabulate import tabulate
+
+import searcher
+from command_profiler import CommandProfiler, attach_profiler, command_phase
+from network_parser import decode_payload
+from bench.fake_driver import FIXTURES_DIR, FakeDriver, FakeMaps
+
+SCENARIOS = (
+    "collect",
+    "collect_network",
+    "details_dom",
+    "details_snapshot",
+    "details_network",
+    "decode",
+    "dedup",
+    "search",
+)
+CITY = "Belo Horizonte, MG"
+QUERY = "pizzaria"
+
+
+def _search_url() -> str:
+    return f"{searcher.MAPS_BASE_URL}/search/{quote_plus(f'{QUERY} em {CITY}')}"
+
+
+def _collect(site: FakeMaps, profiler: CommandProfiler, network: bool = False) -> int:
+    driver = FakeDriver(site, performance_log=network)
+    attach_profiler(driver, profiler)
+    driver.get(_search_url())
+    parser = searcher.DETAILS_PARSER
+    searcher.DETAILS_PARSER = "network" if network else "dom"
+    try:
+        with command_phase("phase_a"):
+            items, metrics = searcher.collect_listing_urls(
+                limit=len(site.places), timeout=5, return_metrics=True, driver=driver
+            )
+    finally:
+        searcher.DETAILS_PARSER = parser
+    if metrics["stop_reason"] not in ("limit", "end_marker"):
+        raise RuntimeError(f"Fase A parou por {metrics['stop_reason']}")
+    if network:
+        # Com os payloads, todo card já sai da Fase A com os detalhes (a Fase B não abre páginas).
+        missing = [item["title"] for item in items if not (item.get("network_details") or {}).get("phone")]
+        if missing:
+            raise RuntimeError(f"Cards sem detalhes da rede: {missing[:5]}")
+    return len(items)
+
+
+def _decode(site: FakeMaps, profiler: CommandProfiler) -> int:
+    # Só CPU: decodifica os payloads gravados (e um lote gerado do tamanho do feed) e confere os campos.
+    expected = json.loads((FIXTURES_DIR / "payload_expected.json").read_text(encoding="utf-8"))
+    decoded = 0
+    for name, places in expected.items():
+        body = (FIXTURES_DIR / name).read_text(encoding="utf-8")
+        for _ in range(50):
+            result = decode_payload(body)
+            if result != places:
+                raise RuntimeError(f"{name}: decodificação diferente do esperado: {result}")
+            decoded += len(result)
+    body = site.render_payload(QUERY, site.places)
+    result = decode_payload(body)
+    if [place["name"] for place in result] != [place["name"] for place in site.places]:
+        raise RuntimeError("Payload gerado decodificado com locais diferentes")
+    return decoded + len(result)
+
+
+def _details(site: FakeMaps, profiler: CommandProfiler, parser: str) -> int:
+    driver = FakeDriver(site, performance_log=parser == "network")
+    attach_profiler(driver, profiler)
+    count = 0
+    with command_phase("phase_b"):
+        for place in site.places:
+            details = searcher.extract_place_details(place["place_url"], timeout=5, driver=driver, parser=parser)
+            if details.get("name") != place["name"] or not details.get("phone"):
+                raise RuntimeError(f"Detalhes incompletos para {place['name']}: {details}")
+            count += 1
+    return count
+
+
+def _dedup(site: FakeMaps, profiler: CommandProfiler) -> int:
+    # Só CPU: a mesma deduplicação da Fase A (chave de listagem) e do resultado final, com repetições
+    # e variações de URL (parâmetros e fragmentos diferentes para o mesmo local).
+    listings = []
+    for round_index in range(20):
+        for place in site.feed_order():
+            url = place["place_url"] if round_index % 2 == 0 else f"{place['place_url']}&authuser=0#r{round_index}"
+            listings.append({"title": place["name"], "place_url": url, "place_id": "", "cid": ""})
+    seen = set()
+    unique = []
+    for item in listings:
+        key = searcher._build_listing_key(item)
+        if key and key in seen:
+            continue
+        seen.add(key)
+        unique.append(item)
+    finals = set()
+    for item in unique:
+        finals.add(searcher._build_final_key(searcher._merge_listing_details(CITY, QUERY, item, {"name": item["title"]})))
+    if len(finals) != len(site.places):
+        raise RuntimeError(f"Deduplicação devolveu {len(finals)} locais (esperado {len(site.places)})")
+    return len(listings)
+
+
+def _search(site: FakeMaps, profiler: CommandProfiler) -> int:
+    # Caminho completo (pool, pipeline, merge), com drivers falsos no lugar do Chrome.
+    create_driver = searcher._create_driver
+    searcher._create_driver = lambda headless=True, slot=0: FakeDriver(
+        site, performance_log=searcher.DETAILS_PARSER == "network"
+    )
+    try:
+        results = searcher.search_places(CITY, QUERY, limit=len(site.places), timeout=5, profiler=profiler)
+    finally:
+        searcher.shutdown_drivers()
+        searcher._create_driver = create_driver
+    if len(results) != len(site.places):
+        raise RuntimeError(f"Busca devolveu {len(results)} locais (esperado {len(site.places)})")
+    return len(results)
+
+
+_RUNNERS = {
+    "collect": _collect,
+    "collect_network": lambda site, profiler: _collect(site, profiler, network=True),
+    "details_dom": lambda site, profiler: _details(site, profiler, "dom"),
+    "details_snapshot": lambda site, profiler: _details(site, profiler, "snapshot"),
+    "details_network": lambda site, profiler: _details(site, profiler, "network"),
+    "decode": _decode,
+    "dedup": _dedup,
+    "search": _search,
+}
+
+
+def run_scenario(name: str, site: FakeMaps, repeat: int = 3) -> dict:
+    """Executa o cenário `repeat` vezes (melhor tempo) e uma vez com tracemalloc para a memória."""
+    runner = _RUNNERS[name]
+    best = None
+    profiler = None
+    places = 0
+    for _ in range(max(1, repeat)):
+        profiler = CommandProfiler(name)
+        start = time.perf_counter()
+        places = runner(site, profiler)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        runner(site, CommandProfiler(name))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    report = profiler.report()
+    return {
+        "scenario": name,
+        "places": places,
+        "seconds": round(best, 4),
+        "places_per_second": round(places / best, 1) if best else 0.0,
+        "commands": report["commands"],
+        "commands_per_place": round(report["commands"] / places, 2) if places else 0.0,
+        "peak_kb": round(peak / 1024, 1),
+        "top_commands": report["rows"][:5],
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark offline do SearchMaps (driver falso, sem rede).")
+    parser.add_argument("--places", type=int, default=120, help="Locais no feed simulado.")
+    parser.add_argument("--batch", type=int, default=20, help="Cards carregados por rolagem.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência simulada por comando WebDriver.")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por cenário (vale o melhor tempo).")
+    parser.add_argument("--consent", action="store_true", help="Mostra a tela de consentimento na primeira página.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Cenários (padrão: todos).")
+    parser.add_argument("--json", dest="json_path", help="Grava os resultados em JSON (para comparar versões).")
+    parser.add_argument("--verbose", action="store_true", help="Mostra os logs do searcher durante os cenários.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    site = FakeMaps(
+        places=args.places, batch_size=args.batch, consent=args.consent, latency=args.latency_ms / 1000
+    )
+    searcher._human_delay = lambda *_, **__: None
+
+    results = []
+    for name in args.scenario or SCENARIOS:
+        with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            results.append(run_scenario(name, site, repeat=args.repeat))
+
+    print(
+        tabulate(
+            [
+                [
+                    item["scenario"],
+                    item["places"],
+                    f"{item['seconds']:.3f}",
+                    item["places_per_second"],
+                    item["commands_per_place"],
+                    item["peak_kb"],
+                ]
+                for item in results
+            ],
+            headers=["cenário", "locais", "tempo (s)", "locais/s", "comandos/local", "pico (KB)"],
+            tablefmt="github",
+        )
+    )
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"RSS máximo do processo: {max_rss_kb / 1024:.1f} MB")
+
+    if args.json_path:
+        payload = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "places": args.places,
+                "batch": args.batch,
+                "latency_ms": args.latency_ms,
+                "repeat": args.repeat,
+                "consent": args.consent,
+            },
+            "max_rss_kb": max_rss_kb,
+            "results": results,
+        }
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+# Cookies que indicam consentimento já dado no domínio do Google.
+CONSENT_COOKIE_NAMES = ("SOCS", "CONSENT")
+COOKIE_DOMAINS = ("google.",)
+# Campos de Network.getAllCookies aceitos de volta por Network.setCookies (CookieParam).
+_COOKIE_PARAM_KEYS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires", "priority")
+
+_JAR_LOCK = threading.Lock()
+
+
+def configure_profile(options, base_dir: str, name: str) -> str:
+    """
+    Usa um user-data-dir persistente em `base_dir/name` (um por driver: o Chrome trava o diretório).
+    Cache HTTP, cookies e consentimento sobrevivem a reinícios.
+    """
+    path = Path(base_dir).expanduser().resolve() / name
+    path.mkdir(parents=True, exist_ok=True)
+    options.add_argument(f"--user-data-dir={path}")
+    return str(path)
+
+
+def _is_google_cookie(cookie: dict) -> bool:
+    domain = (cookie.get("domain") or "").lower()
+    return any(part in domain for part in COOKIE_DOMAINS)
+
+
+def load_cookies(driver, path: str) -> list:
+    """Carrega o cookie jar salvo via CDP (não exige navegar até o domínio). Retorna os cookies aplicados."""
+    if not path or not os.path.exists(path) or not hasattr(driver, "execute_cdp_cmd"):
+        return []
+    try:
+        with open(path, encoding="utf-8") as handle:
+            cookies = json.load(handle)
+    except (OSError, ValueError):
+        return []
+    cookies = [cookie for cookie in cookies if isinstance(cookie, dict) and cookie.get("name")]
+    if not cookies:
+        return []
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+    except Exception:
+        return []
+    return cookies
+
+
+def _to_cookie_param(cookie: dict) -> dict:
+    param = {key: cookie[key] for key in _COOKIE_PARAM_KEYS if key in cookie}
+    if cookie.get("session"):
+        param.pop("expires", None)  # cookie de sessão: expires=-1 seria aplicado como já expirado
+    return param
+
+
+def save_cookies(driver, path: str) -> int:
+    """Salva os cookies do Google do driver no jar (escrita atômica). Retorna quantos foram salvos."""
+    if not path or not hasattr(driver, "execute_cdp_cmd"):
+        return 0
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies") or []
+    except Exception:
+        return 0
+    cookies = [_to_cookie_param(cookie) for cookie in cookies if _is_google_cookie(cookie)]
+    if not cookies:
+        return 0
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with _JAR_LOCK:
+        with open(temp, "w", encoding="utf-8") as handle:
+            json.dump(cookies, handle, ensure_ascii=False)
+        os.replace(temp, target)
+    return len(cookies)
+
+
+def has_consent_cookie(cookies) -> bool:
+    return any(cookie.get("name") in CONSENT_COOKIE_NAMES for cookie in cookies or [])
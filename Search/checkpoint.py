@@ -0,0 +1,191 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from place_record import ListingRecord, PlaceRecord
+
+
+class CheckpointStore:
+    """
+    Checkpoints duráveis (SQLite) de buscas em andamento: a lista da Fase A, os locais já detalhados
+    e os resultados parciais. Cada item é gravado assim que fica pronto, então uma busca interrompida
+    (Chrome caiu, processo morto) pode continuar de onde parou. Checkpoints mais velhos que
+    `ttl_seconds` são ignorados e apagados.
+    """
+
+    def __init__(self, path, ttl_seconds: float = 24 * 3600):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS search_checkpoint (
+                key TEXT PRIMARY KEY,
+                listings_complete INTEGER NOT NULL DEFAULT 0,
+                stop_reason TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_listing (
+                key TEXT NOT NULL,
+                listing_key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (key, listing_key)
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_result (
+                key TEXT NOT NULL,
+                listing_key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (key, listing_key)
+            );
+        """)
+        self._conn.commit()
+
+    def _touch(self, key: str, now: float) -> None:
+        self._conn.execute(
+            """
+            INSERT INTO search_checkpoint (key, created_at, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET updated_at = excluded.updated_at
+            """,
+            (key, now, now),
+        )
+
+    def load(self, key: str):
+        """
+        Retorna {listings, listings_complete, stop_reason, results, updated_at} ou None se não houver
+        checkpoint válido. `results` mapeia a chave de listagem para o resultado já mesclado.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT listings_complete, stop_reason, updated_at FROM search_checkpoint WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            listings_complete, stop_reason, updated_at = row
+            if self.ttl_seconds and now - updated_at > self.ttl_seconds:
+                self._delete(key)
+                self._conn.commit()
+                return None
+            listings = [
+                json.loads(data)
+                for (data,) in self._conn.execute(
+                    "SELECT data FROM checkpoint_listing WHERE key = ? ORDER BY position", (key,)
+                )
+            ]
+            results = {
+                listing_key: json.loads(data)
+                for listing_key, data in self._conn.execute(
+                    "SELECT listing_key, data FROM checkpoint_result WHERE key = ? ORDER BY position", (key,)
+                )
+            }
+        return {
+            "listings": listings,
+            "listings_complete": bool(listings_complete),
+            "stop_reason": stop_reason,
+            "results": results,
+            "updated_at": updated_at,
+        }
+
+    def add_listing(self, key: str, listing_key: str, item: dict) -> None:
+        if not listing_key:
+            return
+        now = time.time()
+        with self._lock:
+            self._touch(key, now)
+            self._conn.execute(
+                """
+                INSERT OR IGNORE INTO checkpoint_listing (key, listing_key, position, data)
+                VALUES (?, ?, (SELECT COUNT(*) FROM checkpoint_listing WHERE key = ?), ?)
+                """,
+                (key, listing_key, key, json.dumps(dict(item), ensure_ascii=False)),
+            )
+            self._conn.commit()
+
+    def finish_listings(self, key: str, stop_reason: str, complete: bool) -> None:
+        now = time.time()
+        with self._lock:
+            self._touch(key, now)
+            self._conn.execute(
+                "UPDATE search_checkpoint SET listings_complete = ?, stop_reason = ? WHERE key = ?",
+                (1 if complete else 0, stop_reason or "", key),
+            )
+            self._conn.commit()
+
+    def add_result(self, key: str, listing_key: str, result: dict) -> None:
+        if not listing_key:
+            return
+        now = time.time()
+        with self._lock:
+            self._touch(key, now)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO checkpoint_result (key, listing_key, position, data)
+                VALUES (?, ?, (SELECT COUNT(*) FROM checkpoint_result WHERE key = ?), ?)
+                """,
+                (key, listing_key, key, json.dumps(dict(result), ensure_ascii=False)),
+            )
+            self._conn.commit()
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._delete(key)
+            self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM search_checkpoint WHERE key = ?", (key,))
+        self._conn.execute("DELETE FROM checkpoint_listing WHERE key = ?", (key,))
+        self._conn.execute("DELETE FROM checkpoint_result WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SearchCheckpoint:
+    """Checkpoint de uma busca específica (chave fixa) já carregado do `CheckpointStore`."""
+
+    # Motivos de parada em que a lista da Fase A está completa e pode ser reaproveitada sem rolar.
+    # "tiles_partial" (algum tile falhou) fica de fora: a retomada cobre a cidade de novo.
+    COMPLETE_STOP_REASONS = ("limit", "end_marker", "single_place", "tiles_done")
+
+    def __init__(self, store: CheckpointStore, key: str):
+        self.store = store
+        self.key = key
+        state = store.load(key) or {}
+        self.listings = [ListingRecord.from_dict(item) for item in state.get("listings") or []]
+        self.listings_complete = bool(state.get("listings_complete"))
+        self.stop_reason = state.get("stop_reason") or ""
+        self.results = {key: PlaceRecord.from_dict(item) for key, item in (state.get("results") or {}).items()}
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.listings or self.results)
+
+    def reusable_listings(self, limit: int):
+        """Lista da Fase A salva, se ela cobre o limite pedido; senão None (é preciso rolar de novo)."""
+        if not self.listings_complete:
+            return None
+        if len(self.listings) >= limit or self.stop_reason in ("end_marker", "single_place", "tiles_done"):
+            return list(self.listings)
+        return None
+
+    def add_listing(self, listing_key: str, item: dict) -> None:
+        self.store.add_listing(self.key, listing_key, item)
+
+    def finish_listings(self, stop_reason: str) -> None:
+        self.listings_complete = stop_reason in self.COMPLETE_STOP_REASONS
+        self.stop_reason = stop_reason or ""
+        self.store.finish_listings(self.key, self.stop_reason, self.listings_complete)
+
+    def add_result(self, listing_key: str, result: dict) -> None:
+        self.results[listing_key] = result
+        self.store.add_result(self.key, listing_key, result)
+
+    def discard(self) -> None:
+        self.store.discard(self.key)
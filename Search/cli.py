@@ -0,0 +1,239 @@
+"""
+Linha de comando não interativa para rodar lotes de buscas (cron, pipelines).
+
+Uso:
+    python cli.py jobs.csv --output resultados.jsonl --concurrency 2
+
+O arquivo de jobs pode ser CSV (cabeçalho city,state,query,limit) ou JSONL (um objeto por linha com
+as mesmas chaves). Cada local é escrito como uma linha JSON assim que fica pronto; logs vão para o
+stderr. Código de saída: 0 = tudo certo, 1 = algum job falhou, 2 = erro de uso, 130 = interrompido.
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+JOB_FIELDS = ("city", "state", "query", "limit")
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class JobFileError(ValueError):
+    pass
+
+
+def _clean_job(raw: dict, line: int) -> dict:
+    job = {field: raw.get(field) for field in JOB_FIELDS}
+    for field in ("city", "state", "query"):
+        if job[field] is not None and not isinstance(job[field], str):
+            raise JobFileError(f"linha {line}: {field} precisa ser texto: {job[field]!r}")
+    job["city"] = (job["city"] or "").strip()
+    job["state"] = (job["state"] or "").strip() or None
+    job["query"] = (job["query"] or "").strip()
+    if not job["city"] or not job["query"]:
+        raise JobFileError(f"linha {line}: 'city' e 'query' são obrigatórios")
+    limit = job["limit"]
+    if limit in (None, ""):
+        job["limit"] = None
+    else:
+        try:
+            job["limit"] = int(limit)
+        except (TypeError, ValueError):
+            raise JobFileError(f"linha {line}: limit inválido: {limit!r}")
+    job["line"] = line
+    return job
+
+
+def _is_jsonl(path: str) -> bool:
+    return path.lower().endswith((".jsonl", ".ndjson", ".json"))
+
+
+def _check_csv_header(fieldnames) -> None:
+    missing = {"city", "query"} - set(fieldnames or [])
+    if missing:
+        raise JobFileError(f"cabeçalho CSV sem as colunas: {', '.join(sorted(missing))}")
+
+
+def check_job_file(path: str) -> None:
+    """Valida o que invalida o arquivo inteiro (cabeçalho do CSV) antes de qualquer job começar."""
+    if _is_jsonl(path):
+        return
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        _check_csv_header(csv.DictReader(handle).fieldnames)
+
+
+def iter_jobs(path: str):
+    """Lê o arquivo de jobs sob demanda (não carrega tudo na memória). Linhas inválidas viram JobFileError."""
+    with open(path, encoding="utf-8-sig", newline="") as handle:
+        if _is_jsonl(path):
+            for line, text in enumerate(handle, start=1):
+                text = text.strip()
+                if not text or text.startswith("#"):
+                    continue
+                try:
+                    raw = json.loads(text)
+                except ValueError as exc:
+                    yield JobFileError(f"linha {line}: JSON inválido ({exc})")
+                    continue
+                if not isinstance(raw, dict):
+                    yield JobFileError(f"linha {line}: esperado um objeto JSON")
+                    continue
+                try:
+                    yield _clean_job(raw, line)
+                except JobFileError as exc:
+                    yield exc
+        else:
+            reader = csv.DictReader(handle)
+            _check_csv_header(reader.fieldnames)
+            for row in reader:
+                try:
+                    yield _clean_job(row, reader.line_num)
+                except JobFileError as exc:
+                    yield exc
+
+
+def _log(message: str) -> None:
+    print(f"[SearchMaps] {message}", file=sys.stderr, flush=True)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Executa um lote de buscas do SearchMaps e grava JSONL.")
+    parser.add_argument("jobs", help="Arquivo CSV ou JSONL com city, state, query e limit.")
+    parser.add_argument("-o", "--output", default="-", help="Arquivo JSONL de saída ('-' = stdout).")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="Jobs rodando ao mesmo tempo.")
+    parser.add_argument("--limit", type=int, default=None, help="Limite padrão para jobs sem limit.")
+    parser.add_argument("--mode", choices=("full", "list_only", "hybrid"), default="full")
+    parser.add_argument("--visible", action="store_true", help="Abre o Chrome visível.")
+    parser.add_argument("--tiled", action="store_true", help="Cobre cada cidade em tiles (ver SEARCHMAPS_TILING).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    if args.concurrency < 1:
+        _log("--concurrency precisa ser >= 1")
+        return EXIT_USAGE
+    if not os.path.exists(args.jobs):
+        _log(f"arquivo de jobs não encontrado: {args.jobs}")
+        return EXIT_USAGE
+    try:
+        check_job_file(args.jobs)
+    except (OSError, UnicodeDecodeError, JobFileError) as exc:
+        _log(f"arquivo de jobs inválido: {exc}")
+        return EXIT_USAGE
+
+    # Cada job simultâneo precisa de um Chrome: o pool é dimensionado antes do searcher ser importado.
+    os.environ.setdefault("SEARCHMAPS_DRIVER_POOL_SIZE", str(args.concurrency))
+
+    output = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    try:
+        # Logs do searcher (print) vão para o stderr para não misturar com o JSONL.
+        with redirect_stdout(sys.stderr):
+            return _run(args, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def _run(args, output) -> int:
+    from searcher import search_places_iter, shutdown_drivers
+
+    records = queue.Queue(maxsize=max(10, args.concurrency * 10))
+    slots = threading.BoundedSemaphore(args.concurrency)
+    cancel = threading.Event()
+    done_marker = object()
+    summary = {"jobs": 0, "failed": 0, "places": 0}
+
+    def run_job(index: int, job: dict) -> None:
+        start = time.perf_counter()
+        count = 0
+        error = ""
+        location = f"{job['city']}, {job['state']}" if job["state"] else job["city"]
+        try:
+            for place in search_places_iter(
+                location,
+                job["query"],
+                limit=job["limit"] or args.limit,
+                headless=not args.visible,
+                should_cancel=cancel.is_set,
+                mode=args.mode,
+                tiled=args.tiled or None,
+            ):
+                records.put({**place, "job": index, "city": job["city"], "state": job["state"] or ""})
+                count += 1
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        finally:
+            slots.release()
+        records.put(("job", index, job, count, error, time.perf_counter() - start))
+
+    def produce() -> None:
+        threads = []
+        try:
+            for index, job in enumerate(iter_jobs(args.jobs), start=1):
+                if cancel.is_set():
+                    break
+                if isinstance(job, JobFileError):
+                    records.put(("job", index, None, 0, str(job), 0.0))
+                    continue
+                slots.acquire()
+                thread = threading.Thread(target=run_job, args=(index, job), daemon=True)
+                thread.start()
+                threads.append(thread)
+                threads = [item for item in threads if item.is_alive()]
+        except (OSError, UnicodeDecodeError, JobFileError) as exc:
+            records.put(("job", 0, None, 0, str(exc), 0.0))
+        except Exception as exc:
+            # Erro inesperado na leitura: vira job com falha em vez de derrubar a thread e travar o main.
+            records.put(("job", 0, None, 0, f"{type(exc).__name__}: {exc}", 0.0))
+        finally:
+            for thread in threads:
+                thread.join()
+            records.put(done_marker)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    start = time.perf_counter()
+
+    try:
+        while True:
+            record = records.get()
+            if record is done_marker:
+                break
+            if isinstance(record, tuple):
+                _, index, job, count, error, elapsed = record
+                summary["jobs"] += 1
+                label = f"{job['city']} / {job['query']}" if job else "arquivo de jobs"
+                if error:
+                    summary["failed"] += 1
+                    _log(f"Job {index} ({label}): ERRO {error}")
+                else:
+                    _log(f"Job {index} ({label}): {count} itens em {elapsed:.1f}s")
+                continue
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            summary["places"] += 1
+    except KeyboardInterrupt:
+        cancel.set()
+        _log("Interrompido pelo usuário.")
+        return EXIT_INTERRUPTED
+    finally:
+        shutdown_drivers()
+
+    _log(
+        f"Lote concluído | jobs={summary['jobs']} | falhas={summary['failed']} | "
+        f"locais={summary['places']} | tempo_total={time.perf_counter() - start:.1f}s"
+    )
+    return EXIT_JOB_FAILED if summary["failed"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
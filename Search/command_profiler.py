@@ -0,0 +1,164 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Módulos que implementam o driver: seus frames não contam como helper (ex.: um driver falso em bench/).
+DRIVER_MODULES = ["selenium"]
+_PHASE = threading.local()
+
+
+class CommandProfiler:
+    """
+    Conta e cronometra os comandos WebDriver (round trips) de uma busca, agrupados por fase, helper
+    do searcher que fez a chamada e comando (find_elements, get_attribute, execute_script, get...).
+    Seguro entre threads: os workers da Fase B e dos tiles gravam no mesmo profiler.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, helper: str, command: str, seconds: float, failed: bool = False) -> None:
+        key = (phase, helper, command)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = [0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            if failed:
+                entry[2] += 1
+
+    def report(self) -> dict:
+        """Totais, totais por fase e linhas (fase, helper, comando) ordenadas pelo tempo gasto."""
+        with self._lock:
+            stats = dict(self._stats)
+        rows = []
+        phases = {}
+        total_count = 0
+        total_seconds = 0.0
+        for (phase, helper, command), (count, seconds, errors) in stats.items():
+            rows.append(
+                {
+                    "phase": phase,
+                    "helper": helper,
+                    "command": command,
+                    "count": count,
+                    "total_ms": round(seconds * 1000, 2),
+                    "avg_ms": round(seconds * 1000 / count, 2),
+                    "errors": errors,
+                }
+            )
+            entry = phases.setdefault(phase, {"count": 0, "total_ms": 0.0})
+            entry["count"] += count
+            entry["total_ms"] += seconds * 1000
+            total_count += count
+            total_seconds += seconds
+        for entry in phases.values():
+            entry["total_ms"] = round(entry["total_ms"], 2)
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return {
+            "name": self.name,
+            "commands": total_count,
+            "total_ms": round(total_seconds * 1000, 2),
+            "phases": phases,
+            "rows": rows,
+        }
+
+    def format_report(self, top: int = 15) -> str:
+        report = self.report()
+        header = f"[SearchMaps] Comandos WebDriver | total={report['commands']} | tempo={report['total_ms'] / 1000:.1f}s"
+        for phase, entry in sorted(report["phases"].items(), key=lambda item: -item[1]["total_ms"]):
+            header += f" | {phase}={entry['count']} ({entry['total_ms'] / 1000:.1f}s)"
+        lines = [header]
+        for row in report["rows"][:top]:
+            lines.append(
+                f"[SearchMaps]   {row['phase']:<12} {row['helper']:<28} {row['command']:<22} "
+                f"n={row['count']:<5} total={row['total_ms'] / 1000:.2f}s média={row['avg_ms']:.0f}ms"
+                + (f" erros={row['errors']}" if row["errors"] else "")
+            )
+        return "\n".join(lines)
+
+
+@contextmanager
+def command_phase(name: str):
+    """Marca a fase dos comandos feitos por esta thread dentro do bloco."""
+    previous = getattr(_PHASE, "name", None)
+    _PHASE.name = name
+    try:
+        yield
+    finally:
+        _PHASE.name = previous
+
+
+def current_phase() -> str:
+    return getattr(_PHASE, "name", None) or "other"
+
+
+def _is_driver_frame(frame) -> bool:
+    module = frame.f_globals.get("__name__") or ""
+    return any(module == name or module.startswith(name + ".") for name in DRIVER_MODULES)
+
+
+def _caller(fallback: str):
+    """
+    (comando, helper) de um round trip. O comando é o método do Selenium chamado pelo nosso código
+    (get_attribute, find_elements, text...), não o comando do protocolo; o helper é a primeira função
+    fora do Selenium, pulando lambdas e geradores (ex.: o lambda passado a WebDriverWait.until).
+    """
+    frame = sys._getframe(2)
+    command = None
+    in_selenium = True
+    while frame is not None:
+        code = frame.f_code
+        if _is_driver_frame(frame):
+            if in_selenium:
+                command = code.co_name
+        elif code.co_name.startswith("<"):
+            in_selenium = False
+        else:
+            return command or fallback, code.co_name
+        frame = frame.f_back
+    return command or fallback, "?"
+
+
+def install_command_hook(driver) -> None:
+    """
+    Envolve `driver.execute`, por onde passam todos os comandos do driver e dos seus elementos.
+    Sem profiler anexado (`driver.searchmaps_profiler`), o custo é um getattr por comando.
+    """
+    if getattr(driver, "searchmaps_command_hook", False):
+        return
+    execute = driver.execute
+
+    def profiled_execute(driver_command, params=None):
+        profiler = getattr(driver, "searchmaps_profiler", None)
+        if profiler is None:
+            return execute(driver_command, params)
+        command, helper = _caller(driver_command)
+        failed = False
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            profiler.record(current_phase(), helper, command, time.perf_counter() - start, failed)
+
+    driver.execute = profiled_execute
+    driver.searchmaps_command_hook = True
+
+
+def attach_profiler(driver, profiler) -> None:
+    if profiler is None:
+        return
+    install_command_hook(driver)
+    driver.searchmaps_profiler = profiler
+
+
+def detach_profiler(driver) -> None:
+    if getattr(driver, "searchmaps_profiler", None) is not None:
+        driver.searchmaps_profiler = None
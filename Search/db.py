@@ -1,9 +1,13 @@
 import sqlite3
 
+from place_record import PlaceRecord
 from utils import formatar_dados
 
 from tabulate import tabulate
 
+# Ordem das colunas do INSERT para um PlaceRecord.
+COLUNAS_REGISTRO = ("city", "query", "name", "address", "delivery", "phone", "menu", "website")
+
 def criar_banco():
     """Cria o banco de dados e a tabela se não existir."""
     conexao = sqlite3.connect("estabelecimentos.db")
@@ -32,7 +36,7 @@ def criar_banco():
 def salvar_dados_no_banco(dados):
     """
     Salva os dados no banco SQLite, verificando duplicatas.
-    :param dados: Lista de listas com os dados (cidade, nome, endereco, entrega, telefone, cardapio, website)
+    :param dados: Lista de PlaceRecord ou de listas (cidade, tipo, nome, endereco, entrega, telefone, cardapio, website)
     """
     criar_banco()  # Garante que o banco e a tabela existam
     conexao = sqlite3.connect("estabelecimentos.db")
@@ -40,6 +44,8 @@ def salvar_dados_no_banco(dados):
 
     registros_salvos = 0
     for registro in dados:
+        if isinstance(registro, PlaceRecord):
+            registro = registro.as_row(COLUNAS_REGISTRO)
         try:
             cursor.execute("""
                 INSERT INTO estabelecimentos (cidade, tipo_estabelecimento, nome, endereco, entrega, telefone, cardapio, website)
@@ -0,0 +1,282 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class DriverPoolTimeoutError(Exception):
+    pass
+
+
+class PooledDriver:
+    """Um driver do pool e seu estado de saúde."""
+
+    def __init__(self, driver, slot: int):
+        self.driver = driver
+        self.slot = slot
+        self.healthy = True
+        self.leases = 0
+        self.failures = 0
+        self.last_error = ""
+        self.created_at = time.time()
+        self.last_used_at = None
+        self.recycles = 0
+
+
+class DriverPool:
+    """
+    Pool de drivers com criação preguiçosa e semântica de checkout/checkin.
+    :param factory: Callable que recebe o número do slot e cria um novo driver. Slots liberados por
+        drivers descartados são reaproveitados, então cada slot pode ter recursos próprios (ex.: perfil).
+    :param size: Número máximo de drivers vivos ao mesmo tempo.
+    :param health_check: Callable opcional que recebe o driver e levanta exceção se ele estiver quebrado.
+    :param recycle_check: Callable opcional que recebe o driver e devolve o motivo para trocá-lo por um
+        novo (ex.: memória alta) ou "" para mantê-lo. Consultado na devolução ao pool.
+    """
+
+    def __init__(self, factory, size: int = 1, health_check=None, recycle_check=None):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.health_check = health_check
+        self.recycle_check = recycle_check
+        self._idle = []
+        self._all = []
+        self._creating = 0
+        self._waiting = 0
+        self._closed = False
+        self._next_slot = 0
+        self._free_slots = []
+        self._cond = threading.Condition()
+        self.created_count = 0
+        self.discarded_count = 0
+        self.recycled_count = 0
+        self.recycle_reasons = {}
+
+    def acquire(self, timeout=None) -> PooledDriver:
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool de drivers encerrado.")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    pooled.leases += 1
+                    pooled.last_used_at = time.time()
+                    return pooled
+                if len(self._all) + self._creating < self.size:
+                    self._creating += 1
+                    if self._free_slots:
+                        slot = self._free_slots.pop(0)
+                    else:
+                        slot = self._next_slot
+                        self._next_slot += 1
+                    break
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise DriverPoolTimeoutError("Nenhum driver disponível no pool.")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        # Criação fora do lock: subir o Chrome leva segundos.
+        try:
+            driver = self.factory(slot)
+        except Exception:
+            with self._cond:
+                self._creating -= 1
+                self._free_slots.append(slot)
+                self._free_slots.sort()
+                self._cond.notify()
+            raise
+
+        pooled = PooledDriver(driver, slot)
+        pooled.leases = 1
+        pooled.last_used_at = time.time()
+        with self._cond:
+            self._creating -= 1
+            self._all.append(pooled)
+            self.created_count += 1
+        return pooled
+
+    @property
+    def waiting(self) -> int:
+        """Quantos acquire estão bloqueados esperando um driver."""
+        with self._cond:
+            return self._waiting
+
+    def release(self, pooled: PooledDriver, error: Exception = None) -> None:
+        if error is not None:
+            pooled.failures += 1
+            pooled.last_error = str(error)
+            if self.health_check is not None:
+                try:
+                    self.health_check(pooled.driver)
+                except Exception as exc:
+                    pooled.healthy = False
+                    pooled.last_error = str(exc)
+
+        reason = ""
+        if pooled.healthy and self.recycle_check is not None:
+            try:
+                reason = self.recycle_check(pooled.driver) or ""
+            except Exception:
+                reason = ""
+
+        with self._cond:
+            if pooled.healthy and not reason and not self._closed:
+                self._idle.append(pooled)
+                self._cond.notify()
+                return
+            if pooled in self._all:
+                self._all.remove(pooled)
+                self._free_slots.append(pooled.slot)
+                self._free_slots.sort()
+            if reason:
+                # O slot fica livre: o próximo acquire sobe um Chrome novo (com o mesmo perfil do slot).
+                self._count_recycle(reason)
+            else:
+                self.discarded_count += 1
+            self._cond.notify()
+
+        _quit_quietly(pooled.driver)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        pooled = self.acquire(timeout=timeout)
+        try:
+            yield pooled.driver
+        except GeneratorExit:
+            # Gerador consumidor encerrado antes do fim: não é falha do driver.
+            self.release(pooled)
+            raise
+        except BaseException as exc:
+            self.release(pooled, error=exc)
+            raise
+        else:
+            self.release(pooled)
+
+    def prewarm(self, count: int = None, warmup=None) -> int:
+        """
+        Sobe até `count` drivers (padrão: o tamanho do pool) em paralelo, sem esperar por drivers ocupados,
+        e roda `warmup(driver)` em cada um antes de devolvê-los ao pool. Retorna quantos foram aquecidos.
+        """
+        count = self.size if count is None else min(max(int(count), 0), self.size)
+        warmed = []
+        lock = threading.Lock()
+
+        def warm() -> None:
+            try:
+                pooled = self.acquire(timeout=0)
+            except (DriverPoolTimeoutError, RuntimeError):
+                return
+            except Exception:
+                return  # falha ao criar o driver: a primeira busca tenta de novo
+            error = None
+            try:
+                if warmup is not None:
+                    warmup(pooled.driver)
+            except Exception as exc:
+                error = exc
+            # Segura o driver até todos terminarem, senão a próxima thread pegaria o mesmo driver ocioso.
+            with lock:
+                warmed.append((pooled, error))
+
+        threads = [threading.Thread(target=warm, daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for pooled, error in warmed:
+            self.release(pooled, error=error)
+        return sum(1 for _, error in warmed if error is None)
+
+    def replace(self, driver, reason: str = ""):
+        """
+        Troca por um novo o driver emprestado `driver`, sem devolvê-lo ao pool: quem segura o empréstimo
+        continua com o mesmo slot e passa a usar o driver retornado. O antigo é encerrado antes de criar
+        o novo, porque os dois usariam o mesmo perfil. Se a criação falhar, o slot fica marcado como
+        quebrado (descartado na devolução) e a exceção sobe. Driver que não é do pool volta inalterado.
+        """
+        pooled = self._find(driver)
+        if pooled is None:
+            return driver
+        _quit_quietly(driver)
+        try:
+            new_driver = self.factory(pooled.slot)
+        except Exception as exc:
+            pooled.healthy = False
+            pooled.last_error = str(exc)
+            raise
+        with self._cond:
+            pooled.driver = new_driver
+            pooled.created_at = time.time()
+            pooled.recycles += 1
+            self.created_count += 1
+            self._count_recycle(reason or "manual")
+        return new_driver
+
+    def owns(self, driver) -> bool:
+        return self._find(driver) is not None
+
+    def _find(self, driver):
+        with self._cond:
+            for pooled in self._all:
+                if pooled.driver is driver:
+                    return pooled
+        return None
+
+    def _count_recycle(self, reason: str) -> None:
+        self.recycled_count += 1
+        self.recycle_reasons[reason] = self.recycle_reasons.get(reason, 0) + 1
+
+    def mark_unhealthy(self, driver, reason: str = "") -> None:
+        with self._cond:
+            for pooled in self._all:
+                if pooled.driver is driver:
+                    pooled.healthy = False
+                    pooled.last_error = reason or pooled.last_error
+                    return
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            drivers = [pooled.driver for pooled in self._all]
+            self._all = []
+            self._idle = []
+            self._cond.notify_all()
+        for driver in drivers:
+            _quit_quietly(driver)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "alive": len(self._all),
+                "idle": len(self._idle),
+                "in_use": len(self._all) - len(self._idle),
+                "created": self.created_count,
+                "discarded": self.discarded_count,
+                "recycled": self.recycled_count,
+                "recycle_reasons": dict(self.recycle_reasons),
+                "drivers": [
+                    {
+                        "slot": pooled.slot,
+                        "healthy": pooled.healthy,
+                        "leases": pooled.leases,
+                        "failures": pooled.failures,
+                        "last_error": pooled.last_error,
+                        "recycles": pooled.recycles,
+                        "navigations": getattr(pooled.driver, "searchmaps_navigations", 0),
+                        "rss_mb": getattr(pooled.driver, "searchmaps_rss_mb", None),
+                    }
+                    for pooled in self._all
+                ],
+            }
+
+
+def _quit_quietly(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
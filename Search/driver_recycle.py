@@ -0,0 +1,108 @@
+import os
+
+# Contadores por driver (atributos, como searchmaps_consent_done): zerados a cada Chrome novo.
+_NAVIGATIONS = "searchmaps_navigations"
+_ERRORS = "searchmaps_consecutive_errors"
+
+
+def note_navigation(driver) -> None:
+    setattr(driver, _NAVIGATIONS, getattr(driver, _NAVIGATIONS, 0) + 1)
+
+
+def note_driver_error(driver) -> None:
+    setattr(driver, _ERRORS, getattr(driver, _ERRORS, 0) + 1)
+
+
+def note_driver_ok(driver) -> None:
+    if getattr(driver, _ERRORS, 0):
+        setattr(driver, _ERRORS, 0)
+
+
+def navigation_count(driver) -> int:
+    return getattr(driver, _NAVIGATIONS, 0)
+
+
+def _process_tree_pids(root: int) -> list:
+    # Um único passe por /proc monta o mapa pai -> filhos (o Chrome abre vários processos por aba).
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as handle:
+                stat = handle.read()
+        except OSError:
+            continue
+        # O nome do processo vem entre parênteses e pode ter espaços: o ppid é o 2º campo após ")".
+        fields = stat[stat.rfind(b")") + 2 :].split()
+        if len(fields) > 1:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+    pids = [root]
+    index = 0
+    while index < len(pids):
+        pids.extend(children.get(pids[index], ()))
+        index += 1
+    return pids
+
+
+def process_tree_rss_mb(pid: int):
+    """
+    RSS somado (MB) do processo e de todos os descendentes, lido de /proc. Páginas compartilhadas
+    entre os processos do Chrome entram mais de uma vez, então é um teto. None fora do Linux.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for child in _process_tree_pids(pid):
+        try:
+            with open(f"/proc/{child}/statm", "rb") as handle:
+                total += int(handle.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / (1024 * 1024)
+
+
+def driver_rss_mb(driver):
+    """RSS do chromedriver e dos processos do Chrome abertos por ele; None se não der para medir."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    pid = getattr(process, "pid", None)
+    if not pid:
+        return None
+    return process_tree_rss_mb(pid)
+
+
+class RecyclePolicy:
+    """
+    Quando trocar um driver por um Chrome novo: após `max_navigations` páginas abertas, quando o RSS
+    do Chrome passa de `max_rss_mb` (medido a cada `rss_check_every` navegações) ou após `max_errors`
+    WebDriverException seguidas. Limites 0 ficam desligados.
+    """
+
+    def __init__(self, max_navigations: int = 0, max_rss_mb: float = 0, max_errors: int = 0, rss_check_every: int = 10):
+        self.max_navigations = max(0, int(max_navigations))
+        self.max_rss_mb = max(0.0, float(max_rss_mb))
+        self.max_errors = max(0, int(max_errors))
+        self.rss_check_every = max(1, int(rss_check_every))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_navigations or self.max_rss_mb or self.max_errors)
+
+    def reason(self, driver) -> str:
+        """Motivo para reciclar o driver agora ("navigations", "rss", "errors") ou "" para mantê-lo."""
+        if self.max_errors and getattr(driver, _ERRORS, 0) >= self.max_errors:
+            return "errors"
+        navigations = navigation_count(driver)
+        if self.max_navigations and navigations >= self.max_navigations:
+            return "navigations"
+        if self.max_rss_mb and navigations:
+            checked = getattr(driver, "searchmaps_rss_checked_at", 0)
+            if navigations - checked >= self.rss_check_every:
+                driver.searchmaps_rss_checked_at = navigations
+                rss = driver_rss_mb(driver)
+                if rss is not None:
+                    driver.searchmaps_rss_mb = round(rss, 1)
+                    if rss >= self.max_rss_mb:
+                        return "rss"
+        return ""
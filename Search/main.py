@@ -1,11 +1,14 @@
-from searcher import search
+from batch import BATCH_WORKERS
+from searcher import prewarm_drivers, search
 from db import listar_dados, visualizar_dados, filtrar_dados
 from utils import exportar_para_excel, exportar_para_csv
 
 #Para fazer requisições
 import requests
+import multiprocessing
 import os
 import sys
+import threading
 
 if os.name == "nt":
     try:
@@ -61,4 +64,10 @@ def show_menu():
             print("Opção inválida! Tente novamente.")
 
 if __name__ == "__main__":
+    # Necessário para os processos da busca em lote no executável (PyInstaller).
+    multiprocessing.freeze_support()
+    # Sobe o Chrome em background enquanto o menu espera (SEARCHMAPS_PREWARM). Com o lote em vários
+    # processos, cada worker aquece o próprio Chrome e o deste processo nunca seria usado.
+    if BATCH_WORKERS <= 1:
+        threading.Thread(target=prewarm_drivers, daemon=True).start()
     show_menu()
@@ -0,0 +1,73 @@
+import base64
+
+from resource_blocking import read_performance_log
+
+# Respostas de rede que trazem registros de locais: a busca (feed, a cada rolagem) e a prévia do local.
+PAYLOAD_URL_MARKERS = ("tbm=map", "/maps/preview/place")
+
+
+def is_payload_url(url: str) -> bool:
+    return any(marker in (url or "") for marker in PAYLOAD_URL_MARKERS)
+
+
+def enable_capture(driver) -> bool:
+    """
+    Liga a captura das respostas do Maps neste driver. Exige o log de performance (ligado em
+    resource_blocking.configure_options) e CDP; retorna False se não der, e a extração segue pelo DOM.
+    """
+    if getattr(driver, "searchmaps_network_events", None) is not None:
+        return True
+    if not getattr(driver, "searchmaps_performance_log", False) or not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+    except Exception:
+        return False
+    driver.searchmaps_network_events = []
+    driver.searchmaps_network_pending = {}
+    # O que já está no log (a página aberta agora) entra na captura: o corpo dessas respostas ainda
+    # pode ser lido; se não puder mais, collect_payloads só pula a resposta.
+    read_performance_log(driver)
+    return True
+
+
+def collect_payloads(driver) -> list:
+    """
+    Corpos das respostas de payload concluídas desde a última chamada. O corpo só pode ser lido depois
+    do Network.loadingFinished; respostas ainda em andamento ficam para a próxima chamada.
+    """
+    events = getattr(driver, "searchmaps_network_events", None)
+    if events is None:
+        return []
+    read_performance_log(driver)
+    pending = driver.searchmaps_network_pending
+    finished = []
+    for message in events:
+        method = message.get("method")
+        params = message.get("params") or {}
+        request_id = params.get("requestId")
+        if method == "Network.responseReceived":
+            if is_payload_url((params.get("response") or {}).get("url")):
+                pending[request_id] = True
+        elif method == "Network.loadingFinished":
+            if pending.pop(request_id, None):
+                finished.append(request_id)
+        elif method == "Network.loadingFailed":
+            pending.pop(request_id, None)
+    del events[:]
+
+    bodies = []
+    for request_id in finished:
+        try:
+            response = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception:
+            continue  # corpo já descartado pelo Chrome: esses locais seguem pelo DOM
+        body = response.get("body") or ""
+        if response.get("base64Encoded"):
+            try:
+                body = base64.b64decode(body).decode("utf-8", "replace")
+            except ValueError:
+                continue
+        if body:
+            bodies.append(body)
+    return bodies
@@ -0,0 +1,149 @@
+import json
+import re
+from urllib.parse import parse_qs, urlsplit
+
+# Respostas do Maps (busca /search?tbm=map, /maps/preview/place e o estado inicial embutido na página)
+# são JSON com o prefixo anti-XSSI, às vezes dentro de outro JSON ({"c":0,"d":")]}'\n[...]"}).
+XSSI_PREFIX = ")]}'"
+_TRAILER = '/*""*/'
+_INITIAL_STATE_RE = re.compile(r"window\.APP_INITIALIZATION_STATE\s*=\s*(\[.*?\]);\s*window\.APP_FLAGS", re.S)
+_FEATURE_ID_RE = re.compile(r"^0x[0-9a-f]+:0x([0-9a-f]+)$")
+_MAX_DEPTH = 16
+
+# Posições no registro de local do payload (sensível: mudam sem aviso, como os seletores do page_parser).
+FEATURE_ID_PATH = (10,)
+NAME_PATH = (11,)
+ADDRESS_PATH = (39,)
+FULL_ADDRESS_PATH = (18,)
+ADDRESS_LINES_PATH = (2,)
+PHONE_PATH = (178, 0, 0)
+WEBSITE_PATH = (7, 0)
+GOOGLE_PLACE_ID_PATH = (78,)
+
+
+def strip_xssi(body: str) -> str:
+    text = (body or "").strip()
+    if text.endswith(_TRAILER):
+        text = text[: -len(_TRAILER)].rstrip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX) :]
+    return text
+
+
+def load_payload(body: str):
+    """JSON de uma resposta do Maps, sem o prefixo anti-XSSI. None se não for JSON."""
+    try:
+        return json.loads(strip_xssi(body))
+    except ValueError:
+        return None
+
+
+def _dig(record, path):
+    value = record
+    for index in path:
+        if not isinstance(value, list) or index >= len(value):
+            return None
+        value = value[index]
+    return value
+
+
+def _text(value) -> str:
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _is_place_record(node) -> bool:
+    if not isinstance(node, list) or len(node) <= NAME_PATH[0]:
+        return False
+    feature_id = node[FEATURE_ID_PATH[0]]
+    return isinstance(feature_id, str) and bool(_FEATURE_ID_RE.match(feature_id)) and bool(_text(node[NAME_PATH[0]]))
+
+
+def iter_place_records(data, depth: int = 0):
+    """
+    Percorre o payload e devolve cada registro de local, onde quer que esteja: a posição dos registros
+    muda entre a busca, a página do local e o estado inicial. Strings com o prefixo anti-XSSI (payload
+    dentro de payload) são decodificadas no caminho.
+    """
+    if depth > _MAX_DEPTH:
+        return
+    if isinstance(data, str):
+        if data.startswith(XSSI_PREFIX):
+            yield from iter_place_records(load_payload(data), depth + 1)
+        return
+    if isinstance(data, dict):
+        for value in data.values():
+            yield from iter_place_records(value, depth + 1)
+        return
+    if not isinstance(data, list):
+        return
+    if _is_place_record(data):
+        yield data
+        return
+    for child in data:
+        if isinstance(child, (list, dict, str)):
+            yield from iter_place_records(child, depth + 1)
+
+
+def _unwrap_website(url: str) -> str:
+    # Links externos vêm como redirecionamento do Google (/url?q=https://...).
+    if url.startswith("/url?") or "google.com/url?" in url:
+        target = parse_qs(urlsplit(url).query).get("q")
+        if target:
+            return target[0]
+    return url
+
+
+def parse_place_record(record) -> dict:
+    """Campos de um registro de local, no formato de extract_place_details (place_id = id da URL, !1s)."""
+    feature_id = _text(_dig(record, FEATURE_ID_PATH))
+    match = _FEATURE_ID_RE.match(feature_id)
+    name = _text(_dig(record, NAME_PATH))
+    address = _text(_dig(record, ADDRESS_PATH))
+    if not address:
+        full = _text(_dig(record, FULL_ADDRESS_PATH))
+        prefix = f"{name}, "
+        address = full[len(prefix) :] if name and full.startswith(prefix) else full
+    if not address:
+        lines = _dig(record, ADDRESS_LINES_PATH)
+        if isinstance(lines, list):
+            address = ", ".join(_text(line) for line in lines if _text(line))
+    return {
+        "name": name,
+        "address": address,
+        "phone": _text(_dig(record, PHONE_PATH)),
+        "website": _unwrap_website(_text(_dig(record, WEBSITE_PATH))),
+        "place_id": feature_id,
+        "cid": str(int(match.group(1), 16)) if match else "",
+        "google_place_id": _text(_dig(record, GOOGLE_PLACE_ID_PATH)),
+    }
+
+
+def decode_places(data) -> list:
+    """Locais (dicts) de um payload já carregado, sem repetir o mesmo place_id."""
+    places = []
+    seen = set()
+    for record in iter_place_records(data):
+        place = parse_place_record(record)
+        if place["place_id"] in seen:
+            continue
+        seen.add(place["place_id"])
+        places.append(place)
+    return places
+
+
+def decode_payload(body: str) -> list:
+    """Locais do corpo de uma resposta de rede do Maps ([] se o formato não for reconhecido)."""
+    data = load_payload(body)
+    return decode_places(data) if data is not None else []
+
+
+def decode_initial_state(html: str) -> list:
+    """Locais do estado inicial embutido no HTML (window.APP_INITIALIZATION_STATE) da busca ou do local."""
+    match = _INITIAL_STATE_RE.search(html or "")
+    if not match:
+        return []
+    try:
+        data = json.loads(match.group(1))
+    except ValueError:
+        return []
+    return decode_places(data)
@@ -0,0 +1,376 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, parse_qs
+
+# DOM sensível: seletores da página de detalhes, em ordem de prioridade.
+# São usados tanto no caminho Selenium (searcher._get_item_text) quanto no parser offline.
+TITLE_SELECTOR = "h1.DUwDvf, h1.fontHeadlineLarge"
+ADDRESS_SELECTORS = [
+    "button[data-item-id='address']",
+    "div[data-item-id='address']",
+    "button[data-item-id='address'] span",
+    "div[data-item-id='address'] span",
+]
+PHONE_SELECTORS = [
+    "button[data-item-id='phone']",
+    "div[data-item-id='phone']",
+    "button[aria-label*='Telefone']",
+    "button[aria-label*='Phone']",
+]
+WEBSITE_SELECTORS = [
+    "a[data-item-id='authority']",
+    "button[data-item-id='authority']",
+    "div[data-item-id='authority']",
+]
+MENU_SELECTORS = [
+    "a[data-item-id='menu']",
+    "a[data-item-id='action:menu']",
+    "button[data-item-id='menu']",
+]
+DELIVERY_SELECTORS = [
+    "a[data-item-id='action:order']",
+    "a[data-item-id='action:delivery']",
+    "a[data-item-id='action:order-online']",
+    "button[data-item-id='action:order']",
+]
+
+# DOM sensível: ícones de mapas usam glifos internos (layout antigo, classe AeaXub).
+LEGACY_INFO_CLASS = "AeaXub"
+LEGACY_ICON_FIELDS = {
+    "\ue0c8": "address",
+    "\ue558": "delivery",
+    "\ue0b0": "phone",
+    "\ue561": "menu",
+    "\ue80b": "website",
+}
+
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+_SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "button", "dd", "div", "dl", "dt",
+    "fieldset", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+}
+
+
+def extract_place_id_from_url(url: str) -> str:
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if "place_id" in query and query["place_id"]:
+        return query["place_id"][0]
+    if "cid" in query and query["cid"]:
+        return query["cid"][0]
+    match = re.search(r"!1s([^!]+)", url)
+    if match:
+        return match.group(1)
+    return ""
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    def get_attribute(self, name: str) -> str:
+        return self.attrs.get(name) or ""
+
+    @property
+    def classes(self):
+        return (self.attrs.get("class") or "").split()
+
+    @property
+    def text(self) -> str:
+        """Aproximação do `element.text` do Selenium (innerText): quebra linha entre blocos."""
+        parts = []
+        self._collect_text(parts)
+        lines = []
+        for line in "".join(parts).split("\n"):
+            line = re.sub(r"[ \t\r\f\v]+", " ", line).strip()
+            if line:
+                lines.append(line)
+        return "\n".join(lines)
+
+    def _collect_text(self, parts) -> None:
+        if self.tag in _SKIP_TEXT_TAGS:
+            return
+        block = self.tag in _BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        for child in self.children:
+            if isinstance(child, Node):
+                child._collect_text(parts)
+            else:
+                parts.append(child)
+        if block:
+            parts.append("\n")
+
+    def iter_descendants(self):
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, Node):
+                continue
+            yield node
+            stack.extend(reversed(node.children))
+
+    def select_all(self, selector: str):
+        compiled = [_compile_selector(part) for part in selector.split(",") if part.strip()]
+        for node in self.iter_descendants():
+            if any(_matches_chain(node, chain) for chain in compiled):
+                yield node
+
+    def select_first(self, selector: str):
+        return next(self.select_all(selector), None)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._stack[-1]
+        node = Node(tag, {name: (value or "") for name, value in attrs}, parent)
+        parent.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        parent = self._stack[-1]
+        parent.children.append(Node(tag, {name: (value or "") for name, value in attrs}, parent))
+
+    def handle_endtag(self, tag):
+        # HTML real tem tags sem fechamento: fecha até a abertura correspondente, se houver.
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html or "")
+    builder.close()
+    return builder.root
+
+
+# Subconjunto de CSS suficiente para os seletores acima:
+# tag, .classe, [attr], [attr='v'], [attr*='v'], [attr^='v'], [attr$='v'] e descendente (espaço).
+_COMPOUND_RE = re.compile(r"^([a-zA-Z][\w-]*|\*)?((?:\.[\w-]+|\[[^\]]+\])*)$")
+_PART_RE = re.compile(r"\.([\w-]+)|\[\s*([\w:-]+)\s*(?:([*^$]?=)\s*(['\"]?)(.*?)\4)?\s*\]")
+_SELECTOR_CACHE = {}
+
+
+def _split_compounds(selector: str):
+    compounds = []
+    current = ""
+    quote = ""
+    for char in selector.strip():
+        if quote:
+            current += char
+            if char == quote:
+                quote = ""
+        elif char in ("'", '"'):
+            quote = char
+            current += char
+        elif char.isspace():
+            if current:
+                compounds.append(current)
+                current = ""
+        else:
+            current += char
+    if current:
+        compounds.append(current)
+    return compounds
+
+
+def _compile_selector(selector: str):
+    selector = selector.strip()
+    cached = _SELECTOR_CACHE.get(selector)
+    if cached is not None:
+        return cached
+
+    chain = []
+    for compound in _split_compounds(selector):
+        match = _COMPOUND_RE.match(compound)
+        if not match:
+            raise ValueError(f"Seletor não suportado: {selector}")
+        tag = match.group(1) if match.group(1) not in (None, "*") else None
+        classes = []
+        attrs = []
+        for part in _PART_RE.finditer(match.group(2) or ""):
+            if part.group(1):
+                classes.append(part.group(1))
+            else:
+                attrs.append((part.group(2), part.group(3), part.group(5) or ""))
+        chain.append((tag, classes, attrs))
+
+    _SELECTOR_CACHE[selector] = chain
+    return chain
+
+
+def _matches_compound(node: Node, compound) -> bool:
+    tag, classes, attrs = compound
+    if tag and node.tag != tag:
+        return False
+    if classes:
+        node_classes = node.classes
+        if any(cls not in node_classes for cls in classes):
+            return False
+    for name, operator, expected in attrs:
+        if name not in node.attrs:
+            return False
+        value = node.attrs.get(name) or ""
+        if operator == "=" and value != expected:
+            return False
+        if operator == "*=" and expected not in value:
+            return False
+        if operator == "^=" and not value.startswith(expected):
+            return False
+        if operator == "$=" and not value.endswith(expected):
+            return False
+    return True
+
+
+def _matches_chain(node: Node, chain) -> bool:
+    if not _matches_compound(node, chain[-1]):
+        return False
+    ancestor = node.parent
+    for compound in reversed(chain[:-1]):
+        while ancestor is not None and not _matches_compound(ancestor, compound):
+            ancestor = ancestor.parent
+        if ancestor is None:
+            return False
+        ancestor = ancestor.parent
+    return True
+
+
+def _get_item_text(root: Node, selectors, prefer_href: bool = False) -> str:
+    # Mesma lógica de searcher._get_item_text, mas sobre a árvore já parseada.
+    for selector in selectors:
+        element = root.select_first(selector)
+        if element is None:
+            continue
+        if prefer_href:
+            href = element.get_attribute("href")
+            if href:
+                return href.strip()
+        text = element.text.strip()
+        if text:
+            return text
+        aria = element.get_attribute("aria-label")
+        if aria:
+            return aria.strip()
+    return ""
+
+
+def _extract_legacy_info(root: Node) -> dict:
+    info = {}
+    for node in root.iter_descendants():
+        if LEGACY_INFO_CLASS not in node.classes:
+            continue
+        span = node.select_first("span")
+        if span is None:
+            continue
+        field = LEGACY_ICON_FIELDS.get(span.text)
+        if field:
+            info[field] = node.text
+    return info
+
+
+def parse_place_html(html: str, maps_url: str = "") -> dict:
+    """
+    Extrai os dados de um local a partir do HTML da página de detalhes (ex.: driver.page_source).
+    Usa as mesmas prioridades de seletor do caminho Selenium, sem nenhuma chamada ao navegador.
+    :param html: HTML completo da página.
+    :param maps_url: URL atual da página (para o place_id).
+    :return: Dict com as mesmas chaves de searcher.extract_place_details.
+    """
+    root = parse_html(html)
+
+    title = root.select_first(TITLE_SELECTOR)
+    name = title.text.strip() if title is not None else ""
+
+    details = {
+        "name": name,
+        "address": _get_item_text(root, ADDRESS_SELECTORS),
+        "delivery": _get_item_text(root, DELIVERY_SELECTORS, prefer_href=True),
+        "phone": _get_item_text(root, PHONE_SELECTORS),
+        "menu": _get_item_text(root, MENU_SELECTORS, prefer_href=True),
+        "website": _get_item_text(root, WEBSITE_SELECTORS, prefer_href=True),
+        "maps_url": maps_url,
+        "place_id": extract_place_id_from_url(maps_url),
+    }
+
+    legacy = _extract_legacy_info(root)
+    for field, value in legacy.items():
+        if not details.get(field):
+            details[field] = value
+
+    return details
+
+
+# DOM sensível: texto do card de resultado (div.Nv2PK), linha a linha:
+# "Nome", "4,6(1.234)", "Pizzaria · R. Exemplo, 123", "Aberto ⋅ Fecha às 23:00 · (31) 3333-4444", ...
+_CARD_SEPARATOR_RE = re.compile(r"\s*[·⋅]\s*")
+_CARD_PHONE_RE = re.compile(r"(?:\+\d{1,3}\s?)?\(?\d{2,3}\)?[\s.-]?\d{4,5}[\s.-]?\d{4}")
+_CARD_RATING_RE = re.compile(r"^\d[,.]\d")
+_CARD_HOURS_PREFIXES = (
+    "aberto", "fechado", "fecha", "abre", "open", "closed", "closes", "opens", "24 horas", "24 hours",
+)
+
+
+def _is_card_noise(segment: str) -> bool:
+    lower = segment.lower()
+    if _CARD_RATING_RE.match(segment):
+        return True
+    if lower.startswith(_CARD_HOURS_PREFIXES):
+        return True
+    if set(segment) <= set("$€£R "):
+        return True  # faixa de preço
+    # Glifos de ícone (área de uso privado do Unicode).
+    return all("\ue000" <= char <= "\uf8ff" or char.isspace() for char in segment)
+
+
+def parse_card_text(text: str) -> dict:
+    """
+    Extrai categoria, trecho de endereço e telefone do texto visível de um card.
+    Campos não encontrados voltam vazios.
+    """
+    category = ""
+    address = ""
+    phone = ""
+
+    lines = [line.strip() for line in (text or "").split("\n") if line.strip()]
+    for line in lines[1:]:
+        segments = [segment for segment in _CARD_SEPARATOR_RE.split(line) if segment]
+        remaining = []
+        for segment in segments:
+            match = _CARD_PHONE_RE.search(segment)
+            if match and not phone and len(re.sub(r"\D", "", match.group(0))) >= 8:
+                phone = match.group(0).strip()
+                continue
+            if not _is_card_noise(segment):
+                remaining.append(segment)
+
+        if category or not remaining or len(segments) < 2:
+            continue
+        # Primeira linha "categoria · endereço" do card.
+        category = remaining[0]
+        if len(remaining) > 1:
+            address = remaining[-1]
+
+    return {"category": category, "address": address, "phone": phone}
@@ -0,0 +1,108 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class PlaceCache:
+    """
+    Cache persistente (SQLite) dos detalhes de locais, chaveado pela chave de listagem
+    (place_id / cid / URL normalizada). Entradas expiram após `ttl_seconds` e o total é limitado a
+    `max_entries`, removendo as menos usadas recentemente (LRU).
+    """
+
+    def __init__(self, path, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 5000):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS place_cache (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_place_cache_accessed ON place_cache (accessed_at);")
+        self._conn.commit()
+
+    def get(self, key: str):
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, created_at FROM place_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            data, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM place_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE place_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(data)
+
+    def put(self, key: str, details: dict) -> None:
+        if not key or not details:
+            return
+        now = time.time()
+        data = json.dumps(details, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO place_cache (key, data, created_at, accessed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET data = excluded.data,
+                    created_at = excluded.created_at, accessed_at = excluded.accessed_at
+                """,
+                (key, data, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM place_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM place_cache WHERE key IN (
+                        SELECT key FROM place_cache ORDER BY accessed_at ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM place_cache")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM place_cache").fetchone()[0]
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,99 @@
+import sys
+from collections.abc import Mapping
+
+
+class _SlotRecord(Mapping):
+    """
+    Registro com campos fixos em __slots__ (sem __dict__ por instância), lido como um dict: item["x"],
+    item.get("x"), `in`, dict(item) e {**item} funcionam, então o código que já tratava os dicts segue igual.
+    Campos em _INTERNED passam por sys.intern: a mesma cidade/termo em milhares de registros vira uma
+    única string.
+    """
+
+    __slots__ = ()
+    _DEFAULTS = {}
+    _INTERNED = frozenset()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            value = fields.pop(name, None)
+            self._set(name, self._DEFAULTS.get(name, "") if value is None else value)
+        if fields:
+            raise TypeError(f"Campos desconhecidos em {type(self).__name__}: {', '.join(sorted(fields))}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """Registro a partir de um dict (checkpoint, cache de buscas); chaves fora do registro são ignoradas."""
+        if isinstance(data, cls):
+            return data
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def _set(self, name, value):
+        if name in self._INTERNED and type(value) is str:
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        # Registros que voltam dos processos do lote (pickle) passam por _set: a internação vale de novo.
+        for name, value in zip(self.__slots__, state):
+            self._set(name, value)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        self._set(key, value)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def update(self, fields) -> None:
+        for key, value in fields.items():
+            self[key] = value
+
+    def as_row(self, fields) -> tuple:
+        """Valores na ordem de `fields` (linha para SQLite/planilha), sem montar um dict."""
+        return tuple(getattr(self, name) for name in fields)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ListingRecord(_SlotRecord):
+    """Card da lista de resultados (Fase A); network_details é o dict decodificado do payload, se houver."""
+
+    __slots__ = ("title", "place_url", "place_id", "cid", "category", "address", "phone", "network_details")
+    _DEFAULTS = {"network_details": None}
+    _INTERNED = frozenset({"category"})
+
+
+class PlaceRecord(_SlotRecord):
+    """Local já mesclado (card + detalhes): da Fase B até a deduplicação, o armazenamento do job e a exportação."""
+
+    __slots__ = (
+        "city",
+        "query",
+        "name",
+        "address",
+        "delivery",
+        "phone",
+        "menu",
+        "website",
+        "maps_url",
+        "place_id",
+        "place_url",
+    )
+    _INTERNED = frozenset({"city", "query"})
@@ -0,0 +1,107 @@
+import json
+import threading
+
+# Perfis de bloqueio aplicados via CDP (Network.setBlockedURLs). Nada disso é usado na extração de texto.
+_MEDIA_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a",
+]
+_MAP_PATTERNS = [
+    "*/maps/vt?*",
+    "*/maps/vt/*",
+    "*/kh/v=*",
+    "*khms*.google.com/*",
+    "*streetviewpixels-pa.googleapis.com/*",
+    "*lh3.googleusercontent.com/*",
+    "*lh5.googleusercontent.com/*",
+    "*/maps/preview/log*",
+    "*/gen_204*",
+]
+
+RESOURCE_PROFILES = {
+    "off": [],
+    "light": _MEDIA_PATTERNS,
+    "strict": _MEDIA_PATTERNS + _MAP_PATTERNS,
+}
+
+_COUNT_LOCK = threading.Lock()
+# Eventos guardados para a captura de respostas (network_capture); o resto do log é descartado.
+_CAPTURED_EVENTS = ("Network.responseReceived", "Network.loadingFinished", "Network.loadingFailed")
+
+
+def profile_patterns(profile: str):
+    if profile not in RESOURCE_PROFILES:
+        raise ValueError(f"Perfil de bloqueio inválido: {profile}")
+    return RESOURCE_PROFILES[profile]
+
+
+def configure_options(options, enabled: bool) -> bool:
+    # O log de performance é de onde saem os contadores de requisições bloqueadas.
+    if enabled:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return enabled
+
+
+def apply_profile(driver, profile: str) -> bool:
+    """
+    Aplica o perfil ao driver (vale para as próximas navegações). Não repete o comando se já estiver ativo.
+    Retorna False se o driver não suporta CDP.
+    """
+    patterns = profile_patterns(profile)
+    if getattr(driver, "searchmaps_resource_profile", "off") == profile:
+        return True
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception:
+        return False
+    driver.searchmaps_resource_profile = profile
+    return True
+
+
+def read_performance_log(driver) -> None:
+    """
+    Consome o log de performance do driver uma única vez para todos os interessados: acumula as
+    requisições bloqueadas e, com a captura de rede ligada (network_capture), guarda os eventos Network.*
+    de resposta em `driver.searchmaps_network_events`.
+    """
+    if not getattr(driver, "searchmaps_performance_log", False):
+        return
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return
+
+    events = getattr(driver, "searchmaps_network_events", None)
+    blocked = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry.get("message") or "{}").get("message") or {}
+        except ValueError:
+            continue
+        method = message.get("method") or ""
+        if method == "Network.loadingFailed" and (message.get("params") or {}).get("blockedReason"):
+            blocked += 1
+        if events is not None and method in _CAPTURED_EVENTS:
+            events.append(message)
+    driver.searchmaps_blocked_unread = getattr(driver, "searchmaps_blocked_unread", 0) + blocked
+
+
+def drain_blocked_count(driver) -> int:
+    """Conta as requisições bloqueadas desde a última leitura."""
+    read_performance_log(driver)
+    blocked = getattr(driver, "searchmaps_blocked_unread", 0)
+    if blocked:
+        driver.searchmaps_blocked_unread = 0
+    return blocked
+
+
+def add_blocked_count(driver, metrics: dict, key: str = "blocked_requests") -> None:
+    blocked = drain_blocked_count(driver)
+    if metrics is None:
+        return
+    with _COUNT_LOCK:
+        metrics[key] = metrics.get(key, 0) + blocked
@@ -0,0 +1,148 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+
+def _normalize_key_part(value) -> str:
+    if not value:
+        return ""
+    value = str(value).strip().lower()
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    value = re.sub(r"[^\w\s]", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+class SearchCache:
+    """
+    Cache de resultados de busca por (cidade, estado, termo, modo).
+    Fica em memória (LRU limitado a `max_entries`) e, se `path` for informado, também em SQLite
+    (limitado a `max_disk_entries`). Cada entrada guarda o limite usado e se a lista do Maps acabou
+    antes dele (`exhausted`), para saber se um limite maior pode ser servido só do cache.
+    """
+
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 64, path: str = "", max_disk_entries: int = 500):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, int(max_entries))
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(city: str, state: str, query: str, mode: str = "full") -> str:
+        return "|".join(
+            [_normalize_key_part(city), _normalize_key_part(state), _normalize_key_part(query), mode or "full"]
+        )
+
+    def _is_fresh(self, entry: dict, now: float) -> bool:
+        return not self.ttl_seconds or now - entry["created_at"] <= self.ttl_seconds
+
+    def get(self, key: str):
+        """Retorna uma cópia da entrada {results, limit, exhausted, created_at} ou None se ausente/expirada."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute("SELECT data FROM search_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = json.loads(row[0])
+                    self._remember(key, entry)
+            if entry is None or not self._is_fresh(entry, now):
+                if entry is not None:
+                    self._forget(key)
+                return None
+            self._memory.move_to_end(key)
+            if self._conn is not None:
+                self._conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            return _copy_entry(entry)
+
+    def put(self, key: str, results, limit: int, exhausted: bool) -> None:
+        now = time.time()
+        entry = {
+            "results": [dict(item) for item in results],
+            "limit": limit,
+            "exhausted": bool(exhausted),
+            "created_at": now,
+        }
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    """
+                    INSERT INTO search_cache (key, data, created_at, accessed_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET data = excluded.data,
+                        created_at = excluded.created_at, accessed_at = excluded.accessed_at
+                    """,
+                    (key, json.dumps(entry, ensure_ascii=False), now, now),
+                )
+                self._conn.execute(
+                    """
+                    DELETE FROM search_cache WHERE key NOT IN (
+                        SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT ?
+                    )
+                    """,
+                    (self.max_disk_entries,),
+                )
+                self._conn.commit()
+
+    def record(self, status: str) -> None:
+        with self._lock:
+            if status == "hit":
+                self.hits += 1
+            elif status == "partial":
+                self.partial_hits += 1
+            elif status == "miss":
+                self.misses += 1
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            disk = 0
+            if self._conn is not None:
+                disk = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": disk,
+                "hits": self.hits,
+                "partial_hits": self.partial_hits,
+                "misses": self.misses,
+            }
+
+
+def _copy_entry(entry: dict) -> dict:
+    copied = dict(entry)
+    copied["results"] = [dict(item) for item in entry["results"]]
+    return copied
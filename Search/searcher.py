@@ -16,6 +16,9 @@ import time
 import os
 import random
 import re
+import queue
+import threading
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
 from urllib.parse import quote_plus, urlsplit, parse_qs, urlunsplit
 
@@ -24,6 +27,33 @@ import pandas as pd
 from utils import formatar_dados, selecionar_colunas
 
 from db import salvar_dados_no_banco
+from driver_pool import DriverPool, DriverPoolTimeoutError
+from driver_recycle import RecyclePolicy, navigation_count, note_driver_error, note_driver_ok, note_navigation
+from place_cache import PlaceCache
+from place_record import ListingRecord, PlaceRecord
+from search_cache import SearchCache
+from checkpoint import CheckpointStore, SearchCheckpoint
+from batch import build_tasks, merge_rows, run_batch
+from network_capture import collect_payloads, enable_capture
+from network_parser import decode_initial_state, decode_payload
+from page_parser import (
+    ADDRESS_SELECTORS,
+    DELIVERY_SELECTORS,
+    LEGACY_ICON_FIELDS,
+    LEGACY_INFO_CLASS,
+    MENU_SELECTORS,
+    PHONE_SELECTORS,
+    TITLE_SELECTOR,
+    WEBSITE_SELECTORS,
+    extract_place_id_from_url,
+    parse_card_text,
+    parse_place_html,
+)
+from browser_profile import configure_profile, has_consent_cookie, load_cookies, save_cookies
+from tiling import grid, parse_viewport, split, tile_url, viewport_bounds
+from tracing import Tracer, attach_tracer, detach_tracer, trace_span
+from command_profiler import CommandProfiler, attach_profiler, command_phase, detach_profiler
+from resource_blocking import add_blocked_count, apply_profile as apply_resource_profile, configure_options
 from tabulate import tabulate  # Para exibir os dados formatados no terminal
 
 # Suprimir avisos de Deprecation
@@ -36,14 +66,99 @@ SCROLL_MAX_TRIES = int(os.getenv("SEARCHMAPS_SCROLL_MAX_TRIES", "60"))
 SCROLL_STALL_TRIES = int(os.getenv("SEARCHMAPS_SCROLL_STALL_TRIES", "8"))
 BACKOFF_SECONDS = float(os.getenv("SEARCHMAPS_BACKOFF_SECONDS", "6"))
 DEFAULT_TIMEOUT = int(os.getenv("SEARCHMAPS_TIMEOUT", "40"))
-
-_DRIVER = None
-_DRIVER_HEADLESS = None
-
-
-def _create_driver(headless: bool) -> webdriver.Chrome:
+SCRIPT_TIMEOUT = DEFAULT_TIMEOUT + 5
+# "dom": um find_element por seletor; "snapshot": lê page_source uma vez e parseia localmente;
+# "network": decodifica os payloads JSON que o Maps baixa (feed e página do local), com o DOM como reserva.
+DETAILS_PARSER = os.getenv("SEARCHMAPS_DETAILS_PARSER", "dom").strip().lower()
+# Intervalo mínimo (segundos) entre verificações de popup no mesmo driver durante a rolagem.
+POPUP_CHECK_INTERVAL = float(os.getenv("SEARCHMAPS_POPUP_INTERVAL", "3"))
+
+# Perfis de bloqueio de recursos (off, light, strict) para as fases de lista e de detalhes.
+LIST_RESOURCE_PROFILE = os.getenv("SEARCHMAPS_LIST_RESOURCE_PROFILE", "off").strip().lower()
+DETAIL_RESOURCE_PROFILE = os.getenv("SEARCHMAPS_DETAIL_RESOURCE_PROFILE", "off").strip().lower()
+
+DRIVER_POOL_SIZE = int(os.getenv("SEARCHMAPS_DRIVER_POOL_SIZE", "1"))
+# Perfil persistente (um user-data-dir por slot do pool) e/ou cookie jar compartilhado; vazios = desligados.
+PROFILE_DIR = os.getenv("SEARCHMAPS_PROFILE_DIR", "").strip()
+COOKIE_JAR_PATH = os.getenv("SEARCHMAPS_COOKIE_JAR", "").strip()
+# Quantos drivers abrir o Maps uma vez ao iniciar o serviço (0 = sem aquecimento).
+PREWARM_DRIVERS = int(os.getenv("SEARCHMAPS_PREWARM", "0"))
+# Base das URLs do Maps; aponte para o servidor de bench/mock_maps.py para testes de carga sem rede.
+MAPS_BASE_URL = os.getenv("SEARCHMAPS_MAPS_BASE_URL", "https://www.google.com/maps").strip().rstrip("/")
+MAPS_HOME_URL = f"{MAPS_BASE_URL}?hl=pt-BR"
+# Reciclagem de drivers (limita o crescimento de memória do Chrome em execuções longas); 0 desliga cada regra.
+RECYCLE_NAVIGATIONS = int(os.getenv("SEARCHMAPS_RECYCLE_NAVIGATIONS", "0"))
+RECYCLE_RSS_MB = float(os.getenv("SEARCHMAPS_RECYCLE_RSS_MB", "0"))
+RECYCLE_ERRORS = int(os.getenv("SEARCHMAPS_RECYCLE_ERRORS", "3"))
+RECYCLE_RSS_CHECK_EVERY = int(os.getenv("SEARCHMAPS_RECYCLE_RSS_CHECK_EVERY", "10"))
+RECYCLE_POLICY = RecyclePolicy(
+    max_navigations=RECYCLE_NAVIGATIONS,
+    max_rss_mb=RECYCLE_RSS_MB,
+    max_errors=RECYCLE_ERRORS,
+    rss_check_every=RECYCLE_RSS_CHECK_EVERY,
+)
+DRIVER_ACQUIRE_TIMEOUT = float(os.getenv("SEARCHMAPS_DRIVER_ACQUIRE_TIMEOUT", "600"))
+DETAIL_WORKERS = int(os.getenv("SEARCHMAPS_DETAIL_WORKERS", "1"))
+# Fase B começa enquanto a Fase A ainda rola a lista (só quando há drivers livres no pool).
+PIPELINE_ENABLED = os.getenv("SEARCHMAPS_PIPELINE", "0").strip().lower() in ("1", "true", "yes", "on")
+PIPELINE_QUEUE_SIZE = int(os.getenv("SEARCHMAPS_PIPELINE_QUEUE_SIZE", "20"))
+
+# Busca em tiles: a cidade vira uma grade TILE_GRID x TILE_GRID de viewports; tiles com pelo menos
+# TILE_SPLIT_THRESHOLD resultados são divididos em 4 (até TILE_MAX_DEPTH níveis).
+TILING_ENABLED = os.getenv("SEARCHMAPS_TILING", "").strip().lower() in ("1", "true", "yes", "on")
+TILE_GRID = int(os.getenv("SEARCHMAPS_TILE_GRID", "3"))
+TILE_SPLIT_THRESHOLD = int(os.getenv("SEARCHMAPS_TILE_SPLIT_THRESHOLD", "100"))
+TILE_MAX_DEPTH = int(os.getenv("SEARCHMAPS_TILE_MAX_DEPTH", "2"))
+TILE_WORKERS = int(os.getenv("SEARCHMAPS_TILE_WORKERS", "1"))
+
+# "full": abre a página de cada local (Fase B); "list_only": usa só o card da lista;
+# "hybrid": só abre a página dos cards sem endereço ou telefone.
+SEARCH_MODES = ("full", "list_only", "hybrid")
+
+# Cache persistente de detalhes por local (desligado se o caminho estiver vazio).
+PLACE_CACHE_PATH = os.getenv("SEARCHMAPS_PLACE_CACHE", "").strip()
+PLACE_CACHE_TTL = float(os.getenv("SEARCHMAPS_PLACE_CACHE_TTL", str(7 * 24 * 3600)))
+PLACE_CACHE_MAX = int(os.getenv("SEARCHMAPS_PLACE_CACHE_MAX", "5000"))
+
+# Cache de buscas repetidas (cidade/estado/termo/modo). TTL 0 desliga; o caminho em disco é opcional.
+SEARCH_CACHE_TTL = float(os.getenv("SEARCHMAPS_SEARCH_CACHE_TTL", "900"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCHMAPS_SEARCH_CACHE_MAX_ENTRIES", "64"))
+SEARCH_CACHE_PATH = os.getenv("SEARCHMAPS_SEARCH_CACHE_PATH", "").strip()
+SEARCH_CACHE_DISK_MAX = int(os.getenv("SEARCHMAPS_SEARCH_CACHE_DISK_MAX", "500"))
+
+# Tracing estruturado (spans por fase/navegação/rolagem/local/seletor), exportado em JSON por busca.
+TRACE_ENABLED = os.getenv("SEARCHMAPS_TRACE", "").strip().lower() in ("1", "true", "yes", "on")
+TRACE_DIR = os.getenv("SEARCHMAPS_TRACE_DIR", "traces").strip()
+# Conta e cronometra cada comando WebDriver por fase/helper e imprime um relatório ao fim de cada busca.
+PROFILE_COMMANDS = os.getenv("SEARCHMAPS_PROFILE_COMMANDS", "").strip().lower() in ("1", "true", "yes", "on")
+PROFILE_COMMANDS_TOP = int(os.getenv("SEARCHMAPS_PROFILE_COMMANDS_TOP", "15"))
+
+# Checkpoint durável de buscas em andamento, para retomar após queda (desligado se o caminho estiver vazio).
+CHECKPOINT_PATH = os.getenv("SEARCHMAPS_CHECKPOINT_PATH", "").strip()
+CHECKPOINT_TTL = float(os.getenv("SEARCHMAPS_CHECKPOINT_TTL", str(24 * 3600)))
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+_PLACE_CACHE = None
+_SEARCH_CACHE = None
+_CHECKPOINT_STORE = None
+_CACHES_LOCK = threading.Lock()
+_METRICS_LOCK = threading.Lock()
+_PROFILE_NAMESPACE = ""
+
+
+def set_profile_namespace(namespace: str) -> None:
+    """Prefixo dos diretórios de perfil, para processos diferentes não disputarem o mesmo user-data-dir."""
+    global _PROFILE_NAMESPACE
+    _PROFILE_NAMESPACE = namespace or ""
+
+
+def _create_driver(headless: bool, slot: int = 0) -> webdriver.Chrome:
     options = webdriver.ChromeOptions()
     effective_headless = headless and not DEBUG
+    if PROFILE_DIR:
+        mode_name = "headless" if effective_headless else "visible"
+        configure_profile(options, PROFILE_DIR, f"{_PROFILE_NAMESPACE}{mode_name}-{slot}")
     if effective_headless:
         options.add_argument("--headless")
     options.add_argument("--disable-gpu")
@@ -51,27 +166,183 @@ def _create_driver(headless: bool) -> webdriver.Chrome:
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--lang=pt-BR")
     options.add_argument("--no-sandbox")
+    blocking = LIST_RESOURCE_PROFILE != "off" or DETAIL_RESOURCE_PROFILE != "off"
+    performance_log = configure_options(options, enabled=blocking or DETAILS_PARSER == "network")
     if not DEBUG:
         options.add_argument("--log-level=3")  # Apenas erros
         options.add_experimental_option("excludeSwitches", ["enable-logging"])  # Remove logs de warning
-    return webdriver.Chrome(options=options)
+    started = time.perf_counter()
+    driver = webdriver.Chrome(options=options)
+    driver.searchmaps_startup_seconds = time.perf_counter() - started
+    driver.searchmaps_performance_log = performance_log
+    # Scripts assíncronos (MutationObserver) esperam no máximo isso.
+    driver.set_script_timeout(SCRIPT_TIMEOUT)
+    if DETAILS_PARSER == "network":
+        # Antes do primeiro driver.get: o payload da primeira página também fica no log capturado.
+        enable_capture(driver)
+    if COOKIE_JAR_PATH and has_consent_cookie(load_cookies(driver, COOKIE_JAR_PATH)):
+        driver.searchmaps_consent_done = True
+    return driver
+
+
+def _check_driver_alive(driver: webdriver.Chrome) -> None:
+    # Qualquer comando simples serve: se a sessão morreu, levanta WebDriverException.
+    driver.current_url
+
+
+def _get_pool(headless: bool = True) -> DriverPool:
+    effective_headless = headless and not DEBUG
+    with _POOLS_LOCK:
+        pool = _POOLS.get(effective_headless)
+        if pool is None:
+            pool = DriverPool(
+                factory=lambda slot: _create_driver(headless=effective_headless, slot=slot),
+                size=DRIVER_POOL_SIZE,
+                health_check=_check_driver_alive,
+                recycle_check=RECYCLE_POLICY.reason if RECYCLE_POLICY.enabled else None,
+            )
+            _POOLS[effective_headless] = pool
+    return pool
+
+
+def _recycle_if_needed(driver: webdriver.Chrome, metrics: dict = None) -> webdriver.Chrome:
+    """
+    Entre duas páginas de um mesmo empréstimo (Fase B), troca o driver por um Chrome novo quando a
+    política de reciclagem manda. O tracer e o profiler passam para o novo driver; quem segura o
+    empréstimo deve seguir usando o driver retornado. Drivers fora do pool nunca são trocados.
+    """
+    if not RECYCLE_POLICY.enabled:
+        return driver
+    reason = RECYCLE_POLICY.reason(driver)
+    if not reason:
+        return driver
+    with _POOLS_LOCK:
+        pool = next((pool for pool in _POOLS.values() if pool.owns(driver)), None)
+    if pool is None:
+        return driver
+    tracer = getattr(driver, "searchmaps_tracer", None)
+    profiler = getattr(driver, "searchmaps_profiler", None)
+    navigations = navigation_count(driver)
+    rss = getattr(driver, "searchmaps_rss_mb", None)
+    start = time.perf_counter()
+    new_driver = pool.replace(driver, reason)
+    driver.searchmaps_successor = new_driver
+    attach_tracer(new_driver, tracer)
+    attach_profiler(new_driver, profiler)
+    _add_metric(metrics, "driver_recycles")
+    if tracer is not None:
+        tracer.add("driver_recycle", time.perf_counter() - start, reason=reason, navigations=navigations)
+    print(
+        f"[SearchMaps] Driver reciclado | motivo={reason} | navegações={navigations}"
+        + (f" | rss={rss:.0f}MB" if rss is not None else "")
+        + f" | tempo={time.perf_counter() - start:.1f}s"
+    )
+    return new_driver
 
 
-def _get_driver(headless: bool = True) -> webdriver.Chrome:
-    global _DRIVER
-    global _DRIVER_HEADLESS
+def _current_driver(driver: webdriver.Chrome) -> webdriver.Chrome:
+    # Driver reciclado durante o empréstimo: segue até o que está em uso agora.
+    while getattr(driver, "searchmaps_successor", None) is not None:
+        driver = driver.searchmaps_successor
+    return driver
 
-    effective_headless = headless and not DEBUG
 
-    if _DRIVER is None or _DRIVER_HEADLESS != effective_headless:
-        if _DRIVER is not None:
-            try:
-                _DRIVER.quit()
-            except Exception:
-                pass
-        _DRIVER = _create_driver(headless=effective_headless)
-        _DRIVER_HEADLESS = effective_headless
-    return _DRIVER
+@contextmanager
+def _lease_driver(driver=None, headless: bool = True):
+    if driver is not None:
+        yield driver
+        return
+    with _get_pool(headless=headless).lease(timeout=DRIVER_ACQUIRE_TIMEOUT) as leased:
+        yield leased
+
+
+def _warm_up_driver(driver: webdriver.Chrome) -> None:
+    with command_phase("warmup"):
+        driver.get(MAPS_HOME_URL)
+        note_navigation(driver)
+        _accept_consent_if_present(driver)
+        if COOKIE_JAR_PATH:
+            save_cookies(driver, COOKIE_JAR_PATH)
+
+
+def prewarm_drivers(count: int = None, headless: bool = True) -> int:
+    """
+    Sobe `count` drivers do pool (padrão SEARCHMAPS_PREWARM) e abre o Maps uma vez em cada, para a
+    primeira busca não pagar o início do Chrome nem o fluxo de consentimento.
+    """
+    count = PREWARM_DRIVERS if count is None else count
+    if count <= 0:
+        return 0
+    start = time.perf_counter()
+    warmed = _get_pool(headless=headless).prewarm(count, warmup=_warm_up_driver)
+    print(f"[SearchMaps] Pool aquecido | drivers={warmed}/{count} | tempo={time.perf_counter() - start:.1f}s")
+    return warmed
+
+
+def get_pool_stats() -> dict:
+    with _POOLS_LOCK:
+        pools = dict(_POOLS)
+    return {("headless" if key else "visible"): pool.stats() for key, pool in pools.items()}
+
+
+def shutdown_drivers() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _get_place_cache():
+    global _PLACE_CACHE
+    if not PLACE_CACHE_PATH:
+        return None
+    with _CACHES_LOCK:
+        if _PLACE_CACHE is None:
+            _PLACE_CACHE = PlaceCache(PLACE_CACHE_PATH, ttl_seconds=PLACE_CACHE_TTL, max_entries=PLACE_CACHE_MAX)
+    return _PLACE_CACHE
+
+
+def _get_search_cache():
+    global _SEARCH_CACHE
+    if SEARCH_CACHE_TTL <= 0:
+        return None
+    with _CACHES_LOCK:
+        if _SEARCH_CACHE is None:
+            _SEARCH_CACHE = SearchCache(
+                ttl_seconds=SEARCH_CACHE_TTL,
+                max_entries=SEARCH_CACHE_MAX_ENTRIES,
+                path=SEARCH_CACHE_PATH,
+                max_disk_entries=SEARCH_CACHE_DISK_MAX,
+            )
+    return _SEARCH_CACHE
+
+
+def _get_checkpoint_store():
+    global _CHECKPOINT_STORE
+    if not CHECKPOINT_PATH:
+        return None
+    with _CACHES_LOCK:
+        if _CHECKPOINT_STORE is None:
+            _CHECKPOINT_STORE = CheckpointStore(CHECKPOINT_PATH, ttl_seconds=CHECKPOINT_TTL)
+    return _CHECKPOINT_STORE
+
+
+def get_search_cache_stats() -> dict:
+    cache = _get_search_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def get_place_cache_stats() -> dict:
+    cache = _get_place_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def _add_metric(metrics: dict, key: str, amount: int = 1) -> None:
+    if metrics is None:
+        return
+    with _METRICS_LOCK:
+        metrics[key] = metrics.get(key, 0) + amount
 
 
 def _human_delay(min_seconds: float = 0.8, max_seconds: float = 2.2) -> None:
@@ -126,21 +397,6 @@ def _normalize_place_url(url: str) -> str:
     return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
 
 
-def _extract_place_id_from_url(url: str) -> str:
-    if not url:
-        return ""
-    parts = urlsplit(url)
-    query = parse_qs(parts.query)
-    if "place_id" in query and query["place_id"]:
-        return query["place_id"][0]
-    if "cid" in query and query["cid"]:
-        return query["cid"][0]
-    match = re.search(r"!1s([^!]+)", url)
-    if match:
-        return match.group(1)
-    return ""
-
-
 def _build_listing_key(item: dict) -> str:
     place_id = (item or {}).get("place_id") or ""
     if place_id:
@@ -172,86 +428,163 @@ def _build_final_key(item: dict) -> str:
     return ""
 
 
-def _try_click_buttons(driver: webdriver.Chrome, label_options) -> bool:
-    buttons = driver.find_elements(By.CSS_SELECTOR, "button, div[role='button']")
-    for button in buttons:
-        label = f"{button.text} {button.get_attribute('aria-label') or ''}".strip()
-        if not label:
-            continue
-        lower_label = label.lower()
-        if any(text in lower_label for text in label_options):
-            try:
-                button.click()
-                time.sleep(0.5)
+# Textos de botões de consentimento/popup (comparação por "contém", em minúsculas).
+_CONSENT_ACCEPT_TEXTS = [
+    "aceitar tudo",
+    "aceitar",
+    "concordo",
+    "i agree",
+    "accept all",
+    "agree",
+    "yes, i agree",
+]
+_CONSENT_REJECT_TEXTS = [
+    "rejeitar tudo",
+    "rejeitar",
+    "recusar",
+    "reject all",
+    "reject",
+    "disagree",
+]
+_POPUP_CLOSE_TEXTS = [
+    "fechar",
+    "close",
+    "not now",
+    "agora nao",
+    "dismiss",
+]
+
+# Procura e clica o botão de consentimento/fechar em uma única chamada (documento e iframes same-origin).
+# Iframes de outra origem com "consent" no src são só contados; o Python entra neles se necessário.
+_POPUP_SCRIPT = """
+const consentGroups = arguments[0];
+const closeGroups = arguments[1];
+const checkFrames = arguments[2];
+function labelOf(el) {
+  return ((el.innerText || '') + ' ' + (el.getAttribute('aria-label') || '')).trim().toLowerCase();
+}
+function isVisible(el) {
+  return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function scan(doc, groups) {
+  if (!groups.length) return null;
+  const buttons = Array.from(doc.querySelectorAll("button, div[role='button']")).filter(isVisible);
+  const labels = buttons.map(labelOf);
+  for (const group of groups) {
+    for (let i = 0; i < buttons.length; i++) {
+      if (labels[i] && group.texts.some((text) => labels[i].includes(text))) {
+        buttons[i].click();
+        return group.kind;
+      }
+    }
+  }
+  return null;
+}
+let clicked = scan(document, consentGroups);
+let consentFrames = 0;
+if (!clicked && checkFrames) {
+  for (const frame of document.querySelectorAll('iframe')) {
+    let doc = null;
+    try { doc = frame.contentDocument; } catch (e) { doc = null; }
+    if (doc) {
+      clicked = scan(doc, consentGroups);
+      if (clicked) break;
+    } else if (/consent/i.test(frame.src || '')) {
+      consentFrames += 1;
+    }
+  }
+}
+if (!clicked) clicked = scan(document, closeGroups);
+const cookies = document.cookie || '';
+return {clicked: clicked, consentFrames: consentFrames, consented: /(^|;\\s*)(SOCS=|CONSENT=YES)/.test(cookies)};
+"""
+
+
+def _popup_groups(include_consent: bool, include_close: bool):
+    consent = []
+    if include_consent:
+        consent = [
+            {"kind": "consent", "texts": _CONSENT_ACCEPT_TEXTS},
+            {"kind": "consent", "texts": _CONSENT_REJECT_TEXTS},
+        ]
+    close = [{"kind": "close", "texts": _POPUP_CLOSE_TEXTS}] if include_close else []
+    return consent, close
+
+
+def _click_consent_in_frames(driver: webdriver.Chrome) -> bool:
+    # Iframe de consentimento de outra origem: o script só roda dentro dele após o switch.
+    consent, _ = _popup_groups(include_consent=True, include_close=False)
+    for iframe in driver.find_elements(By.CSS_SELECTOR, "iframe[src*='consent']"):
+        try:
+            driver.switch_to.frame(iframe)
+            result = driver.execute_script(_POPUP_SCRIPT, consent, [], False) or {}
+            if result.get("clicked"):
                 return True
-            except Exception:
-                try:
-                    driver.execute_script("arguments[0].click();", button)
-                    time.sleep(0.5)
-                    return True
-                except Exception:
-                    continue
+        except WebDriverException:
+            continue
+        finally:
+            driver.switch_to.default_content()
     return False
 
 
-def _accept_consent_if_present(driver: webdriver.Chrome) -> bool:
-    accept_texts = [
-        "aceitar tudo",
-        "aceitar",
-        "concordo",
-        "i agree",
-        "accept all",
-        "agree",
-        "yes, i agree",
-    ]
-    reject_texts = [
-        "rejeitar tudo",
-        "rejeitar",
-        "recusar",
-        "reject all",
-        "reject",
-        "disagree",
-    ]
+def _run_popup_script(driver: webdriver.Chrome, consent_done: bool, include_close: bool):
+    consent, close = _popup_groups(include_consent=not consent_done, include_close=include_close)
+    try:
+        result = driver.execute_script(_POPUP_SCRIPT, consent, close, not consent_done) or {}
+    except WebDriverException:
+        result = {}
+
+    clicked = result.get("clicked")
+    if not clicked and result.get("consentFrames") and _click_consent_in_frames(driver):
+        clicked = "consent"
+    if clicked == "consent" or result.get("consented"):
+        driver.searchmaps_consent_done = True
+    if clicked:
+        time.sleep(0.5)
+    if clicked == "consent" and COOKIE_JAR_PATH:
+        save_cookies(driver, COOKIE_JAR_PATH)
+    return clicked
 
-    if _try_click_buttons(driver, accept_texts):
-        return True
-    if _try_click_buttons(driver, reject_texts):
-        return True
 
-    iframes = driver.find_elements(By.TAG_NAME, "iframe")
-    for iframe in iframes:
-        try:
-            driver.switch_to.frame(iframe)
-            if _try_click_buttons(driver, accept_texts) or _try_click_buttons(driver, reject_texts):
-                driver.switch_to.default_content()
-                return True
-            driver.switch_to.default_content()
-        except Exception:
-            driver.switch_to.default_content()
-            continue
+def _handle_popups(driver: webdriver.Chrome, include_close: bool, metrics: dict = None, force: bool = False) -> bool:
+    """
+    Trata consentimento/popups com um único execute_script. Sem `force`, roda no máximo a cada
+    POPUP_CHECK_INTERVAL segundos por driver; depois que o consentimento foi dado na sessão, ele não é
+    mais procurado. Conta chamadas, cliques e tempo gasto em metrics (popup_checks/popup_clicks/popup_seconds).
+    """
+    consent_done = getattr(driver, "searchmaps_consent_done", False)
+    if consent_done and not include_close:
+        return False
+    now = time.monotonic()
+    if not force and now - getattr(driver, "searchmaps_popup_checked_at", 0.0) < POPUP_CHECK_INTERVAL:
+        return False
 
-    return False
+    start = time.perf_counter()
+    with trace_span(driver, "popups", consent=not consent_done) as span:
+        clicked = _run_popup_script(driver, consent_done, include_close)
+        span.set(clicked or "none")
 
+    driver.searchmaps_popup_checked_at = time.monotonic()
+    _add_metric(metrics, "popup_checks")
+    if clicked:
+        _add_metric(metrics, "popup_clicks")
+    _add_metric(metrics, "popup_seconds", time.perf_counter() - start)
+    return bool(clicked)
 
-def _dismiss_popups(driver: webdriver.Chrome) -> bool:
-    if _accept_consent_if_present(driver):
-        return True
 
-    close_texts = [
-        "fechar",
-        "close",
-        "not now",
-        "agora nao",
-        "dismiss",
-    ]
-    return _try_click_buttons(driver, close_texts)
+def _accept_consent_if_present(driver: webdriver.Chrome, metrics: dict = None) -> bool:
+    return _handle_popups(driver, include_close=False, metrics=metrics, force=True)
+
+
+def _dismiss_popups(driver: webdriver.Chrome, metrics: dict = None, force: bool = False) -> bool:
+    return _handle_popups(driver, include_close=True, metrics=metrics, force=force)
 
 
 def _wait_for_results(driver: webdriver.Chrome, timeout: int = DEFAULT_TIMEOUT) -> bool:
     def _ready(drv):
         if drv.find_elements(By.CSS_SELECTOR, "div.Nv2PK"):
             return True
-        if drv.find_elements(By.CSS_SELECTOR, "h1.DUwDvf, h1.fontHeadlineLarge"):
+        if drv.find_elements(By.CSS_SELECTOR, TITLE_SELECTOR):
             return True
         return False
 
@@ -283,6 +616,11 @@ def _find_results_container(driver: webdriver.Chrome, timeout: int = DEFAULT_TIM
     ]
 
     end_time = time.time() + timeout
+    container = _wait_for_container_event(driver, selectors, timeout)
+    if container is not None:
+        return container
+
+    # Fallback: polling (script assíncrono indisponível ou tempo restante).
     while time.time() < end_time:
         for selector in selectors:
             containers = driver.find_elements(By.CSS_SELECTOR, selector)
@@ -325,24 +663,86 @@ def _extract_listing_from_card(card):
         place_id = card.get_attribute("data-place-id") or ""
         cid = card.get_attribute("data-cid") or ""
         if not place_id and place_url:
-            place_id = _extract_place_id_from_url(place_url)
-
-        return {
-            "title": title,
-            "place_url": place_url,
-            "place_id": place_id,
-            "cid": cid,
-        }
+            place_id = extract_place_id_from_url(place_url)
+
+        item = ListingRecord(title=title, place_url=place_url, place_id=place_id, cid=cid)
+        item.update(parse_card_text(raw_text))
+        return item
     except StaleElementReferenceException:
         return None
 
 
-def _get_last_card_key(cards) -> str:
-    if not cards:
-        return ""
-    item = _extract_listing_from_card(cards[-1])
-    if not item:
+# Extrai todos os cards (a partir de `start`) em uma única chamada ao navegador.
+# Com only_new, pula cards já marcados com data-sm-read e marca os que devolve.
+# DOM sensível: mesmos seletores de _extract_listing_from_card.
+_READ_CARDS_SCRIPT = """
+const cards = document.querySelectorAll('div.Nv2PK');
+let start = arguments[0] || 0;
+const onlyNew = !!arguments[1];
+if (start < 0) { start = Math.max(cards.length + start, 0); }
+const selectors = ["a.hfpxzc", "a[href*='/maps/place/']", "a[href*='google.com/maps/place']"];
+const items = [];
+for (let i = start; i < cards.length; i++) {
+  const card = cards[i];
+  if (onlyNew) {
+    if (card.hasAttribute('data-sm-read')) { continue; }
+    card.setAttribute('data-sm-read', '1');
+  }
+  let link = null;
+  for (const selector of selectors) {
+    link = card.querySelector(selector);
+    if (link) { break; }
+  }
+  const text = (card.innerText || '').trim();
+  items.push({
+    text: text,
+    title: text ? text.split('\\n')[0].trim() : '',
+    place_url: link ? (link.href || '') : '',
+    place_id: card.getAttribute('data-place-id') || '',
+    cid: card.getAttribute('data-cid') || '',
+  });
+}
+return {count: cards.length, items: items};
+"""
+
+
+def _read_cards(driver: webdriver.Chrome, start: int = 0, only_new: bool = False):
+    """
+    Lê os cards de resultado a partir do índice `start` (negativo conta do fim).
+    Com only_new, devolve só cards ainda não lidos (marcador no DOM; no fallback, `start` é a marca d'água).
+    Retorna (total_de_cards, lista_de_dicts). Usa o caminho por elemento se o script falhar.
+    """
+    try:
+        payload = driver.execute_script(_READ_CARDS_SCRIPT, 0 if only_new else start, only_new)
+    except WebDriverException:
+        payload = None
+
+    if not isinstance(payload, dict):
+        cards = _find_result_cards(driver)
+        if only_new and start > len(cards):
+            start = 0  # a lista foi re-renderizada; o `seen` do coletor cuida das repetições
+        items = [_extract_listing_from_card(card) for card in cards[start:]]
+        return len(cards), [item for item in items if item]
+
+    items = []
+    for raw in payload.get("items") or []:
+        item = ListingRecord(
+            title=(raw.get("title") or "").strip(),
+            place_url=raw.get("place_url"),
+            place_id=raw.get("place_id"),
+            cid=raw.get("cid"),
+        )
+        item.update(parse_card_text(raw.get("text")))
+        if not item["place_id"] and item["place_url"]:
+            item["place_id"] = extract_place_id_from_url(item["place_url"])
+        items.append(item)
+    return int(payload.get("count") or 0), items
+
+
+def _get_last_card_key(items) -> str:
+    if not items:
         return ""
+    item = items[-1]
     return _build_listing_key(item) or _normalize_text(item.get("title"))
 
 
@@ -359,6 +759,114 @@ def _scroll_results_panel(driver: webdriver.Chrome, container) -> bool:
         return False
 
 
+# DOM sensível: o texto varia por idioma e por layout.
+_END_OF_LIST_TEXTS = [
+    "Você chegou ao fim da lista",
+    "Fim dos resultados",
+    "Não há mais resultados",
+    "You've reached the end of the list",
+    "End of list",
+    "No more results",
+]
+
+# Espera (sem polling) até um container visível com cards aparecer. Devolve o elemento ou null.
+_WAIT_CONTAINER_SCRIPT = """
+const selectors = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+function find() {
+  for (const selector of selectors) {
+    for (const el of document.querySelectorAll(selector)) {
+      if (el.offsetParent !== null && el.querySelector('div.Nv2PK')) { return el; }
+    }
+  }
+  return null;
+}
+const found = find();
+if (found) { done(found); return; }
+let timer = null;
+const observer = new MutationObserver(() => {
+  const el = find();
+  if (el) { observer.disconnect(); clearTimeout(timer); done(el); }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(() => { observer.disconnect(); done(null); }, timeoutMs);
+"""
+
+# Observa o feed até chegarem cards novos ('cards'), o fim da lista aparecer ('end') ou estourar o tempo ('timeout').
+_WAIT_CARDS_SCRIPT = """
+const container = arguments[0];
+const previousCount = arguments[1];
+const previousLastUrl = arguments[2];
+const endTexts = arguments[3];
+const timeoutMs = arguments[4];
+const done = arguments[arguments.length - 1];
+const root = container || document.body;
+function lastUrl(cards) {
+  if (!cards.length) { return ''; }
+  const link = cards[cards.length - 1].querySelector('a[href]');
+  return link ? link.href : '';
+}
+function check() {
+  const cards = root.querySelectorAll('div.Nv2PK');
+  if (cards.length > previousCount) { return 'cards'; }
+  const current = lastUrl(cards);
+  if (previousLastUrl && current && current !== previousLastUrl) { return 'cards'; }
+  const tail = root.lastElementChild ? (root.lastElementChild.innerText || '') : '';
+  for (const text of endTexts) {
+    if (tail.includes(text)) { return 'end'; }
+  }
+  return null;
+}
+const first = check();
+if (first) { done(first); return; }
+let timer = null;
+const observer = new MutationObserver(() => {
+  const outcome = check();
+  if (outcome) { observer.disconnect(); clearTimeout(timer); done(outcome); }
+});
+observer.observe(root, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(() => { observer.disconnect(); done('timeout'); }, timeoutMs);
+"""
+
+
+def _wait_for_container_event(driver: webdriver.Chrome, selectors, timeout: float):
+    try:
+        container = driver.execute_async_script(
+            _WAIT_CONTAINER_SCRIPT, selectors, int(min(timeout, SCRIPT_TIMEOUT - 2) * 1000)
+        )
+    except WebDriverException:
+        return None
+    return container or None
+
+
+def _wait_for_results_event(
+    driver: webdriver.Chrome,
+    container,
+    previous_count: int,
+    previous_last_url: str = "",
+    timeout: int = 8,
+):
+    """
+    Versão orientada a eventos de _wait_for_results_update (MutationObserver no feed).
+    Retorna 'cards', 'end' ou 'timeout'; None se o script não puder rodar (use o polling).
+    """
+    try:
+        outcome = driver.execute_async_script(
+            _WAIT_CARDS_SCRIPT,
+            container,
+            previous_count,
+            previous_last_url or "",
+            _END_OF_LIST_TEXTS,
+            int(min(timeout, SCRIPT_TIMEOUT - 2) * 1000),
+        )
+    except WebDriverException:
+        return None
+    if outcome in ("cards", "end", "timeout"):
+        return outcome
+    return None
+
+
 def _wait_for_results_update(
     driver: webdriver.Chrome,
     previous_count: int,
@@ -367,10 +875,10 @@ def _wait_for_results_update(
 ) -> bool:
     end_time = time.time() + timeout
     while time.time() < end_time:
-        cards = _find_result_cards(driver)
-        if len(cards) > previous_count:
+        count, last_items = _read_cards(driver, start=-1)
+        if count > previous_count:
             return True
-        current_last = _get_last_card_key(cards)
+        current_last = _get_last_card_key(last_items)
         if previous_last_key and current_last and current_last != previous_last_key:
             return True
         time.sleep(0.4)
@@ -378,16 +886,7 @@ def _wait_for_results_update(
 
 
 def _has_end_of_list_marker(driver: webdriver.Chrome) -> bool:
-    # DOM sensível: o texto varia por idioma e por layout.
-    end_texts = [
-        "Você chegou ao fim da lista",
-        "Fim dos resultados",
-        "Não há mais resultados",
-        "You've reached the end of the list",
-        "End of list",
-        "No more results",
-    ]
-    for text in end_texts:
+    for text in _END_OF_LIST_TEXTS:
         try:
             if driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]"):
                 return True
@@ -397,14 +896,14 @@ def _has_end_of_list_marker(driver: webdriver.Chrome) -> bool:
 
 
 def _is_place_details_view(driver: webdriver.Chrome) -> bool:
-    return bool(driver.find_elements(By.CSS_SELECTOR, "h1.DUwDvf, h1.fontHeadlineLarge"))
+    return bool(driver.find_elements(By.CSS_SELECTOR, TITLE_SELECTOR))
 
 
 def _get_place_title(driver: webdriver.Chrome, timeout: int = DEFAULT_TIMEOUT) -> str:
     # DOM sensível: o seletor do título muda com frequência.
     try:
         elem = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "h1.DUwDvf, h1.fontHeadlineLarge"))
+            EC.presence_of_element_located((By.CSS_SELECTOR, TITLE_SELECTOR))
         )
         return elem.text.strip()
     except TimeoutException:
@@ -413,55 +912,61 @@ def _get_place_title(driver: webdriver.Chrome, timeout: int = DEFAULT_TIMEOUT) -
 
 def _get_item_text(driver: webdriver.Chrome, selectors, prefer_href: bool = False) -> str:
     for selector in selectors:
-        try:
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-        except NoSuchElementException:
-            continue
-        except StaleElementReferenceException:
-            continue
+        with trace_span(driver, "selector", selector=selector) as span:
+            value = _get_selector_text(driver, selector, prefer_href, span)
+        if value:
+            return value
+    return ""
 
-        try:
-            if prefer_href:
-                href = element.get_attribute("href")
-                if href:
-                    return href.strip()
-            text = element.text.strip()
-            if text:
-                return text
-            aria = element.get_attribute("aria-label")
-            if aria:
-                return aria.strip()
-        except StaleElementReferenceException:
-            continue
+
+def _get_selector_text(driver: webdriver.Chrome, selector: str, prefer_href: bool, span) -> str:
+    try:
+        element = driver.find_element(By.CSS_SELECTOR, selector)
+    except NoSuchElementException:
+        span.set("missing")
+        return ""
+    except StaleElementReferenceException:
+        span.set("stale")
+        return ""
+
+    try:
+        if prefer_href:
+            href = element.get_attribute("href")
+            if href:
+                return href.strip()
+        text = element.text.strip()
+        if text:
+            return text
+        aria = element.get_attribute("aria-label")
+        if aria:
+            return aria.strip()
+    except StaleElementReferenceException:
+        span.set("stale")
+        return ""
+    span.set("empty")
     return ""
 
 
 def _extract_legacy_info(driver: webdriver.Chrome):
-    address = ""
-    phone = ""
-    website = ""
-    menu = ""
-    delivery = ""
-
-    # DOM sensível: ícones de mapas usam glifos internos.
-    infos = driver.find_elements(By.CLASS_NAME, "AeaXub")
-    for info in infos:
+    info = {}
+
+    infos = driver.find_elements(By.CLASS_NAME, LEGACY_INFO_CLASS)
+    for element in infos:
         try:
-            span = info.find_element(By.TAG_NAME, "span").text
+            span = element.find_element(By.TAG_NAME, "span").text
         except NoSuchElementException:
             continue
-        if span == "\ue0c8":
-            address = info.text
-        elif span == "\ue558":
-            delivery = info.text
-        elif span == "\ue0b0":
-            phone = info.text
-        elif span == "\ue561":
-            menu = info.text
-        elif span == "\ue80b":
-            website = info.text
-
-    return address, phone, website, menu, delivery
+        field = LEGACY_ICON_FIELDS.get(span)
+        if field:
+            info[field] = element.text
+
+    return (
+        info.get("address", ""),
+        info.get("phone", ""),
+        info.get("website", ""),
+        info.get("menu", ""),
+        info.get("delivery", ""),
+    )
 
 
 def collect_listing_urls(
@@ -470,14 +975,33 @@ def collect_listing_urls(
     headless: bool = True,
     return_metrics: bool = False,
     should_cancel=None,
+    driver=None,
+    on_listing=None,
 ):
-    driver = _get_driver(headless=headless)
+    if driver is None:
+        with _lease_driver(headless=headless) as leased:
+            return collect_listing_urls(
+                limit,
+                timeout=timeout,
+                headless=headless,
+                return_metrics=return_metrics,
+                should_cancel=should_cancel,
+                driver=leased,
+                on_listing=on_listing,
+            )
+
     limit = _normalize_limit(limit)
 
     metrics = {
         "scroll_attempts": 0,
         "stall_attempts": 0,
         "backoff_count": 0,
+        "cards_processed": 0,
+        "cards_skipped": 0,
+        "blocked_requests": 0,
+        "popup_checks": 0,
+        "popup_clicks": 0,
+        "popup_seconds": 0.0,
         "stop_reason": "",
     }
 
@@ -485,39 +1009,51 @@ def collect_listing_urls(
     if container is None:
         if _is_place_details_view(driver):
             title = _get_place_title(driver, timeout=timeout)
-            single = {
-                "title": title,
-                "place_url": driver.current_url,
-                "place_id": _extract_place_id_from_url(driver.current_url),
-                "cid": "",
-            }
+            single = ListingRecord(
+                title=title,
+                place_url=driver.current_url,
+                place_id=extract_place_id_from_url(driver.current_url),
+            )
             metrics["stop_reason"] = "single_place"
+            if on_listing:
+                on_listing(single)
             return ( [single], metrics ) if return_metrics else [single]
         metrics["stop_reason"] = "no_results_container"
         return ( [], metrics ) if return_metrics else []
 
     items = []
     seen = set()
+    cursor = 0
+    last_item = None
+    end_seen = False
+    captured = _start_network_capture(driver, metrics) if DETAILS_PARSER == "network" else None
 
     while len(items) < limit and metrics["scroll_attempts"] < SCROLL_MAX_TRIES:
         if should_cancel and should_cancel():
             metrics["stop_reason"] = "canceled"
             break
 
-        _dismiss_popups(driver)
-        cards = _find_result_cards(driver)
-        if not cards:
+        _dismiss_popups(driver, metrics=metrics)
+        # Só os cards novos desde a última rolagem são processados.
+        card_count, card_items = _read_cards(driver, start=cursor, only_new=True)
+        if not card_count:
             metrics["stop_reason"] = "no_cards"
             break
-
-        for card in cards:
+        # Pulados: cards que apareceram nesta rolagem e não voltaram na leitura (os já lidos antes não contam).
+        new_cards = max(card_count - cursor, 0)
+        cursor = card_count
+        if captured is not None:
+            _attach_network_details(driver, card_items, captured, metrics)
+        metrics["cards_processed"] += len(card_items)
+        metrics["cards_skipped"] += max(new_cards - len(card_items), 0)
+        if card_items:
+            last_item = card_items[-1]
+
+        for item in card_items:
             if should_cancel and should_cancel():
                 metrics["stop_reason"] = "canceled"
                 break
 
-            item = _extract_listing_from_card(card)
-            if not item:
-                continue
             if not item.get("place_url"):
                 continue
 
@@ -528,6 +1064,8 @@ def collect_listing_urls(
                 seen.add(key)
 
             items.append(item)
+            if on_listing:
+                on_listing(item)
             if len(items) >= limit:
                 break
 
@@ -535,19 +1073,40 @@ def collect_listing_urls(
             metrics["stop_reason"] = "limit"
             break
 
-        previous_count = len(cards)
-        previous_last_key = _get_last_card_key(cards)
-
-        if not _scroll_results_panel(driver, container):
-            container = _find_results_container(driver, timeout=5)
-            if container is None:
-                metrics["stop_reason"] = "container_lost"
-                break
+        if end_seen:
+            metrics["stop_reason"] = "end_marker"
+            break
 
-        metrics["scroll_attempts"] += 1
-        _human_delay()
+        previous_count = card_count
+        previous_last_key = _get_last_card_key([last_item] if last_item else [])
+
+        with trace_span(driver, "scroll", attempt=metrics["scroll_attempts"] + 1, cards=card_count) as span:
+            if not _scroll_results_panel(driver, container):
+                container = _find_results_container(driver, timeout=5)
+                if container is None:
+                    metrics["stop_reason"] = "container_lost"
+                    span.set("container_lost")
+                    break
+
+            metrics["scroll_attempts"] += 1
+            _human_delay()
+
+            outcome = _wait_for_results_event(
+                driver,
+                container,
+                previous_count,
+                previous_last_url=(last_item or {}).get("place_url", ""),
+            )
+            if outcome is None:
+                changed = _wait_for_results_update(driver, previous_count, previous_last_key)
+            elif outcome == "end":
+                # Lê os últimos cards na próxima volta e encerra.
+                end_seen = True
+                changed = True
+            else:
+                changed = outcome == "cards"
+            span.set("end" if end_seen else ("new_cards" if changed else "stall"))
 
-        changed = _wait_for_results_update(driver, previous_count, previous_last_key)
         if not changed:
             metrics["stall_attempts"] += 1
         else:
@@ -564,73 +1123,153 @@ def collect_listing_urls(
     if not metrics["stop_reason"]:
         metrics["stop_reason"] = "max_scroll_tries"
 
+    add_blocked_count(driver, metrics)
     return ( items, metrics ) if return_metrics else items
 
 
+def _network_details(place: dict, place_url: str = "") -> dict:
+    # Mesmo formato de extract_place_details; cardápio e delivery não vêm no payload.
+    return {
+        "name": place["name"],
+        "address": place["address"],
+        "delivery": "",
+        "phone": place["phone"],
+        "menu": "",
+        "website": place["website"],
+        "maps_url": place_url,
+        "place_id": place["place_id"],
+    }
+
+
+def _absorb_places(places, captured: dict, metrics: dict = None) -> None:
+    for place in places:
+        if place["place_id"] not in captured:
+            _add_metric(metrics, "network_places")
+        captured[place["place_id"]] = place
+        if place["cid"]:
+            captured[place["cid"]] = place
+
+
+def _start_network_capture(driver: webdriver.Chrome, metrics: dict = None):
+    """
+    Liga a captura de respostas para a Fase A e lê os locais do primeiro lote, que vêm embutidos no HTML
+    da busca (só as rolagens seguintes passam pela rede). None se o driver não permitir a captura.
+    """
+    if not enable_capture(driver):
+        return None
+    metrics.setdefault("network_places", 0)
+    captured = {}
+    try:
+        html = driver.page_source
+    except WebDriverException:
+        html = ""
+    _absorb_places(decode_initial_state(html), captured, metrics)
+    return captured
+
+
+def _attach_network_details(driver: webdriver.Chrome, items, captured: dict, metrics: dict = None) -> None:
+    """Decodifica os payloads recebidos desde a última rolagem e anexa os detalhes aos cards correspondentes."""
+    for body in collect_payloads(driver):
+        _add_metric(metrics, "network_payloads")
+        _absorb_places(decode_payload(body), captured, metrics)
+    for item in items:
+        place = captured.get(item.get("place_id")) or captured.get(item.get("cid"))
+        if place is not None:
+            item["network_details"] = _network_details(place, item.get("place_url") or "")
+
+
+def _extract_details_from_network(driver: webdriver.Chrome, place_url: str, maps_url: str):
+    # Prévia do local baixada pela página ou, em navegação direta, o estado inicial embutido no HTML.
+    wanted = {extract_place_id_from_url(maps_url), extract_place_id_from_url(place_url)} - {""}
+    if not wanted or not enable_capture(driver):
+        return None
+    places = [place for body in collect_payloads(driver) for place in decode_payload(body)]
+    if not any(place["place_id"] in wanted or place["cid"] in wanted for place in places):
+        try:
+            places = decode_initial_state(driver.page_source)
+        except WebDriverException:
+            return None
+    for place in places:
+        if place["place_id"] in wanted or place["cid"] in wanted:
+            return _network_details(place, maps_url)
+    return None
+
+
+def _extract_details_from_snapshot(driver: webdriver.Chrome, maps_url: str):
+    # Um único round trip (page_source); o resto é CPU local.
+    try:
+        html = driver.page_source
+    except WebDriverException:
+        return None
+    if not html:
+        return None
+    return parse_place_html(html, maps_url=maps_url)
+
+
 def extract_place_details(
     place_url: str,
     timeout: int = DEFAULT_TIMEOUT,
     headless: bool = True,
+    driver=None,
+    parser: str = None,
+    metrics: dict = None,
 ) -> dict:
-    driver = _get_driver(headless=headless)
-    try:
-        driver.get(place_url)
-    except WebDriverException:
-        return {}
+    if driver is None:
+        with _lease_driver(headless=headless) as leased:
+            return extract_place_details(
+                place_url, timeout=timeout, headless=headless, driver=leased, parser=parser, metrics=metrics
+            )
 
-    _accept_consent_if_present(driver)
-    _dismiss_popups(driver)
+    apply_resource_profile(driver, DETAIL_RESOURCE_PROFILE)
+    try:
+        with trace_span(driver, "place_details", place_url=place_url) as span:
+            details = _extract_place_details(driver, place_url, timeout=timeout, parser=parser, metrics=metrics)
+            if not details.get("name"):
+                span.set("empty")
+            return details
+    finally:
+        # Sempre drena o log de performance, senão ele acumula no chromedriver.
+        add_blocked_count(driver, metrics)
+
+
+def _extract_place_details(
+    driver: webdriver.Chrome, place_url: str, timeout: int, parser: str = None, metrics: dict = None
+) -> dict:
+    with trace_span(driver, "navigate", kind="place") as span:
+        try:
+            driver.get(place_url)
+        except WebDriverException:
+            span.set("error")
+            note_driver_error(driver)
+            return {}
+        finally:
+            note_navigation(driver)
+    note_driver_ok(driver)
+
+    # Enquanto o consentimento não foi dado neste driver, toda página nova é verificada.
+    _dismiss_popups(driver, metrics=metrics, force=not getattr(driver, "searchmaps_consent_done", False))
 
     name = _get_place_title(driver, timeout=timeout)
     maps_url = driver.current_url
 
-    # DOM sensível: dados de contato mudam com frequência.
-    address = _get_item_text(
-        driver,
-        [
-            "button[data-item-id='address']",
-            "div[data-item-id='address']",
-            "button[data-item-id='address'] span",
-            "div[data-item-id='address'] span",
-        ],
-    )
-    phone = _get_item_text(
-        driver,
-        [
-            "button[data-item-id='phone']",
-            "div[data-item-id='phone']",
-            "button[aria-label*='Telefone']",
-            "button[aria-label*='Phone']",
-        ],
-    )
-    website = _get_item_text(
-        driver,
-        [
-            "a[data-item-id='authority']",
-            "button[data-item-id='authority']",
-            "div[data-item-id='authority']",
-        ],
-        prefer_href=True,
-    )
-    menu = _get_item_text(
-        driver,
-        [
-            "a[data-item-id='menu']",
-            "a[data-item-id='action:menu']",
-            "button[data-item-id='menu']",
-        ],
-        prefer_href=True,
-    )
-    delivery = _get_item_text(
-        driver,
-        [
-            "a[data-item-id='action:order']",
-            "a[data-item-id='action:delivery']",
-            "a[data-item-id='action:order-online']",
-            "button[data-item-id='action:order']",
-        ],
-        prefer_href=True,
-    )
+    if (parser or DETAILS_PARSER) == "network":
+        details = _extract_details_from_network(driver, place_url, maps_url)
+        if details is not None and details["name"]:
+            _add_metric(metrics, "network_pages")
+            return details
+
+    if (parser or DETAILS_PARSER) == "snapshot":
+        details = _extract_details_from_snapshot(driver, maps_url)
+        if details is not None:
+            details["name"] = details.get("name") or name
+            return details
+
+    # DOM sensível: dados de contato mudam com frequência (seletores em page_parser).
+    address = _get_item_text(driver, ADDRESS_SELECTORS)
+    phone = _get_item_text(driver, PHONE_SELECTORS)
+    website = _get_item_text(driver, WEBSITE_SELECTORS, prefer_href=True)
+    menu = _get_item_text(driver, MENU_SELECTORS, prefer_href=True)
+    delivery = _get_item_text(driver, DELIVERY_SELECTORS, prefer_href=True)
 
     legacy_address, legacy_phone, legacy_website, legacy_menu, legacy_delivery = _extract_legacy_info(driver)
     if not address:
@@ -652,102 +1291,915 @@ def extract_place_details(
         "menu": menu,
         "website": website,
         "maps_url": maps_url,
-        "place_id": _extract_place_id_from_url(maps_url),
+        "place_id": extract_place_id_from_url(maps_url),
     }
 
 
-def search_places(
-    city: str,
-    query: str,
-    limit: int = DEFAULT_MAX_LIMIT,
+def _merge_listing_details(city: str, query: str, item: dict, details: dict) -> PlaceRecord:
+    place_url = item.get("place_url")
+    return PlaceRecord(
+        city=city,
+        query=query,
+        name=details.get("name") or item.get("title"),
+        address=details.get("address") or item.get("address"),
+        delivery=details.get("delivery"),
+        phone=details.get("phone") or item.get("phone"),
+        menu=details.get("menu"),
+        website=details.get("website"),
+        maps_url=details.get("maps_url") or place_url,
+        place_id=details.get("place_id") or item.get("place_id") or item.get("cid"),
+        place_url=place_url,
+    )
+
+
+def _card_details(item: dict) -> dict:
+    # Mesmas chaves de extract_place_details, preenchidas só com o que o card mostra.
+    place_url = item.get("place_url") or ""
+    return {
+        "name": item.get("title") or "",
+        "address": item.get("address") or "",
+        "delivery": "",
+        "phone": item.get("phone") or "",
+        "menu": "",
+        "website": "",
+        "maps_url": place_url,
+        "place_id": item.get("place_id") or extract_place_id_from_url(place_url),
+    }
+
+
+def _card_is_complete(item: dict) -> bool:
+    return bool(item.get("address") and item.get("phone"))
+
+
+def _needs_details_for_mode(mode: str):
+    if mode == "list_only":
+        return lambda item: False
+    if mode == "hybrid":
+        return lambda item: not _card_is_complete(item)
+    return None
+
+
+class _ExtraDrivers(list):
+    """
+    Drivers extras emprestados sem espera (ver _lease_extra_drivers). give_back devolve um deles ao
+    pool antes do fim da busca, para outra busca que está esperando driver não ficar parada.
+    """
+
+    def __init__(self, pool: DriverPool, leases):
+        super().__init__(pooled.driver for pooled in leases)
+        self.pool = pool
+        self._leases = list(leases)
+        self._lock = threading.Lock()
+
+    def contended(self) -> bool:
+        return self.pool.waiting > 0
+
+    def give_back(self, driver) -> bool:
+        driver = _current_driver(driver)
+        with self._lock:
+            pooled = next((pooled for pooled in self._leases if pooled.driver is driver), None)
+            if pooled is None:
+                return False
+            self._leases.remove(pooled)
+        detach_tracer(driver)
+        detach_profiler(driver)
+        self.pool.release(pooled)
+        return True
+
+    def release_all(self, error: BaseException = None) -> None:
+        with self._lock:
+            leases, self._leases = self._leases, []
+        for pooled in leases:
+            detach_tracer(pooled.driver)
+            detach_profiler(pooled.driver)
+            self.pool.release(pooled, error=error)
+
+
+def _iter_place_details(
+    listings,
+    drivers,
     timeout: int = DEFAULT_TIMEOUT,
-    headless: bool = True,
-    progress_cb=None,
     should_cancel=None,
-) -> list:
-    driver = _get_driver(headless=headless)
-    limit = _normalize_limit(limit)
+    needs_details=None,
+    metrics: dict = None,
+    known_details: dict = None,
+    spare: _ExtraDrivers = None,
+    late_driver=None,
+    late_ready: threading.Event = None,
+):
+    """
+    Gera (item, detalhes) na mesma ordem de `listings` (lista ou iterável que ainda está sendo produzido).
+    Cada driver em `drivers` é um worker; com mais de um, os detalhes são extraídos em paralelo.
+    Itens para os quais needs_details(item) é falso usam os dados do próprio card, sem abrir a página;
+    itens presentes em known_details (URL normalizada -> detalhes) ou no cache de locais também não.
+    Drivers de `spare` voltam ao pool entre duas páginas quando outra busca espera por driver (sempre
+    sobra ao menos um worker). `late_driver` entra como worker quando `late_ready` é setado (o driver
+    da busca, depois que a Fase B em pipeline termina a rolagem).
+    """
+    cache = _get_place_cache()
+    source = (item for item in listings if item.get("place_url"))
+
+    def resolve(item):
+        known = (known_details or {}).get(_normalize_place_url(item["place_url"]))
+        if known is not None:
+            return known
+        if item.get("network_details"):
+            # Decodificado do payload do feed na Fase A: não precisa abrir a página.
+            _add_metric(metrics, "network_hits")
+            return item["network_details"]
+        if needs_details is not None and not needs_details(item):
+            return _card_details(item)
+        if cache is None:
+            return None
+        cached = cache.get(_build_listing_key(item))
+        _add_metric(metrics, "cache_hits" if cached is not None else "cache_misses")
+        return cached
+
+    def fetch(item, own_driver):
+        with command_phase("phase_b"):
+            details = extract_place_details(item["place_url"], timeout=timeout, driver=own_driver, metrics=metrics)
+        if cache is not None and details.get("name"):
+            cache.put(_build_listing_key(item), details)
+        return details
+
+    if len(drivers) <= 1 and late_driver is None:
+        worker = drivers[0] if drivers else None
+        for item in source:
+            if should_cancel and should_cancel():
+                print("[SearchMaps] Cancelado pelo usuário durante Fase B.")
+                return
+            details = resolve(item)
+            if details is not None:
+                yield item, details
+                continue
+            details = fetch(item, worker)
+            worker = _recycle_if_needed(worker, metrics)
+            yield item, details
+            _human_delay()
+        return
 
-    start_time = time.perf_counter()
+    cond = threading.Condition()
+    source_lock = threading.Lock()
+    stop = threading.Event()
+    done = {}
+    claimed = []
+    state = {"exhausted": False, "error": None, "workers": len(drivers)}
+
+    def claim_next():
+        while True:
+            with source_lock:
+                if stop.is_set():
+                    return None
+                try:
+                    item = next(source)
+                except StopIteration:
+                    item = None
+                except Exception as exc:
+                    with cond:
+                        state["error"] = exc
+                    item = None
+                if item is not None and should_cancel and should_cancel():
+                    stop.set()
+                if stop.is_set():
+                    # Cancelado ou limite atingido enquanto a fonte era lida: o item é descartado sem abrir a página.
+                    return None
+                with cond:
+                    if item is None:
+                        state["exhausted"] = True
+                        cond.notify_all()
+                        return None
+                    index = len(claimed)
+                    claimed.append(item)
+            try:
+                details = resolve(item)
+            except Exception as exc:
+                # Falha no cache/known_details: repassada ao consumidor via `done`, como as do fetch.
+                with cond:
+                    done[index] = exc
+                    cond.notify_all()
+                return None
+            if details is None:
+                return index
+            with cond:
+                done[index] = details
+                cond.notify_all()
+
+    def work(own_driver):
+        while True:
+            index = claim_next()
+            if index is None:
+                return
+            try:
+                details = fetch(claimed[index], own_driver)
+            except Exception as exc:
+                with cond:
+                    done[index] = exc
+                    cond.notify_all()
+                return  # o erro é repassado ao consumidor via `done`
+            with cond:
+                done[index] = details
+                cond.notify_all()
+            try:
+                own_driver = _recycle_if_needed(own_driver, metrics)
+            except Exception as exc:
+                # Sem driver para seguir: o erro vai para o próximo item, como uma falha do próprio fetch.
+                index = claim_next()
+                if index is not None:
+                    with cond:
+                        done[index] = exc
+                        cond.notify_all()
+                return
+            if spare is not None and spare.contended():
+                with cond:
+                    leaving = state["workers"] > 1
+                    if leaving:
+                        state["workers"] -= 1
+                if leaving:
+                    if spare.give_back(own_driver):
+                        return
+                    with cond:
+                        state["workers"] += 1  # driver principal da busca: não é extra, segue trabalhando
+            _human_delay()
+
+    def join_late():
+        while not late_ready.wait(0.2):
+            if stop.is_set():
+                return
+        if stop.is_set():
+            return
+        with cond:
+            state["workers"] += 1
+        work(late_driver)
+
+    threads = [threading.Thread(target=work, args=(own_driver,), daemon=True) for own_driver in drivers]
+    if late_driver is not None:
+        threads.append(threading.Thread(target=join_late, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        index = 0
+        while True:
+            with cond:
+                while index not in done:
+                    if state["exhausted"] and index >= len(claimed):
+                        break
+                    if should_cancel and should_cancel():
+                        print("[SearchMaps] Cancelado pelo usuário durante Fase B.")
+                        return
+                    cond.wait(0.5)
+                if index not in done:
+                    if state["error"] is not None:
+                        raise state["error"]
+                    return
+                details = done.pop(index)
+                item = claimed[index]
+            if isinstance(details, Exception):
+                raise details
+            yield item, details
+            index += 1
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+class _ListingStream:
+    """
+    Roda a Fase A em uma thread e entrega cada listagem por uma fila limitada assim que ela aparece,
+    para a Fase B começar enquanto a rolagem continua. A fila cheia pausa a rolagem.
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        driver,
+        limit: int,
+        timeout: int,
+        should_cancel=None,
+        queue_size: int = 20,
+        on_listing=None,
+        on_finish=None,
+    ):
+        self.metrics = {}
+        self._listing_cb = on_listing
+        self._finish_cb = on_finish
+        self.count = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        # Setado quando a rolagem termina: o driver da busca fica livre para ajudar na Fase B.
+        self.scrolled = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(
+            target=self._run, args=(driver, limit, timeout, should_cancel), daemon=True
+        )
+        self._thread.start()
+
+    def _offer(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def _on_listing(self, item) -> None:
+        self.count += 1
+        if self._listing_cb:
+            self._listing_cb(item)
+        self._offer(item)
+
+    def _run(self, driver, limit, timeout, should_cancel) -> None:
+        try:
+            with command_phase("phase_a"), trace_span(driver, "phase_a", pipelined=True) as span:
+                items, metrics = collect_listing_urls(
+                    limit=limit,
+                    timeout=timeout,
+                    return_metrics=True,
+                    should_cancel=lambda: self._stop.is_set() or bool(should_cancel and should_cancel()),
+                    driver=driver,
+                    on_listing=self._on_listing,
+                )
+                span.set(metrics.get("stop_reason") or "ok", listings=len(items))
+            self.metrics.update(metrics)
+            if self._finish_cb:
+                self._finish_cb(metrics)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.scrolled.set()
+            self._offer(self._DONE)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._finished and not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is self._DONE:
+                self._finished = True
+                if self.error is not None:
+                    raise self.error
+                break
+            return item
+        raise StopIteration
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+@contextmanager
+def _lease_extra_drivers(count: int, headless: bool = True, tracer: Tracer = None, profiler: CommandProfiler = None):
+    # Pega até `count` drivers livres do pool sem esperar; devolve todos ao sair.
+    # Com outra busca esperando driver, não pega nenhum: o extra acelera esta busca, mas travaria a outra.
+    pool = _get_pool(headless=headless)
+    leases = []
+    for _ in range(max(count, 0)):
+        if pool.waiting:
+            break
+        try:
+            leases.append(pool.acquire(timeout=0))
+        except DriverPoolTimeoutError:
+            break
+    drivers = _ExtraDrivers(pool, leases)
+    for leased in drivers:
+        attach_tracer(leased, tracer)
+        attach_profiler(leased, profiler)
+    try:
+        yield drivers
+    except GeneratorExit:
+        # Gerador consumidor encerrado antes do fim: não é falha dos drivers.
+        drivers.release_all()
+        raise
+    except BaseException as exc:
+        drivers.release_all(error=exc)
+        raise
+    else:
+        drivers.release_all()
+
+
+def _open_search(driver: webdriver.Chrome, city: str, query: str, timeout: int) -> None:
+    with command_phase("open_search"):
+        _open_search_page(driver, city, query, timeout)
+
+
+def _open_search_page(driver: webdriver.Chrome, city: str, query: str, timeout: int) -> None:
     search_term = f"{query} em {city}"
-    search_url = f"https://www.google.com/maps/search/{quote_plus(search_term)}"
-    driver.get(search_url)
+    search_url = f"{MAPS_BASE_URL}/search/{quote_plus(search_term)}"
+    apply_resource_profile(driver, LIST_RESOURCE_PROFILE)
+    with trace_span(driver, "navigate", kind="search", url=search_url):
+        driver.get(search_url)
+        note_navigation(driver)
 
     _accept_consent_if_present(driver)
 
-    try:
-        _wait_for_results(driver, timeout=timeout)
-    except TimeoutException:
-        _fallback_search_box(driver, search_term)
-        _wait_for_results(driver, timeout=timeout)
+    with trace_span(driver, "wait_results") as span:
+        try:
+            _wait_for_results(driver, timeout=timeout)
+        except TimeoutException:
+            span.set("fallback_search_box")
+            _fallback_search_box(driver, search_term)
+            _wait_for_results(driver, timeout=timeout)
 
     _human_delay()
 
-    listings, metrics = collect_listing_urls(
-        limit=limit,
-        timeout=timeout,
-        headless=headless,
-        return_metrics=True,
-        should_cancel=should_cancel,
-    )
 
+def _log_phase_a(count: int, metrics: dict) -> None:
     print(
         "[SearchMaps] Fase A (lista) concluída | "
-        f"itens={len(listings)} | scrolls={metrics['scroll_attempts']} | "
-        f"backoffs={metrics['backoff_count']} | motivo={metrics['stop_reason']}"
+        f"itens={count} | scrolls={metrics.get('scroll_attempts', 0)} | "
+        f"backoffs={metrics.get('backoff_count', 0)} | cards={metrics.get('cards_processed', 0)} "
+        f"(pulados={metrics.get('cards_skipped', 0)}) | bloqueados={metrics.get('blocked_requests', 0)} | "
+        f"popups={metrics.get('popup_checks', 0)}/{metrics.get('popup_clicks', 0)} "
+        f"({metrics.get('popup_seconds', 0.0):.1f}s) | motivo={metrics.get('stop_reason', '')}"
+        + (f" | rede={metrics.get('network_places', 0)}" if DETAILS_PARSER == "network" else "")
     )
 
-    results = []
-    seen = set()
 
-    for item in listings:
-        if should_cancel and should_cancel():
-            print("[SearchMaps] Cancelado pelo usuário durante Fase B.")
-            break
+def _resolve_city_bounds(driver: webdriver.Chrome, city: str, timeout: int = DEFAULT_TIMEOUT):
+    # O próprio Maps enquadra a cidade: o viewport vem do trecho @lat,lng,zoom da URL final.
+    with trace_span(driver, "navigate", kind="city_viewport"):
+        driver.get(f"{MAPS_BASE_URL}/search/{quote_plus(city)}")
+        note_navigation(driver)
+    _accept_consent_if_present(driver)
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: "/maps/place/" in d.current_url and parse_viewport(d.current_url)
+        )
+    except TimeoutException:
+        pass
+    viewport = parse_viewport(driver.current_url)
+    if viewport is None:
+        return None
+    return viewport_bounds(*viewport)
 
-        place_url = item.get("place_url")
-        if not place_url:
-            continue
 
-        details = extract_place_details(place_url, timeout=timeout, headless=headless)
-        merged = {
-            "city": city,
-            "query": query,
-            "name": details.get("name") or item.get("title") or "",
-            "address": details.get("address") or "",
-            "delivery": details.get("delivery") or "",
-            "phone": details.get("phone") or "",
-            "menu": details.get("menu") or "",
-            "website": details.get("website") or "",
-            "maps_url": details.get("maps_url") or place_url,
-            "place_id": details.get("place_id") or item.get("place_id") or item.get("cid") or "",
-            "place_url": place_url,
-        }
-
-        key = _build_final_key(merged)
-        if key and key in seen:
-            continue
-        if key:
-            seen.add(key)
+def _collect_tiled_listings(
+    city: str,
+    query: str,
+    limit: int,
+    timeout: int,
+    drivers,
+    should_cancel=None,
+    on_listing=None,
+):
+    """
+    Fase A em tiles: divide o viewport da cidade em uma grade, busca cada tile com URL restrita ao
+    viewport (um worker por driver) e subdivide tiles densos. Retorna (listagens, métricas), com as
+    listagens deduplicadas pela chave de listagem e ordenadas pela posição do tile na grade.
+    """
+    metrics = {
+        "tiles": 0,
+        "tiles_split": 0,
+        "tile_errors": 0,
+        "scroll_attempts": 0,
+        "backoff_count": 0,
+        "cards_processed": 0,
+        "cards_skipped": 0,
+        "blocked_requests": 0,
+        "popup_checks": 0,
+        "popup_clicks": 0,
+        "popup_seconds": 0.0,
+        "network_places": 0,
+        "stop_reason": "",
+    }
+
+    bounds = _resolve_city_bounds(drivers[0], city, timeout=timeout)
+    if bounds is None:
+        # Sem viewport não há como montar a grade: volta para a busca única.
+        print(f"[SearchMaps] Tiles: viewport de '{city}' não encontrado, usando busca única.")
+        _open_search(drivers[0], city, query, timeout)
+        return collect_listing_urls(
+            limit=limit,
+            timeout=timeout,
+            return_metrics=True,
+            should_cancel=should_cancel,
+            driver=drivers[0],
+            on_listing=on_listing,
+        )
+
+    tiles = queue.Queue()
+    for tile in grid(bounds, TILE_GRID, TILE_GRID):
+        tiles.put(tile)
+
+    found = {}
+    found_lock = threading.Lock()
+    stop = threading.Event()
+    done = threading.Event()
+
+    def canceled() -> bool:
+        return stop.is_set() or bool(should_cancel and should_cancel())
+
+    def run_tile(own_driver, tile) -> None:
+        with command_phase("phase_a"), trace_span(own_driver, "tile", path=list(tile.path), depth=tile.depth) as span:
+            found_before = len(found)
+            _run_tile(own_driver, tile)
+            span.set(new_listings=len(found) - found_before)
+
+    def _run_tile(own_driver, tile) -> None:
+        with trace_span(own_driver, "navigate", kind="tile"):
+            own_driver.get(tile_url(query, tile, base_url=MAPS_BASE_URL))
+            note_navigation(own_driver)
+        _accept_consent_if_present(own_driver, metrics=metrics)
+        try:
+            _wait_for_results(own_driver, timeout=timeout)
+        except TimeoutException:
+            pass  # tile sem resultados ou com um único local: collect_listing_urls trata
+
+        items, tile_metrics = collect_listing_urls(
+            limit=limit,
+            timeout=timeout,
+            return_metrics=True,
+            should_cancel=canceled,
+            driver=own_driver,
+        )
+        _add_metric(metrics, "tiles")
+        for key, value in tile_metrics.items():
+            if key != "stop_reason" and key in metrics:
+                _add_metric(metrics, key, value)
+
+        for position, item in enumerate(items):
+            listing_key = _build_listing_key(item)
+            if not listing_key:
+                continue
+            with found_lock:
+                if listing_key in found or len(found) >= limit:
+                    continue
+                found[listing_key] = (tile.path, position, item)
+                if len(found) >= limit:
+                    stop.set()
+            if on_listing:
+                on_listing(item)
+
+        # Tile denso provavelmente bateu no teto do feed: divide em 4 para cobrir o que ficou de fora.
+        if len(items) >= TILE_SPLIT_THRESHOLD and tile.depth < TILE_MAX_DEPTH and not canceled():
+            _add_metric(metrics, "tiles_split")
+            for child in split(tile):
+                tiles.put(child)
+
+    def work(own_driver) -> None:
+        while True:
+            try:
+                tile = tiles.get(timeout=0.2)
+            except queue.Empty:
+                if done.is_set():
+                    return
+                continue
+            try:
+                if not canceled():
+                    run_tile(own_driver, tile)
+            except Exception as exc:
+                _add_metric(metrics, "tile_errors")
+                print(f"[SearchMaps] Tile {tile.path} falhou: {exc}")
+            finally:
+                tiles.task_done()
+
+    threads = [threading.Thread(target=work, args=(own_driver,), daemon=True) for own_driver in drivers]
+    for thread in threads:
+        thread.start()
+    tiles.join()
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    listings = [item for _, _, item in sorted(found.values(), key=lambda entry: (entry[0], entry[1]))]
+    if len(listings) >= limit:
+        metrics["stop_reason"] = "limit"
+    elif should_cancel and should_cancel():
+        metrics["stop_reason"] = "canceled"
+    elif metrics["tile_errors"]:
+        # Algum tile falhou: a lista tem buracos e não pode ser reaproveitada como completa no checkpoint.
+        metrics["stop_reason"] = "tiles_partial"
+    else:
+        metrics["stop_reason"] = "tiles_done"
+    print(
+        f"[SearchMaps] Tiles concluídos | tiles={metrics['tiles']} | divididos={metrics['tiles_split']} | "
+        f"erros={metrics['tile_errors']} | workers={len(drivers)} | únicos={len(listings)}"
+    )
+    return listings, metrics
+
+
+def search_places_iter(
+    city: str,
+    query: str,
+    limit: int = DEFAULT_MAX_LIMIT,
+    timeout: int = DEFAULT_TIMEOUT,
+    headless: bool = True,
+    should_cancel=None,
+    driver=None,
+    detail_workers=None,
+    mode: str = "full",
+    known_results: dict = None,
+    checkpoint: SearchCheckpoint = None,
+    tiled: bool = None,
+    tracer: Tracer = None,
+    profiler: CommandProfiler = None,
+    summary: dict = None,
+):
+    """
+    Versão em streaming de search_places: gera cada local (dict já mesclado e deduplicado) assim que
+    ele fica pronto, na mesma ordem da lista. Com drivers livres no pool e SEARCHMAPS_PIPELINE ativo,
+    a Fase B roda nesses drivers enquanto o driver da busca continua rolando a lista (Fase A).
+    Com `checkpoint`, cada listagem e cada resultado são gravados assim que ficam prontos; locais já
+    detalhados no checkpoint não são reabertos e uma lista completa salva dispensa a rolagem.
+    Com `tiled` (padrão SEARCHMAPS_TILING), a Fase A cobre a cidade em tiles (ver _collect_tiled_listings).
+    Com `tracer`, cada fase, navegação, rolagem, página de local e seletor vira um span (ver tracing.py).
+    Com `profiler` (ou SEARCHMAPS_PROFILE_COMMANDS ativo), cada comando WebDriver é contado por fase e
+    helper (ver command_profiler.py) e o relatório é impresso ao fim da busca.
+    Com `summary`, recebe o stop_reason da Fase A (ex.: "end_marker" quando a lista acabou de fato).
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Modo de busca inválido: {mode}")
 
-        results.append(merged)
-        if progress_cb:
-            progress_cb(len(results), limit)
+    if profiler is None and PROFILE_COMMANDS:
+        profiler = CommandProfiler(f"{city} | {query} | {mode}")
 
-        _human_delay()
+    with _lease_driver(driver, headless=headless) as leased:
+        attach_tracer(leased, tracer)
+        attach_profiler(leased, profiler)
+        try:
+            with trace_span(leased, "search", city=city, query=query, mode=mode) as span:
+                count = 0
+                try:
+                    for merged in _search_places_iter(
+                        city,
+                        query,
+                        limit,
+                        timeout,
+                        headless,
+                        should_cancel,
+                        leased,
+                        detail_workers,
+                        mode,
+                        known_results,
+                        checkpoint,
+                        tiled,
+                        tracer,
+                        profiler,
+                        summary,
+                    ):
+                        count += 1
+                        yield merged
+                finally:
+                    span.set(results=count)
+        finally:
+            if tracer is not None:
+                detach_tracer(_current_driver(leased))
+            if profiler is not None:
+                detach_profiler(_current_driver(leased))
+                print(profiler.format_report(top=PROFILE_COMMANDS_TOP))
+
+
+def _search_places_iter(
+    city,
+    query,
+    limit,
+    timeout,
+    headless,
+    should_cancel,
+    driver,
+    detail_workers,
+    mode,
+    known_results,
+    checkpoint,
+    tiled,
+    tracer,
+    profiler,
+    summary,
+):
+    limit = _normalize_limit(limit)
+    workers = max(1, detail_workers or DETAIL_WORKERS)
+    tiled = TILING_ENABLED if tiled is None else tiled
+    needs_details = _needs_details_for_mode(mode)
 
-        if limit and len(results) >= limit:
-            break
+    start_time = time.perf_counter()
+
+    saved_listings = None
+    on_listing = None
+    on_finish = None
+    if checkpoint is not None:
+        if checkpoint.results:
+            known_results = dict(known_results or {})
+            for result in checkpoint.results.values():
+                known_results.setdefault(_normalize_place_url(result.get("place_url")), result)
+        saved_listings = checkpoint.reusable_listings(limit)
+
+        def on_listing(item):
+            checkpoint.add_listing(_build_listing_key(item), item)
 
+        def on_finish(metrics):
+            checkpoint.finish_listings(metrics.get("stop_reason"))
+
+    if saved_listings is None and not tiled:
+        _open_search(driver, city, query, timeout)
+
+    count = 0
+    seen = set()
+    detail_metrics = {
+        "blocked_requests": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "popup_checks": 0,
+        "popup_clicks": 0,
+        "popup_seconds": 0.0,
+        "network_hits": 0,
+        "network_pages": 0,
+    }
+    stream = None
+    listings = []
+    details_iter = None
+
+    # Pipeline precisa de drivers próprios para a Fase B: o driver da busca fica rolando a lista.
+    pipelined = PIPELINE_ENABLED and mode != "list_only" and not tiled
+    with ExitStack() as leases:
+        # Drivers extras só são pegos quando a fase que os usa começa, para não prender o pool à toa.
+        def lease_extra(count):
+            return leases.enter_context(
+                _lease_extra_drivers(count, headless=headless, tracer=tracer, profiler=profiler)
+            )
+
+        extra = lease_extra(workers) if pipelined and saved_listings is None else []
+        if saved_listings is not None:
+            # Lista completa no checkpoint: vai direto para a Fase B, sem abrir a busca.
+            listings = saved_listings[:limit]
+            print(f"[SearchMaps] Fase A retomada do checkpoint | itens={len(listings)}")
+            phase_a = {"stop_reason": checkpoint.stop_reason}
+            source = listings
+            extra = lease_extra(workers - 1)
+            drivers = [driver] + extra
+        elif tiled:
+            extra = lease_extra(workers - 1)
+            # Tiles usam até SEARCHMAPS_TILE_WORKERS drivers; os que sobram da Fase B voltam ao pool no fim dela.
+            with _lease_extra_drivers(
+                max(workers, TILE_WORKERS) - workers, headless=headless, tracer=tracer, profiler=profiler
+            ) as tile_extra:
+                with command_phase("phase_a"), trace_span(driver, "phase_a", tiled=True) as span:
+                    listings, metrics = _collect_tiled_listings(
+                        city,
+                        query,
+                        limit,
+                        timeout,
+                        [driver] + extra + tile_extra,
+                        should_cancel=should_cancel,
+                        on_listing=on_listing,
+                    )
+                    span.set(metrics.get("stop_reason") or "ok", listings=len(listings))
+            if on_finish:
+                on_finish(metrics)
+            _log_phase_a(len(listings), metrics)
+            phase_a = metrics
+            source = listings
+            drivers = [driver] + extra
+        elif pipelined and extra:
+            stream = _ListingStream(
+                driver,
+                limit,
+                timeout,
+                should_cancel=should_cancel,
+                queue_size=PIPELINE_QUEUE_SIZE,
+                on_listing=on_listing,
+                on_finish=on_finish,
+            )
+            source = stream
+            drivers = extra
+            phase_a = stream.metrics
+        else:
+            with command_phase("phase_a"), trace_span(driver, "phase_a") as span:
+                listings, metrics = collect_listing_urls(
+                    limit=limit,
+                    timeout=timeout,
+                    return_metrics=True,
+                    should_cancel=should_cancel,
+                    driver=driver,
+                    on_listing=on_listing,
+                )
+                span.set(metrics.get("stop_reason") or "ok", listings=len(listings))
+            if on_finish:
+                on_finish(metrics)
+            _log_phase_a(len(listings), metrics)
+            phase_a = metrics
+            source = listings
+            extra = lease_extra(workers - 1)
+            drivers = [driver] + extra
+
+        details_iter = _iter_place_details(
+            source,
+            drivers,
+            timeout=timeout,
+            should_cancel=should_cancel,
+            needs_details=needs_details,
+            metrics=detail_metrics,
+            known_details=known_results,
+            spare=extra or None,
+            late_driver=driver if stream is not None else None,
+            late_ready=stream.scrolled if stream is not None else None,
+        )
+        try:
+            for item, details in details_iter:
+                merged = _merge_listing_details(city, query, item, details)
+
+                key = _build_final_key(merged)
+                if key and key in seen:
+                    continue
+                if key:
+                    seen.add(key)
+
+                if checkpoint is not None:
+                    checkpoint.add_result(_build_listing_key(item), merged)
+                count += 1
+                yield merged
+
+                if limit and count >= limit:
+                    break
+        finally:
+            if stream is not None:
+                stream.close()
+            details_iter.close()
+            if stream is not None:
+                _log_phase_a(stream.count, stream.metrics)
+            if summary is not None:
+                summary["stop_reason"] = phase_a.get("stop_reason") or ""
+
+    total = stream.count if stream is not None else len(listings)
     elapsed = time.perf_counter() - start_time
     print(
         "[SearchMaps] Fase B (detalhes) concluída | "
-        f"detalhados={len(results)}/{len(listings)} | tempo_total={elapsed:.1f}s"
+        f"detalhados={count}/{total} | modo={mode} | pipeline={'sim' if stream is not None else 'não'} | "
+        f"bloqueados={detail_metrics['blocked_requests']} | "
+        f"cache={detail_metrics['cache_hits']}/{detail_metrics['cache_hits'] + detail_metrics['cache_misses']} | "
+        f"popups={detail_metrics['popup_checks']}/{detail_metrics['popup_clicks']} "
+        f"({detail_metrics['popup_seconds']:.1f}s) | "
+        + (
+            f"rede={detail_metrics['network_hits']}+{detail_metrics['network_pages']} | "
+            if DETAILS_PARSER == "network"
+            else ""
+        )
+        + f"tempo_total={elapsed:.1f}s"
+    )
+
+
+def search_places(
+    city: str,
+    query: str,
+    limit: int = DEFAULT_MAX_LIMIT,
+    timeout: int = DEFAULT_TIMEOUT,
+    headless: bool = True,
+    progress_cb=None,
+    should_cancel=None,
+    driver=None,
+    detail_workers=None,
+    mode: str = "full",
+    known_results: dict = None,
+    checkpoint: SearchCheckpoint = None,
+    tiled: bool = None,
+    tracer: Tracer = None,
+    profiler: CommandProfiler = None,
+    summary: dict = None,
+) -> list:
+    limit = _normalize_limit(limit)
+    results = []
+    places = search_places_iter(
+        city,
+        query,
+        limit=limit,
+        timeout=timeout,
+        headless=headless,
+        should_cancel=should_cancel,
+        driver=driver,
+        detail_workers=detail_workers,
+        mode=mode,
+        known_results=known_results,
+        checkpoint=checkpoint,
+        tiled=tiled,
+        tracer=tracer,
+        profiler=profiler,
+        summary=summary,
     )
+    try:
+        for merged in places:
+            results.append(merged)
+            if progress_cb:
+                progress_cb(len(results), limit)
+    finally:
+        places.close()
 
     return results
 
 
+def _export_trace(tracer: Tracer, label: str) -> str:
+    slug = re.sub(r"[^\w]+", "-", _normalize_text(label)).strip("-")[:60] or "busca"
+    filename = f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{slug}.json"
+    path = tracer.export(os.path.join(TRACE_DIR, filename))
+    print(f"[SearchMaps] Trace exportado: {path}")
+    return path
+
+
 # Função para buscar estabelecimentos em uma cidade
 def buscar_estabelecimentos(
     cidade,
@@ -758,6 +2210,11 @@ def buscar_estabelecimentos(
     should_cancel=None,
     return_dicts=False,
     headless=True,
+    mode="full",
+    use_cache=True,
+    return_cache_status=False,
+    tiled=None,
+    tracer=None,
 ):
     """
     Busca estabelecimentos no Google Maps.
@@ -767,45 +2224,96 @@ def buscar_estabelecimentos(
     :param limit: Limite máximo de resultados.
     :param progress_cb: Callback opcional para progresso (recebe contagem atual e limite).
     :param should_cancel: Callback opcional para cancelamento (retorna True para cancelar).
-    :param return_dicts: Se True, retorna lista de dicts; caso contrário, lista de listas compatível com SQLite.
+    :param return_dicts: Se True, retorna lista de dicts; caso contrário, lista de PlaceRecord (aceita por
+        db.salvar_dados_no_banco e convertida em dict só na borda da API).
     :param headless: Se False, abre o Chrome visível (ignorado quando SEARCHMAPS_DEBUG está ativo).
+    :param mode: "full" (abre cada local), "list_only" (só dados do card) ou "hybrid" (abre só cards incompletos).
+    :param use_cache: Se True, usa o cache de buscas (SEARCHMAPS_SEARCH_CACHE_TTL > 0).
+    :param return_cache_status: Se True, retorna (resultados, status_do_cache).
+    :param tiled: Se True, cobre a cidade em tiles (padrão SEARCHMAPS_TILING).
+    :param tracer: Tracer (tracing.Tracer) que recebe os spans da busca. Sem ele, com SEARCHMAPS_TRACE
+        ativo, um tracer é criado e exportado em JSON para SEARCHMAPS_TRACE_DIR.
     """
     location = cidade
     if state:
         location = f"{cidade}, {state}"
 
-    results = search_places(
-        city=location,
-        query=tipo_estabelecimento,
-        limit=limit,
-        timeout=DEFAULT_TIMEOUT,
-        headless=headless,
-        progress_cb=progress_cb,
-        should_cancel=should_cancel,
-    )
-
-    if return_dicts:
-        for item in results:
-            item["city"] = cidade
-            item["query"] = tipo_estabelecimento
-        return results
-
-    estabelecimentos = []
-    for item in results:
-        estabelecimentos.append(
-            [
-                cidade,
-                tipo_estabelecimento,
-                item.get("name", ""),
-                item.get("address", ""),
-                item.get("delivery", ""),
-                item.get("phone", ""),
-                item.get("menu", ""),
-                item.get("website", ""),
-            ]
+    normalized_limit = _normalize_limit(limit)
+    cache = _get_search_cache() if use_cache else None
+    tiled = TILING_ENABLED if tiled is None else tiled
+    # Busca em tiles traz outro conjunto de resultados: cache e checkpoint ficam separados.
+    cache_key = SearchCache.make_key(cidade, state, tipo_estabelecimento, f"{mode}+tiled" if tiled else mode)
+    cache_status = {"status": "off"}
+    known_results = None
+    results = None
+
+    if cache is not None:
+        entry = cache.get(cache_key)
+        if entry is None:
+            cache_status = {"status": "miss"}
+        else:
+            cached = [PlaceRecord.from_dict(item) for item in entry["results"]]
+            cache_status = {
+                "status": "hit",
+                "age_seconds": round(time.time() - entry["created_at"], 1),
+                "cached_count": len(cached),
+            }
+            if len(cached) >= normalized_limit or entry["exhausted"]:
+                results = cached[:normalized_limit]
+                if progress_cb:
+                    progress_cb(len(results), normalized_limit)
+            else:
+                # Limite maior que o do cache: refaz a lista, mas só abre os locais novos.
+                cache_status["status"] = "partial"
+                known_results = {_normalize_place_url(item.get("place_url")): item for item in cached}
+        cache.record(cache_status["status"])
+        print(f"[SearchMaps] Cache de busca: {cache_status['status']} | chave={cache_key}")
+
+    if results is None:
+        own_tracer = None
+        if tracer is None and TRACE_ENABLED:
+            own_tracer = Tracer(f"{location} | {tipo_estabelecimento} | {mode}")
+        checkpoint = None
+        store = _get_checkpoint_store()
+        if store is not None:
+            checkpoint = SearchCheckpoint(store, cache_key)
+            if checkpoint.resumed:
+                print(
+                    "[SearchMaps] Retomando do checkpoint | "
+                    f"listados={len(checkpoint.listings)} | detalhados={len(checkpoint.results)} | chave={cache_key}"
+                )
+        summary = {}
+        results = search_places(
+            city=location,
+            query=tipo_estabelecimento,
+            limit=normalized_limit,
+            timeout=DEFAULT_TIMEOUT,
+            headless=headless,
+            progress_cb=progress_cb,
+            should_cancel=should_cancel,
+            mode=mode,
+            known_results=known_results,
+            checkpoint=checkpoint,
+            tiled=tiled,
+            tracer=tracer or own_tracer,
+            summary=summary,
         )
+        canceled = bool(should_cancel and should_cancel())
+        if checkpoint is not None and not canceled:
+            # Busca concluída: o checkpoint só serve para buscas interrompidas.
+            checkpoint.discard()
+        if cache is not None and not canceled and results:
+            # Só o fim real da lista vale como esgotada; paradas por erro/rolagem não entram como completas.
+            cache.put(cache_key, results, normalized_limit, exhausted=summary.get("stop_reason") == "end_marker")
+        if own_tracer is not None:
+            _export_trace(own_tracer, cache_key)
 
-    return estabelecimentos
+    for item in results:
+        item["city"] = cidade
+        item["query"] = tipo_estabelecimento
+    if return_dicts:
+        results = [item.to_dict() for item in results]
+    return (results, cache_status) if return_cache_status else results
 
 
 def visualizar_dados():
@@ -833,20 +2341,22 @@ def visualizar_dados():
 
 def search():
 
-    # Perguntar ao usuário as cidades e o tipo de estabelecimento
+    # Perguntar ao usuário as cidades e os tipos de estabelecimento
     cidades = input("Digite as cidades que deseja pesquisar, separadas por vírgula: ").split(",")
-    tipo_estabelecimento = input(
-        "Digite o tipo de estabelecimento que deseja pesquisar (ex: pizzarias, restaurantes, etc.): "
-    ).strip()
+    tipos = input(
+        "Digite os tipos de estabelecimento que deseja pesquisar, separados por vírgula (ex: pizzarias, restaurantes): "
+    ).split(",")
+
+    # Cada combinação cidade × tipo é uma tarefa; com SEARCHMAPS_BATCH_WORKERS > 1 rodam em paralelo.
+    tarefas = build_tasks(cidades, tipos)
+    resultados = run_batch(tarefas)
 
-    # Coleta os dados de cada cidade
-    dados_completos = []
-    for cidade in cidades:
-        cidade = cidade.strip()  # Remove espaços extras
-        dados_cidade = buscar_estabelecimentos(cidade, tipo_estabelecimento)
-        dados_completos.extend(dados_cidade)
+    falhas = [item for item in resultados if item["error"]]
+    for item in falhas:
+        print(f"Falha em {item['city']} / {item['query']}: {item['error']}")
 
     # Salvar no banco
+    dados_completos = merge_rows(resultados)
     salvar_dados_no_banco(dados_completos)
 
     print("\nDados coletados e salvos com sucesso.")
@@ -0,0 +1,52 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+SEARCH_DIR = Path(__file__).resolve().parents[1]
+if str(SEARCH_DIR) not in sys.path:
+    sys.path.insert(0, str(SEARCH_DIR))
+
+import searcher  # noqa: E402
+
+
+class _BrokenCache:
+    def get(self, key):
+        raise RuntimeError("cache corrompido")
+
+    def put(self, key, details):
+        pass
+
+
+class IterPlaceDetailsTest(unittest.TestCase):
+    def setUp(self):
+        self._get_place_cache = searcher._get_place_cache
+        searcher._get_place_cache = lambda: _BrokenCache()
+
+    def tearDown(self):
+        searcher._get_place_cache = self._get_place_cache
+
+    def test_resolver_error_reaches_consumer(self):
+        listings = [
+            {"title": f"Local {index}", "place_url": f"https://www.google.com/maps/place/local-{index}"}
+            for index in range(5)
+        ]
+        outcome = {}
+
+        def consume():
+            try:
+                outcome["items"] = list(searcher._iter_place_details(listings, [object(), object()], timeout=1))
+            except Exception as exc:
+                outcome["error"] = exc
+
+        thread = threading.Thread(target=consume, daemon=True)
+        thread.start()
+        thread.join(10)
+
+        self.assertFalse(thread.is_alive(), "o iterador travou esperando um worker que morreu")
+        self.assertIsInstance(outcome.get("error"), RuntimeError)
+        self.assertEqual(str(outcome["error"]), "cache corrompido")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import math
+import re
+from urllib.parse import quote_plus
+
+# Tamanho da janela do Chrome (ver searcher._create_driver); define quanto mapa cabe em um zoom.
+VIEWPORT_WIDTH = 1920
+VIEWPORT_HEIGHT = 1080
+MIN_ZOOM = 3.0
+MAX_ZOOM = 21.0
+
+_VIEWPORT_RE = re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?),(\d+(?:\.\d+)?)z")
+
+
+class Tile:
+    """Retângulo do mapa (graus). `path` identifica o tile na grade e nas subdivisões, ex.: (4, 2)."""
+
+    __slots__ = ("south", "west", "north", "east", "depth", "path")
+
+    def __init__(self, south: float, west: float, north: float, east: float, depth: int = 0, path=()):
+        self.south = south
+        self.west = west
+        self.north = north
+        self.east = east
+        self.depth = depth
+        self.path = tuple(path)
+
+    @property
+    def center(self):
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    def __repr__(self) -> str:
+        return (
+            f"Tile(path={self.path}, south={self.south:.5f}, west={self.west:.5f}, "
+            f"north={self.north:.5f}, east={self.east:.5f})"
+        )
+
+
+def parse_viewport(url: str):
+    """Lê (lat, lng, zoom) do trecho `@lat,lng,zoomz` de uma URL do Maps; None se não houver."""
+    match = _VIEWPORT_RE.search(url or "")
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2)), float(match.group(3))
+
+
+def viewport_bounds(lat: float, lng: float, zoom: float, width: int = VIEWPORT_WIDTH, height: int = VIEWPORT_HEIGHT):
+    """Retângulo visível na janela para um centro/zoom (projeção Web Mercator, tiles de 256 px)."""
+    lng_span = 360.0 * width / (256.0 * 2 ** zoom)
+    lat_span = lng_span * height / width * math.cos(math.radians(lat))
+    return Tile(lat - lat_span / 2, lng - lng_span / 2, lat + lat_span / 2, lng + lng_span / 2)
+
+
+def grid(bounds: Tile, rows: int, cols: int):
+    rows = max(1, int(rows))
+    cols = max(1, int(cols))
+    lat_step = (bounds.north - bounds.south) / rows
+    lng_step = (bounds.east - bounds.west) / cols
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            south = bounds.south + row * lat_step
+            west = bounds.west + col * lng_step
+            tiles.append(Tile(south, west, south + lat_step, west + lng_step, 0, (row * cols + col,)))
+    return tiles
+
+
+def split(tile: Tile):
+    """Divide um tile denso em 4 quadrantes."""
+    mid_lat, mid_lng = tile.center
+    depth = tile.depth + 1
+    return [
+        Tile(tile.south, tile.west, mid_lat, mid_lng, depth, tile.path + (0,)),
+        Tile(tile.south, mid_lng, mid_lat, tile.east, depth, tile.path + (1,)),
+        Tile(mid_lat, tile.west, tile.north, mid_lng, depth, tile.path + (2,)),
+        Tile(mid_lat, mid_lng, tile.north, tile.east, depth, tile.path + (3,)),
+    ]
+
+
+def tile_zoom(tile: Tile, width: int = VIEWPORT_WIDTH, height: int = VIEWPORT_HEIGHT) -> float:
+    """Maior zoom em que o tile inteiro cabe na janela."""
+    lat, _ = tile.center
+    lng_span = max(tile.east - tile.west, 1e-9)
+    lat_span = max(tile.north - tile.south, 1e-9)
+    zoom_lng = math.log2(360.0 * width / (256.0 * lng_span))
+    zoom_lat = math.log2(360.0 * height * math.cos(math.radians(lat)) / (256.0 * lat_span))
+    return round(min(max(min(zoom_lng, zoom_lat), MIN_ZOOM), MAX_ZOOM), 2)
+
+
+def tile_url(query: str, tile: Tile, base_url: str = "https://www.google.com/maps") -> str:
+    """URL de busca restrita ao viewport do tile (o termo vai sem a cidade para o Maps não recentralizar)."""
+    lat, lng = tile.center
+    return f"{base_url}/search/{quote_plus(query)}/@{lat:.6f},{lng:.6f},{tile_zoom(tile):.2f}z"
@@ -0,0 +1,200 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+
+class Span:
+    """Trecho medido de uma busca: nome, duração, resultado (`outcome`) e atributos livres."""
+
+    __slots__ = ("span_id", "parent_id", "name", "start", "duration", "outcome", "attrs", "thread")
+
+    def __init__(self, span_id: int, parent_id, name: str, start: float, attrs: dict):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.outcome = "ok"
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+
+    def set(self, outcome: str = None, **attrs) -> None:
+        if outcome is not None:
+            self.outcome = outcome
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round(self.start * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+            "outcome": self.outcome,
+            "thread": self.thread,
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, outcome: str = None, **attrs) -> None:
+        pass
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self):
+        return NULL_SPAN
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+_NULL_CONTEXT = _NullContext()
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "name", "attrs", "span")
+
+    def __init__(self, tracer, name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span = None
+
+    def __enter__(self) -> Span:
+        self.span = self.tracer._open(self.name, self.attrs)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is GeneratorExit:
+            # Consumidor parou de iterar (limite, cancelamento, break): não é falha do trecho.
+            self.span.set(closed_early=True)
+        elif exc is not None and self.span.outcome == "ok":
+            self.span.set("error", error=f"{type(exc).__name__}: {exc}")
+        self.tracer._close(self.span)
+        return False
+
+
+class Tracer:
+    """
+    Coleta spans de uma busca (seguro entre threads). Spans abertos dentro de outro span na mesma
+    thread viram filhos dele. Exportável como JSON com a lista de spans e um resumo por nome.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._spans = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, name: str, **attrs) -> _SpanContext:
+        return _SpanContext(self, name, attrs)
+
+    def add(self, name: str, duration: float, outcome: str = "ok", **attrs) -> Span:
+        """Registra um span já medido em outro lugar (ex.: subida do Chrome antes da busca)."""
+        span = self._open(name, attrs)
+        span.start = max(span.start - duration, 0.0)
+        span.outcome = outcome
+        self._pop(span)
+        span.duration = duration
+        return span
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _open(self, name: str, attrs: dict) -> Span:
+        stack = self._stack()
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+        span = Span(span_id, stack[-1].span_id if stack else None, name, time.perf_counter() - self._origin, attrs)
+        stack.append(span)
+        return span
+
+    def _pop(self, span: Span) -> None:
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        with self._lock:
+            self._spans.append(span)
+
+    def _close(self, span: Span) -> None:
+        span.duration = time.perf_counter() - self._origin - span.start
+        self._pop(span)
+
+    @property
+    def spans(self):
+        with self._lock:
+            return sorted(self._spans, key=lambda span: span.start)
+
+    def summary(self) -> dict:
+        """Por nome de span: quantidade, tempo total/médio/máximo (ms) e contagem por outcome."""
+        summary = {}
+        for span in self.spans:
+            entry = summary.setdefault(
+                span.name, {"count": 0, "total_ms": 0.0, "avg_ms": 0.0, "max_ms": 0.0, "outcomes": {}}
+            )
+            duration_ms = span.duration * 1000
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["outcomes"][span.outcome] = entry["outcomes"].get(span.outcome, 0) + 1
+        for entry in summary.values():
+            entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 2)
+            entry["total_ms"] = round(entry["total_ms"], 2)
+            entry["max_ms"] = round(entry["max_ms"], 2)
+        return summary
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round((time.perf_counter() - self._origin) * 1000, 2),
+            "summary": self.summary(),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    def to_json(self, indent=None) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def export(self, path) -> str:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_json(indent=2), encoding="utf-8")
+        return str(path)
+
+
+def trace_span(driver, name: str, **attrs):
+    """Span no tracer anexado ao driver (`driver.searchmaps_tracer`); sem tracer, não custa nada."""
+    tracer = getattr(driver, "searchmaps_tracer", None)
+    if tracer is None:
+        return _NULL_CONTEXT
+    return tracer.span(name, **attrs)
+
+
+def attach_tracer(driver, tracer) -> None:
+    """Anexa o tracer ao driver e registra a subida do Chrome, se ainda não foi reportada."""
+    if tracer is None:
+        return
+    driver.searchmaps_tracer = tracer
+    startup = getattr(driver, "searchmaps_startup_seconds", None)
+    if startup is not None:
+        driver.searchmaps_startup_seconds = None
+        tracer.add("driver_startup", startup)
+
+
+def detach_tracer(driver) -> None:
+    if getattr(driver, "searchmaps_tracer", None) is not None:
+        driver.searchmaps_tracer = None
@@ -1,6 +1,6 @@
 ﻿from pathlib import Path
 import sys
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Optional
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 SEARCH_DIR = BASE_DIR / "Search"
@@ -18,7 +18,10 @@ def run_search(
     limit: Optional[int] = None,
     progress_cb: Optional[Callable[[int, Optional[int]], None]] = None,
     should_cancel: Optional[Callable[[], bool]] = None,
-) -> List[Dict[str, str]]:
+    mode: str = "full",
+    return_cache_status: bool = False,
+    tracer=None,
+):
     return searcher.buscar_estabelecimentos(
         city,
         query,
@@ -26,5 +29,27 @@ def run_search(
         limit=limit,
         progress_cb=progress_cb,
         should_cancel=should_cancel,
-        return_dicts=True,
+        mode=mode,
+        return_cache_status=return_cache_status,
+        tracer=tracer,
     )
+
+
+def new_tracer(name: str):
+    """Tracer para um job quando SEARCHMAPS_TRACE está ativo; senão None."""
+    if not searcher.TRACE_ENABLED:
+        return None
+    return searcher.Tracer(name)
+
+
+def prewarm_browsers() -> int:
+    return searcher.prewarm_drivers()
+
+
+def browser_stats() -> dict:
+    """Estado dos pools de drivers, com reciclagens e motivos (SEARCHMAPS_RECYCLE_*)."""
+    return searcher.get_pool_stats()
+
+
+def shutdown_browsers() -> None:
+    searcher.shutdown_drivers()
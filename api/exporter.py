@@ -1,6 +1,6 @@
 ﻿from pathlib import Path
 import sys
-from typing import List, Dict, Tuple
+from typing import List, Tuple
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 SEARCH_DIR = BASE_DIR / "Search"
@@ -9,6 +9,7 @@ EXPORT_DIR = BASE_DIR / "exports"
 if str(SEARCH_DIR) not in sys.path:
     sys.path.insert(0, str(SEARCH_DIR))
 
+from place_record import PlaceRecord  # noqa: E402
 from utils import exportar_lista_para_excel, exportar_lista_para_csv  # noqa: E402
 
 COLUMNS = [
@@ -24,7 +25,7 @@ COLUMNS = [
 ]
 
 
-def export_results(results: List[Dict[str, str]], job_id: str, fmt: str) -> Tuple[str, Path]:
+def export_results(results: List[PlaceRecord], job_id: str, fmt: str) -> Tuple[str, Path]:
     EXPORT_DIR.mkdir(parents=True, exist_ok=True)
     filename = f"searchmaps_{job_id}.{fmt}"
     path = EXPORT_DIR / filename
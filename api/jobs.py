@@ -6,16 +6,19 @@ import unicodedata
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Tuple
 
-from api.core import run_search
+from api.core import new_tracer, run_search
 from api.exporter import export_results
+from place_record import PlaceRecord
 
 DEMO_MAX_LIMIT = int(os.getenv("SEARCHMAPS_DEMO_MAX_LIMIT", "10"))
 MAX_QUEUE_JOBS = int(os.getenv("SEARCHMAPS_MAX_QUEUE_JOBS", "2"))
 RATE_LIMIT_SECONDS = int(os.getenv("SEARCHMAPS_RATE_LIMIT_SECONDS", "60"))
+# Cada job em execução ocupa um driver do pool; mantenha <= SEARCHMAPS_DRIVER_POOL_SIZE.
+MAX_PARALLEL_JOBS = max(1, int(os.getenv("SEARCHMAPS_MAX_PARALLEL_JOBS", "1")))
 
 JOBS: Dict[str, Dict[str, Any]] = {}
 JOBS_LOCK = threading.Lock()
-RUN_LOCK = threading.Lock()
+RUN_SLOTS = threading.BoundedSemaphore(MAX_PARALLEL_JOBS)
 LAST_REQUEST_BY_IP: Dict[str, datetime] = {}
 
 
@@ -52,7 +55,7 @@ def _normalize_phone(value: Optional[str]) -> str:
     return re.sub(r"\D", "", value)
 
 
-def _dedupe_results(results: List[Dict[str, str]], limit: Optional[int]) -> List[Dict[str, str]]:
+def _dedupe_results(results: List[PlaceRecord], limit: Optional[int]) -> List[PlaceRecord]:
     seen = set()
     deduped = []
 
@@ -110,7 +113,7 @@ def _count_active_jobs() -> Tuple[int, int]:
 
 def _check_queue_capacity() -> None:
     queued, running = _count_active_jobs()
-    max_active = MAX_QUEUE_JOBS + 1  # 1 rodando + fila
+    max_active = MAX_QUEUE_JOBS + MAX_PARALLEL_JOBS  # rodando + fila
     if queued >= MAX_QUEUE_JOBS or (queued + running) >= max_active:
         raise QueueFullError(
             "A fila da DEMO está cheia no momento. Aguarde alguns minutos e tente novamente."
@@ -139,6 +142,7 @@ def create_job(
     state: Optional[str],
     limit: Optional[int],
     client_ip: Optional[str] = None,
+    mode: str = "full",
 ) -> str:
     job_id = uuid.uuid4().hex
     effective_limit = limit or DEMO_MAX_LIMIT
@@ -155,8 +159,10 @@ def create_job(
         "status": "queued",
         "progress": 0,
         "message": "Na fila.",
-        "params": {"city": city, "query": query, "state": state, "limit": effective_limit},
+        "params": {"city": city, "query": query, "state": state, "limit": effective_limit, "mode": mode},
         "results": [],
+        "cache": None,
+        "trace": None,
         "createdAt": _now_iso(),
         "error": None,
     }
@@ -173,7 +179,7 @@ def create_job(
 
 
 def _run_job(job_id: str) -> None:
-    with RUN_LOCK:
+    with RUN_SLOTS:
         job = _get_job(job_id)
         if not job:
             return
@@ -203,6 +209,7 @@ def _run_job(job_id: str) -> None:
             query = params.get("query")
             state = params.get("state")
             limit = params.get("limit")
+            mode = params.get("mode") or "full"
 
             def progress_cb(collected: int, limit_value: Optional[int]) -> None:
                 if _is_canceled(job_id):
@@ -219,14 +226,22 @@ def _run_job(job_id: str) -> None:
             def should_cancel() -> bool:
                 return _is_canceled(job_id)
 
-            results = run_search(
-                city=city,
-                query=query,
-                state=state,
-                limit=limit,
-                progress_cb=progress_cb,
-                should_cancel=should_cancel,
-            )
+            tracer = new_tracer(f"{job_id} | {city} | {query}")
+            try:
+                results, cache_status = run_search(
+                    city=city,
+                    query=query,
+                    state=state,
+                    limit=limit,
+                    progress_cb=progress_cb,
+                    should_cancel=should_cancel,
+                    mode=mode,
+                    return_cache_status=True,
+                    tracer=tracer,
+                )
+            finally:
+                if tracer is not None:
+                    _update_job(job_id, trace=tracer.to_dict())
 
             if _is_canceled(job_id):
                 _update_job(job_id, message="Cancelado.")
@@ -241,6 +256,7 @@ def _run_job(job_id: str) -> None:
                 progress=100,
                 message="Concluído.",
                 results=deduped,
+                cache=cache_status,
                 error=None,
             )
         except Exception as exc:
@@ -275,8 +291,22 @@ def get_results(job_id: str) -> Optional[Dict[str, Any]]:
     if not job:
         return None
 
-    results = job.get("results", [])
-    return {"results": results, "total": len(results)}
+    # O job guarda PlaceRecord (compacto); o dict só é montado aqui, na resposta.
+    results = [item.to_dict() for item in job.get("results", [])]
+    trace = job.get("trace")
+    return {
+        "results": results,
+        "total": len(results),
+        "cache": job.get("cache"),
+        "trace": trace["summary"] if trace else None,
+    }
+
+
+def get_trace(job_id: str) -> Optional[Dict[str, Any]]:
+    job = _get_job(job_id)
+    if not job:
+        return None
+    return {"trace": job.get("trace")}
 
 
 def export_job(job_id: str, fmt: str) -> Optional[Dict[str, str]]:
@@ -4,11 +4,14 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from typing import Literal, Optional
 from pathlib import Path
+import threading
 
+from api.core import browser_stats, prewarm_browsers, shutdown_browsers
 from api.jobs import (
     create_job,
     get_status,
     get_results,
+    get_trace,
     export_job,
     cancel_job,
     QueueFullError,
@@ -31,6 +34,17 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def start_prewarm() -> None:
+    # Em background: o servidor já aceita requisições enquanto o Chrome sobe (SEARCHMAPS_PREWARM).
+    threading.Thread(target=prewarm_browsers, daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_browsers() -> None:
+    shutdown_browsers()
+
+
 def _get_client_ip(request: Request) -> Optional[str]:
     forwarded = request.headers.get("x-forwarded-for")
     if forwarded:
@@ -45,6 +59,7 @@ class SearchRequest(BaseModel):
     query: str = Field(..., min_length=1)
     state: Optional[str] = Field(default=None)
     limit: Optional[int] = Field(default=DEMO_MAX_LIMIT, ge=1)
+    mode: Literal["full", "list_only", "hybrid"] = Field(default="full")
 
 
 class ExportRequest(BaseModel):
@@ -62,6 +77,7 @@ def start_search(payload: SearchRequest, request: Request):
             state,
             payload.limit,
             client_ip=_get_client_ip(request),
+            mode=payload.mode,
         )
     except LimitExceededError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -92,6 +108,19 @@ def get_job_results(job_id: str):
     return results
 
 
+@app.get("/api/trace/{job_id}")
+def get_job_trace(job_id: str):
+    trace = get_trace(job_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    return trace
+
+
+@app.get("/api/drivers")
+def get_driver_stats():
+    return browser_stats()
+
+
 @app.post("/api/export")
 def export_results(payload: ExportRequest):
     try: